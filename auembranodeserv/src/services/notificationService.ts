@@ -16,8 +16,9 @@ const notificationService: NotificationService = {
       limit: limit.toString(),
     });
     
-    const response = await apiService.get<Notification[]>(`/notifications?${params.toString()}`);
-    return response;
+    const response = await apiService.get<{success: boolean, data: Notification[], message: string, pagination: any}>(`/notifications?${params.toString()}`);
+    // Backend returns {success: true, data: [...], pagination: {...}}
+    return (response as any).data || [];
   },
 
   async getUnreadCount(): Promise<{ count: number }> {
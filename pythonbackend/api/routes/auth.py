@@ -95,7 +95,7 @@ async def login(
             )
         
         # Verify password
-        password_valid = verify_password(login_data.password, user.password_hash)
+        password_valid = await verify_password(login_data.password, user.password_hash)
         if not password_valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -5,15 +5,94 @@ Booking routes
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 
+from core.config import settings
 from core.security import get_current_active_user, get_current_guard_user, get_current_consumer_user
 from db.session import get_db
 from db.models.user import User
-# from schemas.booking import BookingResponse, BookingCreate, BookingUpdate
+from schemas.booking import BookingResponse, BookingCreate, BookingUpdate, BusyPeriod, FreeGuard
+from services.booking_service import BookingService, BookingConflict
 
 router = APIRouter()
 
+# Longest window the availability endpoints will look at
+MAX_AVAILABILITY_WINDOW = timedelta(days=31)
+
+
+def _check_window(start: datetime, end: datetime) -> None:
+    if start.tzinfo is None or end.tzinfo is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start and end must include a timezone"
+        )
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must be after start"
+        )
+    if end - start > MAX_AVAILABILITY_WINDOW:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Window can't be longer than {MAX_AVAILABILITY_WINDOW.days} days"
+        )
+
+
+def _conflict(e: BookingConflict) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": str(e),
+            "conflicts": [
+                {"start_datetime": start.isoformat(), "end_datetime": end.isoformat()}
+                for start, end in e.conflicts
+            ]
+        }
+    )
+
+
+async def _get_participant_booking(booking_service: BookingService, booking_id: int, current_user: User):
+    booking = await booking_service.get_booking(booking_id)
+    if not booking:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Booking not found"
+        )
+    if current_user.user_type != "admin" and current_user.id not in (booking.guard_id, booking.consumer_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this booking"
+        )
+    return booking
+
+
+async def _change_status(
+    booking_id: int,
+    action: str,
+    current_user: User,
+    db: AsyncSession,
+    reason: Optional[str] = None
+) -> dict:
+    booking_service = BookingService(db)
+    booking = await _get_participant_booking(booking_service, booking_id, current_user)
+    if action != "cancel" and current_user.id != booking.guard_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the booked guard can do this"
+        )
+    try:
+        booking = await booking_service.change_status(booking, action, current_user.id, reason=reason)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return {
+        "success": True,
+        "message": f"Booking {booking.status.replace('_', ' ')}",
+        "data": BookingResponse.from_orm(booking)
+    }
+
 
 @router.get("/")
 async def get_bookings(
@@ -24,219 +103,162 @@ async def get_bookings(
     db: AsyncSession = Depends(get_db)
 ):
     """Get bookings for current user"""
-    # Mock data for bookings - filter by current user
-    all_mock_bookings = [
-        {
-            "id": "1",
-            "event_type": "Corporate Event Security",
-            "event_date": "2025-10-25",
-            "start_time": "18:00",
-            "end_time": "23:00",
-            "location": "Downtown Convention Center, 123 Main St, New York, NY",
-            "status": "pending",
-            "total_amount": 400.00,
-            "description": "Security for annual company gala event. Expected 200+ attendees.",
-            "special_requirements": "Black suit required, must be comfortable with large crowds",
-            "created_at": "2025-10-23T10:00:00Z",
-            "requester": {
-                "id": "101",
-                "first_name": "Sarah",
-                "last_name": "Johnson",
-                "avatar_url": None,
-                "rating": 4.8,
-                "phone": "+1-555-0123"
-            },
-            "guard": {
-                "id": "201",
-                "first_name": "Mike",
-                "last_name": "Chen",
-                "avatar_url": None,
-                "rating": 4.9,
-                "experience_years": 5
-            }
-        },
-        {
-            "id": "2",
-            "event_type": "VIP Personal Protection",
-            "event_date": "2025-10-26",
-            "start_time": "09:00",
-            "end_time": "17:00",
-            "location": "Private Residence, 456 Park Ave, New York, NY",
-            "status": "confirmed",
-            "total_amount": 600.00,
-            "description": "Personal security detail for high-profile client during business meetings.",
-            "special_requirements": "Discrete, professional appearance, background check required",
-            "created_at": "2025-10-22T14:30:00Z",
-            "requester": {
-                "id": "102",
-                "first_name": "David",
-                "last_name": "Williams",
-                "avatar_url": None,
-                "rating": 4.9,
-                "phone": "+1-555-0456"
-            },
-            "guard": {
-                "id": "202",
-                "first_name": "Lisa",
-                "last_name": "Rodriguez",
-                "avatar_url": None,
-                "rating": 4.7,
-                "experience_years": 7
-            }
-        },
-        {
-            "id": "3",
-            "event_type": "Wedding Security",
-            "event_date": "2025-10-27",
-            "start_time": "16:00",
-            "end_time": "01:00",
-            "location": "Garden Venue, 789 Oak St, Brooklyn, NY",
-            "status": "pending",
-            "total_amount": 350.00,
-            "description": "Security for outdoor wedding ceremony and reception.",
-            "special_requirements": "Formal attire, experience with wedding events preferred",
-            "created_at": "2025-10-23T08:15:00Z",
-            "requester": {
-                "id": "103",
-                "first_name": "Emily",
-                "last_name": "Brown",
-                "avatar_url": None,
-                "rating": 4.6,
-                "phone": "+1-555-0789"
-            },
-            "guard": None
-        },
-        {
-            "id": "4",
-            "event_type": "Night Club Security",
-            "event_date": "2025-10-24",
-            "start_time": "22:00",
-            "end_time": "06:00",
-            "location": "Club Neon, 321 Night St, Manhattan, NY",
-            "status": "in_progress",
-            "total_amount": 280.00,
-            "description": "Security for weekend night club operations.",
-            "special_requirements": "Experience with nightlife venues, crowd control skills",
-            "created_at": "2025-10-21T20:00:00Z",
-            "requester": {
-                "id": "104",
-                "first_name": "James",
-                "last_name": "Taylor",
-                "avatar_url": None,
-                "rating": 4.5,
-                "phone": "+1-555-0321"
-            },
-            "guard": {
-                "id": "203",
-                "first_name": "Alex",
-                "last_name": "Martinez",
-                "avatar_url": None,
-                "rating": 4.8,
-                "experience_years": 3
-            }
-        },
-        {
-            "id": "5",
-            "event_type": "Construction Site Security",
-            "event_date": "2025-10-28",
-            "start_time": "06:00",
-            "end_time": "18:00",
-            "location": "Construction Site, 555 Build Ave, Queens, NY",
-            "status": "completed",
-            "total_amount": 320.00,
-            "description": "Overnight security for construction site equipment and materials.",
-            "special_requirements": "Valid security license, experience with construction sites",
-            "created_at": "2025-10-20T12:00:00Z",
-            "requester": {
-                "id": "105",
-                "first_name": "Robert",
-                "last_name": "Anderson",
-                "avatar_url": None,
-                "rating": 4.7,
-                "phone": "+1-555-0654"
-            },
-            "guard": {
-                "id": "204",
-                "first_name": "Chris",
-                "last_name": "Wilson",
-                "avatar_url": None,
-                "rating": 4.6,
-                "experience_years": 4
-            }
+    booking_service = BookingService(db)
+    bookings = await booking_service.get_bookings(
+        current_user.id,
+        current_user.user_type,
+        status=status,
+        skip=skip,
+        limit=limit
+    )
+
+    return {
+        "success": True,
+        "message": "Bookings retrieved successfully",
+        "data": [BookingResponse.from_orm(booking) for booking in bookings],
+        "pagination": {
+            "skip": skip,
+            "limit": limit,
+            "total": len(bookings)
         }
+    }
+
+
+@router.get("/free-guards")
+async def get_free_guards(
+    start: datetime,
+    end: datetime,
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(25, gt=0, le=settings.GUARD_SEARCH_MAX_RADIUS_KM),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Active guards whose availability schedule covers [start, end) and who
+    have no overlapping booking; nearest first when a location is given"""
+    _check_window(start, end)
+    if (latitude is None) != (longitude is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="latitude and longitude must be given together"
+        )
+
+    booking_service = BookingService(db)
+    rows = await booking_service.find_free_guards(
+        start,
+        end,
+        latitude=latitude,
+        longitude=longitude,
+        radius_km=radius_km if latitude is not None else None,
+        skip=skip,
+        limit=limit
+    )
+
+    guards = [
+        FreeGuard(
+            user_id=profile.user_id,
+            first_name=profile.first_name,
+            last_name=profile.last_name,
+            profile_picture_url=profile.profile_picture_url,
+            city=profile.city,
+            state=profile.state,
+            years_experience=profile.years_experience,
+            certifications=profile.certifications,
+            distance_km=round(distance, 2) if distance is not None else None
+        )
+        for profile, distance in rows
     ]
-    
-    # Filter bookings based on user type and current user
-    if current_user.user_type == 'guard':
-        # For guards, show bookings where they are assigned or pending requests
-        mock_bookings = [
-            b for b in all_mock_bookings 
-            if b["guard"] and b["guard"]["id"] == str(current_user.id)
-        ]
-        # Also include pending bookings (no guard assigned yet)
-        pending_bookings = [
-            b for b in all_mock_bookings 
-            if b["status"] == "pending" and not b["guard"]
-        ]
-        mock_bookings.extend(pending_bookings)
-    else:
-        # For consumers, show their own bookings
-        mock_bookings = [
-            b for b in all_mock_bookings 
-            if b["requester"]["id"] == str(current_user.id)
-        ]
-    
-    # Filter by status if provided
-    if status:
-        mock_bookings = [b for b in mock_bookings if b["status"] == status]
-    
-    # Sort by event_date (most recent first)
-    mock_bookings.sort(key=lambda x: x["event_date"], reverse=True)
-    
-    return mock_bookings[skip:skip + limit]
-
-
-@router.post("/")
+
+    return {
+        "success": True,
+        "message": "Free guards retrieved successfully",
+        "data": guards,
+        "pagination": {
+            "skip": skip,
+            "limit": limit,
+            "total": len(guards)
+        }
+    }
+
+
+@router.get("/guards/{guard_id}/busy", response_model=List[BusyPeriod])
+async def get_guard_busy_periods(
+    guard_id: int,
+    start: datetime,
+    end: datetime,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Periods in [start, end) during which a guard is already booked"""
+    _check_window(start, end)
+    booking_service = BookingService(db)
+    periods = await booking_service.busy_periods(guard_id, start, end)
+    return [BusyPeriod(start_datetime=period_start, end_datetime=period_end) for period_start, period_end in periods]
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_booking(
-    booking_data: dict,
+    booking_data: BookingCreate,
     current_user: User = Depends(get_current_consumer_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Create a new booking"""
-    # TODO: Implement booking creation
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Booking creation not implemented yet"
-    )
+    """Create a new booking (409 if the guard is already booked then)"""
+    booking_service = BookingService(db)
+    try:
+        booking = await booking_service.create_booking(current_user.id, booking_data)
+    except BookingConflict as e:
+        raise _conflict(e)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return {
+        "success": True,
+        "message": "Booking created successfully",
+        "data": BookingResponse.from_orm(booking)
+    }
 
 
-@router.get("/{booking_id}")
+@router.get("/{booking_id}", response_model=BookingResponse)
 async def get_booking(
     booking_id: int,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific booking"""
-    # TODO: Implement booking retrieval
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Booking retrieval not implemented yet"
-    )
+    booking_service = BookingService(db)
+    return await _get_participant_booking(booking_service, booking_id, current_user)
 
 
 @router.put("/{booking_id}")
 async def update_booking(
     booking_id: int,
-    booking_data: dict,
+    booking_data: BookingUpdate,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Update a booking"""
-    # TODO: Implement booking update
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Booking update not implemented yet"
-    )
+    """Update a booking (409 if a new time overlaps another booking)"""
+    booking_service = BookingService(db)
+    booking = await _get_participant_booking(booking_service, booking_id, current_user)
+    try:
+        booking = await booking_service.update_booking(booking, current_user.id, booking_data)
+    except BookingConflict as e:
+        raise _conflict(e)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return {
+        "success": True,
+        "message": "Booking updated successfully",
+        "data": BookingResponse.from_orm(booking)
+    }
 
 
 @router.post("/{booking_id}/confirm")
@@ -246,26 +268,28 @@ async def confirm_booking(
     db: AsyncSession = Depends(get_db)
 ):
     """Confirm a booking"""
-    # TODO: Implement booking confirmation
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Booking confirmation not implemented yet"
-    )
+    return await _change_status(booking_id, "confirm", current_user, db)
+
+
+@router.post("/{booking_id}/start")
+async def start_booking(
+    booking_id: int,
+    current_user: User = Depends(get_current_guard_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Mark a booking as in progress"""
+    return await _change_status(booking_id, "start", current_user, db)
 
 
 @router.post("/{booking_id}/cancel")
 async def cancel_booking(
     booking_id: int,
-    reason: str,
+    reason: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Cancel a booking"""
-    # TODO: Implement booking cancellation
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Booking cancellation not implemented yet"
-    )
+    """Cancel a booking (frees the guard's time)"""
+    return await _change_status(booking_id, "cancel", current_user, db, reason=reason)
 
 
 @router.post("/{booking_id}/complete")
@@ -275,8 +299,4 @@ async def complete_booking(
     db: AsyncSession = Depends(get_db)
 ):
     """Complete a booking"""
-    # TODO: Implement booking completion
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Booking completion not implemented yet"
-    )
+    return await _change_status(booking_id, "complete", current_user, db)
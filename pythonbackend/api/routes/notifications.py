@@ -2,140 +2,98 @@
 Notification routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Header
+from fastapi import WebSocket
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from datetime import datetime, timedelta
+from sqlalchemy import select
+from typing import Optional, AsyncIterator
+import asyncio
+import json
 
-from core.security import get_current_active_user
-from db.session import get_db
+from core.config import settings
+from core.security import (
+    get_current_active_user, get_current_stream_user, get_principal_for_token, UserPrincipal
+)
+from core.pagination import next_cursor
+from db.session import get_db, AsyncSessionLocal
 from db.models.user import User
+from db.models.notification import Notification
+from services.notification_service import NotificationService
+from services.notification_stream import notification_broker, RecentIds
+from services.reference_data import reference_data
 
 router = APIRouter()
 
 
+async def _serialize_notification(notification: Notification) -> dict:
+    notification_type = await reference_data.get("notification_types", notification.type_id)
+    return {
+        "id": notification.id,
+        "title": notification.title,
+        "message": notification.message,
+        "type": notification_type.name if notification_type else None,
+        "is_read": notification.is_read,
+        "created_at": notification.created_at.isoformat() if notification.created_at else None,
+        "data": notification.data or {}
+    }
+
+
+async def _serialize_event(event: dict) -> dict:
+    """Stream representation of a row pushed by the notifications insert trigger"""
+    notification_type = await reference_data.get("notification_types", event.get("type_id"))
+    data = {
+        "id": event["id"],
+        "title": event.get("title"),
+        "message": event.get("message", ""),
+        "type": notification_type.name if notification_type else None,
+        "is_read": False,
+        "created_at": event.get("created_at"),
+        "data": event.get("data") or {}
+    }
+    if event.get("truncated"):
+        data["truncated"] = True
+    return data
+
+
+async def _missed_events(user_id: int, after_id: int) -> list:
+    """Notifications created after `after_id`, for clients resuming a stream"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Notification)
+            .where(Notification.user_id == user_id, Notification.id > after_id)
+            .order_by(Notification.id)
+            .limit(settings.NOTIFICATION_STREAM_QUEUE_SIZE)
+        )
+        return [await _serialize_notification(n) for n in result.scalars().all()]
+
+
 @router.get("/")
 async def get_notifications(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    unread_only: bool = False,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get user notifications"""
-    # Mock notifications data
-    mock_notifications = [
-        {
-            "id": 1,
-            "title": "New Booking Request",
-            "message": "You have received a new booking request for Corporate Event Security on January 25th.",
-            "type": "booking_request",
-            "is_read": False,
-            "created_at": (datetime.now() - timedelta(hours=2)).isoformat() + "Z",
-            "data": {
-                "booking_id": 123,
-                "event_type": "Corporate Event Security",
-                "event_date": "2025-01-25",
-                "action_required": True
-            }
-        },
-        {
-            "id": 2,
-            "title": "Booking Confirmed",
-            "message": "Your booking for Wedding Security has been confirmed by Sarah Williams.",
-            "type": "booking_confirmed",
-            "is_read": True,
-            "created_at": (datetime.now() - timedelta(days=1)).isoformat() + "Z",
-            "data": {
-                "booking_id": 122,
-                "client_name": "Sarah Williams",
-                "event_type": "Wedding Security"
-            }
-        },
-        {
-            "id": 3,
-            "title": "Payment Received",
-            "message": "Payment of $400 has been received for your Corporate Event Security service.",
-            "type": "payment_received",
-            "is_read": False,
-            "created_at": (datetime.now() - timedelta(hours=5)).isoformat() + "Z",
-            "data": {
-                "amount": 400,
-                "booking_id": 121,
-                "payment_method": "Credit Card"
-            }
-        },
-        {
-            "id": 4,
-            "title": "New Review Received",
-            "message": "John Smith left you a 5-star review for your security services.",
-            "type": "review_received",
-            "is_read": True,
-            "created_at": (datetime.now() - timedelta(days=2)).isoformat() + "Z",
-            "data": {
-                "reviewer_name": "John Smith",
-                "rating": 5,
-                "review_id": 45
-            }
-        },
-        {
-            "id": 5,
-            "title": "Profile Update Required",
-            "message": "Please update your security license information to continue receiving bookings.",
-            "type": "profile_update",
-            "is_read": False,
-            "created_at": (datetime.now() - timedelta(days=3)).isoformat() + "Z",
-            "data": {
-                "required_fields": ["security_license", "insurance_info"],
-                "action_required": True
-            }
-        },
-        {
-            "id": 6,
-            "title": "Booking Cancelled",
-            "message": "Your booking for Office Building Security on January 20th has been cancelled.",
-            "type": "booking_cancelled",
-            "is_read": True,
-            "created_at": (datetime.now() - timedelta(days=4)).isoformat() + "Z",
-            "data": {
-                "booking_id": 120,
-                "event_type": "Office Building Security",
-                "cancellation_reason": "Client request"
-            }
-        },
-        {
-            "id": 7,
-            "title": "System Maintenance",
-            "message": "Scheduled maintenance will occur on January 30th from 2:00 AM to 4:00 AM EST.",
-            "type": "system",
-            "is_read": False,
-            "created_at": (datetime.now() - timedelta(hours=12)).isoformat() + "Z",
-            "data": {
-                "maintenance_date": "2025-01-30",
-                "start_time": "02:00",
-                "end_time": "04:00"
-            }
-        },
-        {
-            "id": 8,
-            "title": "New Feature Available",
-            "message": "You can now upload multiple photos to your posts! Try it out in the Feed section.",
-            "type": "feature_update",
-            "is_read": True,
-            "created_at": (datetime.now() - timedelta(days=5)).isoformat() + "Z",
-            "data": {
-                "feature_name": "Multiple Photo Upload",
-                "location": "Feed Section"
-            }
+    """Get user notifications (newest first; pass `pagination.next_cursor` back as `cursor`)"""
+    notification_service = NotificationService()
+    notifications = await notification_service.get_user_notifications(
+        db, current_user.id, limit=limit, offset=skip, cursor=cursor, unread_only=unread_only
+    )
+
+    return {
+        "success": True,
+        "message": "Notifications retrieved successfully",
+        "data": [await _serialize_notification(notification) for notification in notifications],
+        "pagination": {
+            "skip": skip,
+            "limit": limit,
+            "total": len(notifications),
+            "next_cursor": next_cursor(notifications, limit)
         }
-    ]
-    
-    # Filter notifications based on user type if needed
-    if current_user.user_type == 'consumer':
-        # For consumers, show booking-related notifications
-        filtered_notifications = [n for n in mock_notifications if n['type'] in ['booking_confirmed', 'payment_received', 'review_received', 'booking_cancelled', 'system', 'feature_update']]
-    else:
-        # For guards, show all notifications
-        filtered_notifications = mock_notifications
-    
-    return filtered_notifications
+    }
 
 
 @router.post("/mark-read/{notification_id}")
@@ -145,7 +103,13 @@ async def mark_notification_read(
     db: AsyncSession = Depends(get_db)
 ):
     """Mark specific notification as read"""
-    # Mock implementation - in real app, update database
+    notification_service = NotificationService()
+    if not await notification_service.mark_notification_read(db, notification_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification not found"
+        )
+
     return {"success": True, "message": f"Notification {notification_id} marked as read"}
 
 
@@ -155,8 +119,10 @@ async def mark_all_notifications_read(
     db: AsyncSession = Depends(get_db)
 ):
     """Mark all notifications as read"""
-    # Mock implementation - in real app, update database
-    return {"success": True, "message": "All notifications marked as read"}
+    notification_service = NotificationService()
+    updated = await notification_service.mark_all_read(db, current_user.id)
+
+    return {"success": True, "message": "All notifications marked as read", "updated": updated}
 
 
 @router.get("/unread-count")
@@ -165,8 +131,88 @@ async def get_unread_count(
     db: AsyncSession = Depends(get_db)
 ):
     """Get unread notification count"""
-    # Get notifications and count unread ones
-    notifications = await get_notifications(current_user, db)
-    unread_count = sum(1 for notification in notifications if not notification['is_read'])
-    
-    return {"unread_count": unread_count}
\ No newline at end of file
+    notification_service = NotificationService()
+    unread_count = await notification_service.get_unread_count(db, current_user.id)
+
+    return {"unread_count": unread_count}
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    last_event_id: Optional[int] = Header(None),
+    current_user: UserPrincipal = Depends(get_current_stream_user)
+):
+    """Server-sent events stream of new notifications (authenticate with Bearer or ?token=)"""
+    async def events() -> AsyncIterator[str]:
+        # Subscribe before backfilling so nothing slips in between
+        with notification_broker.subscribe(current_user.id) as queue:
+            # Covers a full backfill plus a full live queue
+            sent = RecentIds(2 * settings.NOTIFICATION_STREAM_QUEUE_SIZE)
+            if last_event_id:
+                for notification in await _missed_events(current_user.id, last_event_id):
+                    sent.add(notification["id"])
+                    yield f"id: {notification['id']}\nevent: notification\ndata: {json.dumps(notification)}\n\n"
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+
+                if not sent.add(event["id"]):
+                    continue
+                notification = await _serialize_event(event)
+                yield f"id: {event['id']}\nevent: notification\ndata: {json.dumps(notification)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def notifications_websocket(websocket: WebSocket, token: Optional[str] = None):
+    """WebSocket stream of new notifications (authenticate with ?token=)"""
+    try:
+        current_user = await get_principal_for_token(token or "")
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+
+    async def send_events(queue: asyncio.Queue) -> None:
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                await websocket.send_json({"type": "ping"})
+                continue
+            await websocket.send_json({"type": "notification", "data": await _serialize_event(event)})
+
+    async def receive_until_closed() -> None:
+        # Client messages are ignored; this only notices the disconnect
+        while True:
+            await websocket.receive_text()
+
+    with notification_broker.subscribe(current_user.id) as queue:
+        tasks = [
+            asyncio.create_task(send_events(queue)),
+            asyncio.create_task(receive_until_closed())
+        ]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
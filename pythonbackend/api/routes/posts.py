@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
@@ -6,61 +6,71 @@ from db.session import get_db
 from db.models.post import Post, PostMedia
 from db.models.user import User
 from core.security import get_current_active_user
-from schemas.post import PostCreate, PostUpdate, PostResponse
+from core.pagination import next_cursor
+from schemas.post import PostCreate, PostUpdate, PostResponse, PostMediaResponse
 from services.post_service import PostService
+from services.storage import UploadRejected
 
 router = APIRouter()
 
+
+def _media_url(media: PostMedia, display_width: Optional[int]) -> str:
+    """Smallest image variant at least `display_width` wide (the original if none is)"""
+    if display_width:
+        for variant in media.variants or []:
+            if variant["width"] >= display_width:
+                return variant["url"]
+    return media.media_url
+
+
+def _serialize_feed_post(post: Post, display_width: Optional[int] = None) -> dict:
+    """Build the feed representation of a post with its author and media"""
+    user = post.user
+    media_list = sorted(post.media, key=lambda media: media.sort_order or 0)
+    
+    return {
+        "id": post.id,
+        "content": post.content,
+        "post_type": post.post_type,
+        "media_urls": [_media_url(media, display_width) for media in media_list],
+        # Images fall back to the original until their thumbnail is rendered; videos have none
+        "thumbnail_urls": [
+            media.thumbnail_url or (media.media_url if media.media_type == "image" else None)
+            for media in media_list
+        ],
+        # Counters already include unflushed engagement deltas (see PostService)
+        "likes_count": post.like_count or 0,
+        "comments_count": post.comment_count or 0,
+        "created_at": post.created_at.isoformat() if post.created_at else None,
+        "user": {
+            "id": user.id,
+            "first_name": getattr(user, 'first_name', None),
+            "last_name": getattr(user, 'last_name', None),
+            "avatar_url": getattr(user, 'avatar_url', None),
+            "email": user.email,
+            "user_type": user.user_type
+        }
+    }
+
+
 @router.get("/")
 async def get_posts(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     user_id: Optional[int] = None,
     post_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    display_width: Optional[int] = Query(None, ge=1, le=8192),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get posts feed"""
+    """Get posts feed (pass `display_width` in device pixels to get resized images)"""
     try:
         post_service = PostService(db)
-        posts = await post_service.get_posts(skip, limit, user_id, post_type)
+        posts = await post_service.get_posts(skip, limit, user_id, post_type, cursor)
         
-        # Convert to response format
-        posts_data = []
-        for post in posts:
-            # Get user information
-            user_query = select(User).where(User.id == post.user_id)
-            user_result = await db.execute(user_query)
-            user = user_result.scalar_one_or_none()
-            
-            if user:
-                # Get media URLs
-                try:
-                    media_query = select(PostMedia).where(PostMedia.post_id == post.id)
-                    media_result = await db.execute(media_query)
-                    media_list = media_result.scalars().all()
-                    media_urls = [media.media_url for media in media_list] if media_list else []
-                except Exception as e:
-                    print(f"Error getting media for post {post.id}: {str(e)}")
-                    media_urls = []
-                
-                posts_data.append({
-                    "id": post.id,
-                    "content": post.content,
-                    "post_type": post.post_type,
-                    "media_urls": media_urls,
-                    "likes_count": post.like_count or 0,
-                    "comments_count": post.comment_count or 0,
-                    "created_at": post.created_at.isoformat() if post.created_at else None,
-                    "user": {
-                        "id": user.id,
-                        "first_name": getattr(user, 'first_name', None),
-                        "last_name": getattr(user, 'last_name', None),
-                        "avatar_url": getattr(user, 'avatar_url', None),
-                        "email": user.email,
-                        "user_type": user.user_type
-                    }
-                })
+        # Convert to response format (authors and media are already loaded)
+        posts_data = [_serialize_feed_post(post, display_width) for post in posts if post.user]
         
         return {
             "success": True,
@@ -69,10 +79,13 @@ async def get_posts(
             "pagination": {
                 "skip": skip,
                 "limit": limit,
-                "total": len(posts_data)
+                "total": len(posts_data),
+                "next_cursor": next_cursor(posts, limit)
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting posts: {str(e)}")
         # If no posts in database, return empty array
@@ -83,7 +96,8 @@ async def get_posts(
             "pagination": {
                 "skip": skip,
                 "limit": limit,
-                "total": 0
+                "total": 0,
+                "next_cursor": None
             }
         }
 
@@ -150,6 +164,13 @@ async def get_post(
         user_result = await db.execute(user_query)
         user = user_result.scalar_one_or_none()
         
+        media_result = await db.execute(
+            select(PostMedia.media_url)
+            .where(PostMedia.post_id == post.id)
+            .order_by(PostMedia.sort_order, PostMedia.id)
+        )
+        media_urls = media_result.scalars().all()
+        
         if user:
             return {
                 "success": True,
@@ -158,15 +179,15 @@ async def get_post(
                     "id": post.id,
                     "content": post.content,
                     "post_type": post.post_type,
-                    "media_urls": post.media_urls or [],
-                    "likes_count": post.likes_count or 0,
-                    "comments_count": post.comments_count or 0,
+                    "media_urls": list(media_urls),
+                    "likes_count": post.like_count or 0,
+                    "comments_count": post.comment_count or 0,
                     "created_at": post.created_at.isoformat() if post.created_at else None,
                     "user": {
                         "id": user.id,
-                        "first_name": user.first_name,
-                        "last_name": user.last_name,
-                        "avatar_url": user.avatar_url
+                        "first_name": getattr(user, 'first_name', None),
+                        "last_name": getattr(user, 'last_name', None),
+                        "avatar_url": getattr(user, 'avatar_url', None)
                     }
                 }
             }
@@ -190,13 +211,14 @@ async def get_user_posts(
     user_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get posts by a specific user"""
     try:
         post_service = PostService(db)
-        posts = await post_service.get_user_posts(user_id, skip, limit)
+        posts = await post_service.get_user_posts(user_id, skip, limit, cursor)
         
         return {
             "success": True,
@@ -205,9 +227,12 @@ async def get_user_posts(
             "pagination": {
                 "skip": skip,
                 "limit": limit,
-                "total": len(posts)
+                "total": len(posts),
+                "next_cursor": next_cursor(posts, limit)
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -244,26 +269,33 @@ async def get_trending_posts(
         )
 
 
-@router.post("/{post_id}/media")
+@router.post("/{post_id}/media", status_code=status.HTTP_201_CREATED)
 async def add_media_to_post(
     post_id: int,
-    media_urls: List[str],
+    files: List[UploadFile] = File(...),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Add media to a post"""
+    """Upload one or more images/videos to a post"""
     try:
         post_service = PostService(db)
-        post = await post_service.add_media_to_post(post_id, media_urls)
+        media = await post_service.add_media_to_post(post_id, current_user.id, files)
+        
+        if media is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Post not found"
+            )
         
         return {
             "success": True,
             "message": "Media added successfully",
-            "data": {
-                "id": post.id,
-                "media_urls": post.media_urls
-            }
+            "data": [PostMediaResponse.from_orm(item) for item in media]
         }
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -294,22 +326,30 @@ async def get_post_media(
         )
 
 
-@router.delete("/{post_id}/media/{media_url}")
+@router.delete("/{post_id}/media/{media_id}")
 async def delete_post_media(
     post_id: int,
-    media_url: str,
+    media_id: int,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete media from a post"""
     try:
         post_service = PostService(db)
-        await post_service.delete_post_media(post_id, media_url)
+        deleted = await post_service.delete_post_media(post_id, media_id, current_user.id)
+        
+        if not deleted:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Media not found"
+            )
         
         return {
             "success": True,
             "message": "Media deleted successfully"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -364,19 +404,30 @@ async def unlike_post(
 @router.get("/{post_id}/likes")
 async def get_post_likes(
     post_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get likes for a post"""
     try:
         post_service = PostService(db)
-        likes = await post_service.get_post_likes(post_id)
+        likes = await post_service.get_post_likes(post_id, skip, limit, cursor)
         
         return {
             "success": True,
             "message": "Likes retrieved successfully",
-            "data": likes
+            "data": likes,
+            "pagination": {
+                "skip": skip,
+                "limit": limit,
+                "total": len(likes),
+                "next_cursor": next_cursor(likes, limit)
+            }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -417,13 +468,14 @@ async def get_post_comments(
     post_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get comments for a post"""
     try:
         post_service = PostService(db)
-        comments = await post_service.get_post_comments(post_id, skip, limit)
+        comments = await post_service.get_post_comments(post_id, skip, limit, cursor)
         
         return {
             "success": True,
@@ -432,9 +484,12 @@ async def get_post_comments(
             "pagination": {
                 "skip": skip,
                 "limit": limit,
-                "total": len(comments)
+                "total": len(comments),
+                "next_cursor": next_cursor(comments, limit)
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
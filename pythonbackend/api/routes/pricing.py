@@ -0,0 +1,108 @@
+"""
+Pricing routes
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from core.config import settings
+from core.security import get_current_active_user
+from db.session import get_db
+from db.models.user import User
+from schemas.pricing import QuoteRequest, GuardQuote, ZoneResolution
+from services.pricing_service import PricingService
+from services.zone_resolver import zone_resolver
+
+router = APIRouter()
+
+# Longest shift that can be quoted
+MAX_SHIFT = timedelta(days=7)
+
+
+@router.post("/quotes")
+async def get_quotes(
+    quote_request: QuoteRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Price one shift for many guards at once, returning the cheapest `limit`.
+    
+    Quotes every guard open for booking over the whole shift (optionally
+    limited to `guard_ids` and a pricing zone), skipping guards already
+    booked then unless `exclude_booked` is false. Without a zone, the
+    venue's `latitude`/`longitude` pick the zone that covers it; guards
+    are quoted at their cheapest zone when none does.
+    """
+    start, end = quote_request.start_datetime, quote_request.end_datetime
+    if start.tzinfo is None or end.tzinfo is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Shift times must include a timezone"
+        )
+    if end - start > MAX_SHIFT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Shifts can't be longer than {MAX_SHIFT.days} days"
+        )
+    if quote_request.guard_ids is not None and len(quote_request.guard_ids) > settings.PRICING_MAX_QUOTE_GUARDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.PRICING_MAX_QUOTE_GUARDS} guards can be quoted at once"
+        )
+    try:
+        ZoneInfo(quote_request.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown timezone"
+        )
+
+    if (quote_request.latitude is None) != (quote_request.longitude is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="latitude and longitude must be given together"
+        )
+    pricing_zone_id = quote_request.pricing_zone_id
+    if pricing_zone_id is None and quote_request.latitude is not None:
+        pricing_zone_id = await zone_resolver.zone_for(quote_request.latitude, quote_request.longitude)
+
+    pricing_service = PricingService(db)
+    try:
+        quotes = await pricing_service.quote(
+            start,
+            end,
+            timezone=quote_request.timezone,
+            event_type_id=quote_request.event_type_id,
+            emergency=quote_request.emergency,
+            guard_ids=quote_request.guard_ids,
+            pricing_zone_id=pricing_zone_id,
+            exclude_booked=quote_request.exclude_booked,
+            limit=quote_request.limit
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return {
+        "success": True,
+        "message": "Quotes calculated successfully",
+        "data": [GuardQuote(**quote) for quote in quotes]
+    }
+
+
+@router.get("/zones/resolve", response_model=ZoneResolution)
+async def resolve_pricing_zone(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Pricing zone covering a location (null when no active zone does)"""
+    return ZoneResolution(
+        latitude=latitude,
+        longitude=longitude,
+        pricing_zone_id=await zone_resolver.zone_for(latitude, longitude)
+    )
@@ -2,25 +2,107 @@
 Search routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
+from core.config import settings
 from core.security import get_current_active_user
 from db.session import get_db
 from db.models.user import User
+from schemas.search import GuardSearchResult, NearbyGuard
+from services.guard_index import guard_index
+from services.search_service import SearchService
 
 router = APIRouter()
 
 
 @router.get("/guards")
 async def search_guards(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(25, gt=0, le=settings.GUARD_SEARCH_MAX_RADIUS_KM),
+    certifications: Optional[List[str]] = Query(None),
+    languages: Optional[List[str]] = Query(None),
+    min_experience: Optional[int] = Query(None, ge=0),
+    sort: str = Query("distance", regex="^(distance|rating)$"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Search for guards"""
-    # TODO: Implement guard search
-    return {"message": "Guard search not implemented yet"}
+    """Search for active guards near a location.
+    
+    Guards must hold all `certifications` and speak any of `languages`.
+    Results are ordered by distance (then rating) or by rating (then distance).
+    """
+    search_service = SearchService(db)
+    rows = await search_service.search_guards(
+        latitude,
+        longitude,
+        radius_km,
+        certifications=certifications,
+        languages=languages,
+        min_experience=min_experience,
+        sort=sort,
+        skip=skip,
+        limit=limit
+    )
+    
+    guards = [
+        GuardSearchResult(
+            user_id=profile.user_id,
+            first_name=profile.first_name,
+            last_name=profile.last_name,
+            profile_picture_url=profile.profile_picture_url,
+            city=profile.city,
+            state=profile.state,
+            years_experience=profile.years_experience,
+            certifications=profile.certifications,
+            languages_spoken=profile.languages_spoken,
+            max_travel_distance=profile.max_travel_distance,
+            distance_km=round(distance, 2),
+            rating=round(float(rating), 2) if rating is not None else None,
+            review_count=review_count
+        )
+        for profile, distance, rating, review_count in rows
+    ]
+    
+    return {
+        "success": True,
+        "message": "Guards retrieved successfully",
+        "data": guards,
+        "pagination": {
+            "skip": skip,
+            "limit": limit,
+            "total": len(guards)
+        }
+    }
+
+
+@router.get("/guards/nearest")
+async def nearest_available_guards(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=100),
+    radius_km: float = Query(50, gt=0, le=settings.GUARD_SEARCH_MAX_RADIUS_KM),
+    consistent: bool = False,
+    current_user: User = Depends(get_current_active_user)
+):
+    """The `k` nearest available guards (served from memory; `consistent=true` reads Postgres)"""
+    guards, source = await guard_index.nearest_available(
+        latitude, longitude, k, radius_km, consistent=consistent or not settings.GUARD_INDEX_ENABLED
+    )
+    
+    return {
+        "success": True,
+        "message": "Guards retrieved successfully",
+        "data": [
+            NearbyGuard(user_id=user_id, distance_km=round(distance, 2))
+            for user_id, distance in guards
+        ],
+        "source": source
+    }
 
 
 @router.get("/events")
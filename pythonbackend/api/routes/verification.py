@@ -2,11 +2,14 @@
 Verification routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Response, Request, Header
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from datetime import datetime
 
 from core.security import get_current_active_user, get_current_admin_user
+from core.pagination import next_cursor
 from db.session import get_db
 from db.models.user import User
 from db.models.verification import VerificationDocumentType, Verification, BackgroundCheck
@@ -15,9 +18,15 @@ from schemas.verification import (
     VerificationResponse,
     VerificationCreate,
     BackgroundCheckResponse,
-    BackgroundCheckCreate
+    BackgroundCheckCreate,
+    VerificationBatchApprove,
+    VerificationBatchReject,
+    VerificationBatchResult
 )
-from services.verification_service import VerificationService
+from core.config import settings
+from services.reference_data import reference_data
+from services.storage import UploadRejected
+from services.verification_service import VerificationService, document_storage, DOCUMENT_PREFIX
 
 router = APIRouter()
 
@@ -57,6 +66,100 @@ async def create_verification(
     return VerificationResponse.from_orm(verification)
 
 
+@router.post("/documents/upload", response_model=VerificationResponse)
+async def upload_verification_document(
+    request: Request,
+    response: Response,
+    document_type_id: int,
+    document_name: str = Query(..., max_length=255),
+    document_number: Optional[str] = Query(None, max_length=255),
+    issuing_authority: Optional[str] = Query(None, max_length=255),
+    content_type: str = Header(...),
+    content_length: Optional[int] = Header(None),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Upload a verification document as the raw request body.
+    
+    The body is streamed to storage (hashed on the way) rather than parsed
+    as multipart, so memory use doesn't grow with file size. Identical
+    documents are stored once.
+    """
+    document_type = await reference_data.get("verification_document_types", document_type_id)
+    if not document_type or document_type.is_active is False:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid document type"
+        )
+    
+    # Reject oversized uploads before reading the body when the size is declared
+    if content_length is not None and content_length > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds the {settings.MAX_FILE_SIZE} byte limit"
+        )
+    
+    try:
+        stored = await document_storage.save_stream(
+            request.stream(),
+            prefix=DOCUMENT_PREFIX,
+            max_size=settings.MAX_FILE_SIZE,
+            allowed_types=settings.ALLOWED_FILE_TYPES,
+            declared_type=content_type.split(";")[0].strip().lower()
+        )
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    
+    verification_service = VerificationService(db)
+    verification, created = await verification_service.create_uploaded_verification(
+        current_user.id,
+        document_type_id,
+        document_name,
+        stored,
+        document_number=document_number,
+        issuing_authority=issuing_authority
+    )
+    
+    if created:
+        response.status_code = status.HTTP_201_CREATED
+    return VerificationResponse.from_orm(verification)
+
+
+@router.get("/documents/{verification_id}/file")
+async def download_verification_document(
+    verification_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Download an uploaded verification document (owner or admin only)"""
+    verification_service = VerificationService(db)
+    verification = await verification_service.get_verification(verification_id)
+    
+    if (
+        not verification
+        or (verification.user_id != current_user.id and current_user.user_type != "admin")
+        or not verification.document_url.startswith(f"{DOCUMENT_PREFIX}/")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Verification not found"
+        )
+    
+    path = document_storage.path(verification.document_url)
+    if not path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document file not found"
+        )
+    
+    return FileResponse(
+        path,
+        media_type=verification.mime_type,
+        filename=verification.document_name,
+        headers={"Cache-Control": "private, no-store"}
+    )
+
+
 @router.get("/documents/{verification_id}", response_model=VerificationResponse)
 async def get_verification(
     verification_id: int,
@@ -159,17 +262,92 @@ async def create_background_check(
 
 
 # Admin routes
-@router.get("/admin/pending", response_model=List[VerificationResponse])
+@router.get("/admin/pending")
 async def get_pending_verifications(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get pending verifications for admin review"""
+    """Get pending verifications for admin review, oldest first (pass `pagination.next_cursor` back as `cursor`)"""
     verification_service = VerificationService(db)
-    verifications = await verification_service.get_pending_verifications()
+    verifications = await verification_service.get_pending_verifications(
+        limit=limit, cursor=cursor, admin_id=current_user.id
+    )
+    
+    return {
+        "success": True,
+        "message": "Pending verifications retrieved successfully",
+        "data": [VerificationResponse.from_orm(v) for v in verifications],
+        "pagination": {
+            "limit": limit,
+            "total": len(verifications),
+            "next_cursor": next_cursor(verifications, limit)
+        }
+    }
+
+
+@router.post("/admin/claim", response_model=List[VerificationResponse])
+async def claim_verifications(
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Claim the next pending verifications so no other admin reviews them"""
+    verification_service = VerificationService(db)
+    verifications = await verification_service.claim_verifications(current_user.id, limit)
     return [VerificationResponse.from_orm(v) for v in verifications]
 
 
+@router.post("/admin/{verification_id}/release")
+async def release_verification(
+    verification_id: int,
+    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Release a claimed verification back to the queue"""
+    verification_service = VerificationService(db)
+    success = await verification_service.release_verification(verification_id, current_user.id)
+    
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Verification not claimed by you"
+        )
+    
+    return {"message": "Verification released"}
+
+
+@router.post("/admin/approve", response_model=VerificationBatchResult)
+async def approve_verifications(
+    batch: VerificationBatchApprove,
+    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Approve several verification documents at once"""
+    verification_service = VerificationService(db)
+    updated = await verification_service.approve_verifications(
+        batch.verification_ids, current_user.id, batch.notes
+    )
+    skipped = sorted(set(batch.verification_ids) - set(updated))
+    return VerificationBatchResult(updated=updated, skipped=skipped)
+
+
+@router.post("/admin/reject", response_model=VerificationBatchResult)
+async def reject_verifications(
+    batch: VerificationBatchReject,
+    current_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Reject several verification documents at once"""
+    verification_service = VerificationService(db)
+    updated = await verification_service.reject_verifications(
+        batch.verification_ids, current_user.id, batch.reason
+    )
+    skipped = sorted(set(batch.verification_ids) - set(updated))
+    return VerificationBatchResult(updated=updated, skipped=skipped)
+
+
 @router.post("/admin/{verification_id}/approve")
 async def approve_verification(
     verification_id: int,
@@ -186,7 +364,7 @@ async def approve_verification(
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Verification not found"
+            detail="Verification not found, not pending, or claimed by another admin"
         )
     
     return {"message": "Verification approved"}
@@ -208,7 +386,7 @@ async def reject_verification(
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Verification not found"
+            detail="Verification not found, not pending, or claimed by another admin"
         )
     
     return {"message": "Verification rejected"}
@@ -216,10 +394,19 @@ async def reject_verification(
 
 @router.get("/admin/statistics")
 async def get_verification_statistics(
+    by_document_type: bool = False,
+    bucket: Optional[str] = Query(None, regex="^(day|week|month)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
     current_user: User = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get verification statistics for admin"""
     verification_service = VerificationService(db)
-    stats = await verification_service.get_verification_statistics()
+    stats = await verification_service.get_verification_statistics(
+        by_document_type=by_document_type,
+        bucket=bucket,
+        since=since,
+        until=until
+    )
     return stats
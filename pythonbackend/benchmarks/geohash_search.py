@@ -0,0 +1,96 @@
+"""
+Benchmark geohash prefix coverings for radius search (services/geo.py)
+
+Emulates the Postgres plan of SearchService.search_guards in memory: the
+B-tree range scan over profiles.geohash becomes bisect over sorted
+geohashes, followed by the same latitude and haversine checks.
+
+    python -m benchmarks.geohash_search [--guards N]
+"""
+
+import argparse
+import random
+import statistics
+import time
+from bisect import bisect_left
+
+from core.config import settings
+from services.geo import bounding_box, covering_cells, encode, haversine_km
+
+from benchmarks.guard_index import make_guards
+
+
+class SortedGeohashes:
+    """Guards sorted by geohash, like the partial B-tree index on profiles"""
+
+    def __init__(self, guards):
+        rows = sorted((encode(lat, lon), user_id, lat, lon) for user_id, lat, lon in guards)
+        self.keys = [row[0] for row in rows]
+        self.rows = rows
+
+    def search(self, latitude, longitude, radius_km):
+        """(ids within radius, rows read from the index)"""
+        cells = covering_cells(latitude, longitude, radius_km, max_cells=settings.GUARD_SEARCH_MAX_CELLS)
+        min_lat, max_lat, _, _ = bounding_box(latitude, longitude, radius_km)
+        found, read = set(), 0
+        for cell in cells:
+            # geohash >= cell AND geohash < cell || '~'
+            start, end = bisect_left(self.keys, cell), bisect_left(self.keys, cell + "~")
+            read += end - start
+            for _, user_id, lat, lon in self.rows[start:end]:
+                if min_lat <= lat <= max_lat and haversine_km(latitude, longitude, lat, lon) <= radius_km:
+                    found.add(user_id)
+        return found, read
+
+
+def full_scan(guards, latitude, longitude, radius_km):
+    return {user_id for user_id, lat, lon in guards if haversine_km(latitude, longitude, lat, lon) <= radius_km}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guards", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    guards, metros = make_guards(args.guards)
+    index = SortedGeohashes(guards)
+    rng = random.Random(3)
+    print(f"{args.guards:,} guards, at most {settings.GUARD_SEARCH_MAX_CELLS} prefixes per query")
+
+    misses = 0
+    for radius_km in (5, 25, 50):
+        indexed_ms, scan_ms, rows_read = [], [], []
+        for _ in range(args.queries):
+            lat, lon = rng.choice(metros)
+            lat, lon = rng.gauss(lat, 0.2), rng.gauss(lon, 0.2)
+
+            started = time.perf_counter()
+            found, read = index.search(lat, lon, radius_km)
+            indexed_ms.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            expected = full_scan(guards, lat, lon, radius_km)
+            scan_ms.append((time.perf_counter() - started) * 1000)
+
+            rows_read.append(read)
+            misses += len(expected - found)
+        rows = statistics.mean(rows_read)
+        print(
+            f"  {radius_km:>3} km: {rows:,.0f} rows read ({rows / args.guards:.1%}), "
+            f"{statistics.median(indexed_ms):.2f} ms vs full scan {statistics.median(scan_ms):.0f} ms"
+        )
+
+    # Coverings near the poles and across the antimeridian must not miss anyone
+    boundary = [(i, rng.uniform(-90, 90), rng.choice([-1, 1]) * rng.uniform(175, 180)) for i in range(5000)]
+    boundary += [(5000 + i, rng.choice([-1, 1]) * rng.uniform(85, 90), rng.uniform(-180, 180)) for i in range(5000)]
+    boundary_index = SortedGeohashes(boundary)
+    for user_id, lat, lon in rng.sample(boundary, 300):
+        radius_km = rng.choice([5, 50, 300])
+        found, _ = boundary_index.search(lat, lon, radius_km)
+        misses += len(full_scan(boundary, lat, lon, radius_km) - found)
+    print(f"  guards missed vs full scan: {misses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark the in-memory nearest-guard grid (services/guard_index.py)
+
+    python -m benchmarks.guard_index [--guards N] [--cell-degrees D]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+from services.geo import EARTH_RADIUS_KM
+from services.guard_index import GuardGridIndex
+
+
+def make_guards(count: int, seed: int = 7):
+    """70% of guards clustered around 50 metro areas, the rest uniform over land-ish latitudes"""
+    rng = random.Random(seed)
+    metros = [(rng.uniform(-45, 60), rng.uniform(-180, 180)) for _ in range(50)]
+    guards = []
+    for user_id in range(count):
+        if rng.random() < 0.7:
+            lat, lon = rng.choice(metros)
+            guards.append((user_id, min(max(rng.gauss(lat, 0.3), -90), 90), (rng.gauss(lon, 0.3) + 180) % 360 - 180))
+        else:
+            guards.append((user_id, rng.uniform(-60, 75), rng.uniform(-180, 180)))
+    return guards, metros
+
+
+class BruteForce:
+    """Vectorized haversine over every guard, as the reference answer"""
+
+    def __init__(self, guards):
+        self.ids = np.array([g[0] for g in guards])
+        self.lat = np.radians([g[1] for g in guards])
+        self.lon = np.radians([g[2] for g in guards])
+
+    def nearest(self, latitude, longitude, k, radius_km):
+        lat, lon = np.radians(latitude), np.radians(longitude)
+        a = np.sin((self.lat - lat) / 2) ** 2 + np.cos(lat) * np.cos(self.lat) * np.sin((self.lon - lon) / 2) ** 2
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+        order = np.lexsort((self.ids, distances))
+        return [int(self.ids[i]) for i in order[:k] if distances[i] <= radius_km]
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guards", type=int, default=1_000_000)
+    parser.add_argument("--cell-degrees", type=float, default=0.05)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--checks", type=int, default=100, help="queries compared with brute force")
+    args = parser.parse_args()
+
+    guards, metros = make_guards(args.guards)
+    index = GuardGridIndex(cell_degrees=args.cell_degrees)
+    _, build_ms = timed(index.build, guards)
+    print(f"{args.guards:,} guards, {args.cell_degrees} degree cells")
+    print(f"  build                      {build_ms / 1000:.2f} s")
+
+    rng = random.Random(11)
+    for label, radius_km in (("k=10 within 50km (metro)", 50), ("k=10 within 200km (metro)", 200)):
+        samples = []
+        for _ in range(args.queries):
+            lat, lon = rng.choice(metros)
+            samples.append(timed(index.nearest, rng.gauss(lat, 0.5), rng.gauss(lon, 0.5), 10, radius_km)[1])
+        samples.sort()
+        print(f"  {label:26} p50 {statistics.median(samples):.2f} ms, p99 {samples[int(len(samples) * 0.99)]:.2f} ms")
+
+    # Sparse and polar neighbourhoods, which used to walk most of the grid
+    for latitude, longitude, k, radius_km in ((80, 0, 10, 50), (85, 10, 10, 200), (89.99, 0, 5, 200), (-70, 0, 10, 200)):
+        _, elapsed = timed(index.nearest, latitude, longitude, k, radius_km)
+        print(f"  ({latitude}, {longitude}) k={k} {radius_km}km".ljust(29) + f"{elapsed:.2f} ms")
+
+    brute = BruteForce(guards)
+    mismatches = 0
+    for _ in range(args.checks):
+        query = (rng.uniform(-90, 90), rng.uniform(-180, 180), rng.choice([1, 10, 50]), rng.choice([10, 50, 200]))
+        if [user_id for user_id, _ in index.nearest(*query)] != brute.nearest(*query):
+            mismatches += 1
+    print(f"  brute-force mismatches     {mismatches} of {args.checks}")
+
+
+if __name__ == "__main__":
+    main()
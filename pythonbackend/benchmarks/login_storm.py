@@ -0,0 +1,183 @@
+"""
+Benchmark other endpoints' latency during a login storm (core/security.py)
+
+    python -m benchmarks.login_storm [--logins N] [--max-pending N]
+
+Runs a one-worker uvicorn server with a login route (PBKDF2 verify) and a
+cheap route, fires N concurrent logins at it from a second process, and
+probes the cheap route from this one. "inline" verifies on the event loop,
+as before the hashing pool; "pool" is verify_password from core.security.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException
+
+from core import security
+from core.config import settings
+
+PASSWORD = "correct horse battery staple"
+
+# Gap between probes of the cheap route (seconds)
+PROBE_INTERVAL = 0.005
+
+# Probing before the storm, for the baseline
+IDLE_SECONDS = 1.0
+
+
+def make_app(verify, hashed_password: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        if not await verify(PASSWORD, hashed_password):
+            raise HTTPException(status_code=401, detail="Incorrect email or password")
+        return {"ok": True}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def verify_inline(plain_password: str, hashed_password: str) -> bool:
+    """Hashing on the event loop (the behaviour before the hashing pool)"""
+    return security.pwd_context.verify(plain_password, hashed_password)
+
+
+def serve(mode: str, port: int, hashed_password: str, max_pending: int) -> None:
+    settings.PASSWORD_HASH_MAX_PENDING = max_pending
+    verify = verify_inline if mode == "inline" else security.verify_password
+    config = uvicorn.Config(make_app(verify, hashed_password), host="127.0.0.1", port=port, log_level="warning")
+    uvicorn.Server(config).run()
+
+
+def fire_logins(base_url: str, logins: int, results) -> None:
+    """Send `logins` concurrent logins and report (status counts, seconds)"""
+    async def run():
+        limits = httpx.Limits(max_connections=logins)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(client.post("/login") for _ in range(logins)))
+            return [response.status_code for response in responses], time.perf_counter() - started
+
+    codes, elapsed = asyncio.run(run())
+    statuses = {}
+    for code in codes:
+        statuses[code] = statuses.get(code, 0) + 1
+    results.put((statuses, elapsed))
+
+
+def probe(client: httpx.Client, keep_going) -> list:
+    """Latency of requests to the cheap route, one every PROBE_INTERVAL while `keep_going()`.
+
+    Latency is measured from when each request was due, so a stalled
+    server is charged for the requests that queued up behind the stall.
+    """
+    latencies = []
+    due = time.perf_counter()
+    while keep_going():
+        time.sleep(max(due - time.perf_counter(), 0))
+        client.get("/ping")
+        latencies.append(time.perf_counter() - due)
+        due += PROBE_INTERVAL
+    return latencies
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(client: httpx.Client, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            client.get("/ping")
+            return
+        except httpx.TransportError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def storm(mode: str, logins: int, hashed_password: str, max_pending: int):
+    """(idle probe latencies, storm probe latencies, login status counts, storm seconds)"""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = multiprocessing.Process(target=serve, args=(mode, port, hashed_password, max_pending), daemon=True)
+    server.start()
+    try:
+        with httpx.Client(base_url=base_url) as client:
+            wait_until_up(client)
+            idle_until = time.perf_counter() + IDLE_SECONDS
+            idle = probe(client, lambda: time.perf_counter() < idle_until)
+
+            results = multiprocessing.Queue()
+            storm_process = multiprocessing.Process(target=fire_logins, args=(base_url, logins, results))
+            storm_process.start()
+            during = probe(client, storm_process.is_alive)
+            statuses, elapsed = results.get()
+            storm_process.join()
+    finally:
+        server.terminate()
+        server.join()
+    return idle, during, statuses, elapsed
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def report(name: str, idle, during, statuses, elapsed) -> None:
+    codes = ", ".join(f"{count} x {code}" for code, count in sorted(statuses.items()))
+    print(f"  {name:<7} logins done in {elapsed:.2f} s ({codes})")
+    for label, latencies in (("idle", idle), ("storm", during)):
+        print(
+            f"          /ping {label:<6} p50 {percentile(latencies, 0.5) * 1000:7.2f} ms  "
+            f"p99 {percentile(latencies, 0.99) * 1000:7.2f} ms  "
+            f"max {max(latencies) * 1000:7.2f} ms  ({len(latencies)} probes)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument(
+        "--max-pending", type=int, default=settings.PASSWORD_HASH_MAX_PENDING,
+        help="PASSWORD_HASH_MAX_PENDING; logins beyond it are shed with 503"
+    )
+    args = parser.parse_args()
+
+    hashed_password = security.pwd_context.hash(PASSWORD)
+    started = time.perf_counter()
+    security.pwd_context.verify(PASSWORD, hashed_password)
+    verify_ms = (time.perf_counter() - started) * 1000
+
+    print(
+        f"{args.logins} concurrent logins, {verify_ms:.1f} ms per PBKDF2 verify, "
+        f"{settings.PASSWORD_HASH_WORKERS} hashing threads, max {args.max_pending} pending"
+    )
+    cpus = os.cpu_count() or 1
+    if cpus <= settings.PASSWORD_HASH_WORKERS:
+        # The pool moves hashing off the event loop, not off the CPU
+        print(
+            f"  note: only {cpus} CPU(s); the hashing threads compete with the event loop for them, "
+            f"so expect the pool's latency to stay high here"
+        )
+    for mode in ("inline", "pool"):
+        report(mode, *storm(mode, args.logins, hashed_password, args.max_pending))
+
+
+if __name__ == "__main__":
+    main()
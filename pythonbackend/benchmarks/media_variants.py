@@ -0,0 +1,73 @@
+"""
+Benchmark thumbnail and responsive variant rendering (services/media_processing.py)
+
+    python -m benchmarks.media_variants [--images N] [--workers N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from core.config import settings
+from services.media_processing import render_variants
+
+
+def make_sources(directory: str):
+    """A noisy 12MP camera-style JPEG (worst case for the encoder) and a small RGBA PNG"""
+    rng = np.random.default_rng(1)
+    photo = os.path.join(directory, "photo.jpg")
+    gradient = np.linspace(0, 255, 4000, dtype=np.float32)[None, :, None]
+    pixels = np.clip(gradient + rng.normal(0, 40, (3000, 4000, 3)), 0, 255).astype(np.uint8)
+    Image.fromarray(pixels, "RGB").save(photo, "JPEG", quality=90)
+
+    logo = os.path.join(directory, "logo.png")
+    pixels = rng.integers(0, 256, (600, 800, 4), dtype=np.uint8)
+    Image.fromarray(pixels, "RGBA").save(logo, "PNG")
+    return [("12MP noisy JPEG", photo), ("800x600 RGBA PNG", logo)]
+
+
+def render_once(source: str, out_dir: str) -> int:
+    written = render_variants(
+        source, out_dir, settings.MEDIA_VARIANT_WIDTHS, settings.MEDIA_THUMBNAIL_SIZE, settings.MEDIA_VARIANT_QUALITY
+    )
+    for _, path, _, _ in written:
+        os.remove(path)
+    return len(written)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=int, default=8, help="renders per source and mode")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"widths {settings.MEDIA_VARIANT_WIDTHS}, thumbnail {settings.MEDIA_THUMBNAIL_SIZE}px")
+        for label, source in make_sources(directory):
+            files = render_once(source, directory)  # warm up, and count outputs
+
+            started = time.perf_counter()
+            for _ in range(args.images):
+                render_once(source, directory)
+            serial = args.images / (time.perf_counter() - started)
+
+            with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                list(pool.map(render_once, [source] * args.workers, [directory] * args.workers))
+                started = time.perf_counter()
+                jobs = args.images * args.workers
+                list(pool.map(render_once, [source] * jobs, [directory] * jobs))
+                parallel = jobs / (time.perf_counter() - started)
+
+            print(
+                f"  {label:17} {files} files/image: {serial:.1f} images/s on one core, "
+                f"{parallel:.1f} images/s with {args.workers} processes"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark idle notification streams on one worker (services/notification_stream.py)
+
+    python -m benchmarks.notification_stream [--subscribers N] [--events N] [--tracemalloc]
+
+Opens N idle streams against a NotificationBroker, each looping like the
+/notifications/stream handler (queue wait with heartbeat, RecentIds dedupe),
+and reports their memory and the publish-to-receive latency of events fed
+through handle_notification: one user at a time, then a burst to everyone.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import time
+import tracemalloc
+
+from core.config import settings
+from services.notification_stream import NotificationBroker, RecentIds
+
+# Gap between single-user events (seconds)
+EVENT_INTERVAL = 0.001
+
+
+async def stream(broker: NotificationBroker, user_id: int, latencies: list) -> None:
+    """An idle client stream, recording how long each event took to arrive"""
+    with broker.subscribe(user_id) as queue:
+        sent = RecentIds(2 * settings.NOTIFICATION_STREAM_QUEUE_SIZE)
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                continue
+            if sent.add(event["id"]):
+                latencies.append(time.perf_counter() - event["published_at"])
+
+
+def payload(event_id: int, user_id: int) -> str:
+    """JSON as sent by the notifications insert trigger, plus the publish time"""
+    return json.dumps({
+        "id": event_id, "user_id": user_id, "type": "booking_confirmed",
+        "published_at": time.perf_counter()
+    })
+
+
+async def settle(latencies: list, expected: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while len(latencies) < expected:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{len(latencies)} of {expected} events delivered")
+        await asyncio.sleep(0.001)
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def report(name: str, latencies: list) -> None:
+    print(
+        f"  {name:<12} p50 {percentile(latencies, 0.5) * 1000:7.3f} ms  "
+        f"p99 {percentile(latencies, 0.99) * 1000:7.3f} ms  "
+        f"max {max(latencies) * 1000:7.3f} ms  ({len(latencies):,} events)"
+    )
+
+
+async def run(subscribers: int, events: int, trace: bool) -> None:
+    broker = NotificationBroker()
+    latencies = []
+
+    rss_before = peak_rss_mb()
+    if trace:
+        tracemalloc.start()
+    tasks = [asyncio.create_task(stream(broker, user_id, latencies)) for user_id in range(1, subscribers + 1)]
+    while broker.connection_count < subscribers:
+        await asyncio.sleep(0)
+    rss = peak_rss_mb() - rss_before
+    print(
+        f"{subscribers:,} idle streams: peak RSS +{rss:.1f} MiB "
+        f"({rss * 1024 / subscribers:.1f} KiB per stream)"
+    )
+    if trace:
+        # Python-level allocations only; tracing itself also inflates the RSS above
+        traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"  traced {traced / 2 ** 20:.1f} MiB ({traced / subscribers / 1024:.1f} KiB per stream)")
+
+    rng = random.Random(15)
+    event_id = 0
+    due = time.perf_counter()
+    for _ in range(events):
+        event_id += 1
+        broker.handle_notification(payload(event_id, rng.randint(1, subscribers)))
+        due += EVENT_INTERVAL
+        await asyncio.sleep(max(due - time.perf_counter(), 0))
+    await settle(latencies, events)
+    report("one user", latencies)
+
+    latencies.clear()
+    started = time.perf_counter()
+    for user_id in range(1, subscribers + 1):
+        event_id += 1
+        broker.handle_notification(payload(event_id, user_id))
+    published_s = time.perf_counter() - started
+    await settle(latencies, subscribers)
+    report("burst to all", latencies)
+    print(f"  burst published in {published_s * 1000:.1f} ms, last delivery {max(latencies) * 1000:.1f} ms after its publish")
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    assert broker.connection_count == 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=2000, help="single-user events")
+    parser.add_argument("--tracemalloc", action="store_true", help="also report traced Python allocations")
+    args = parser.parse_args()
+    asyncio.run(run(args.subscribers, args.events, args.tracemalloc))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark vectorized shift pricing (services/pricing_service.py)
+
+    python -m benchmarks.pricing [--guards N]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from core.config import settings
+from services.pricing_service import GuardRates, PricingService, price_shift, shift_hours
+
+VENUE_ZONE = ZoneInfo("America/New_York")
+# Friday 18:30 to Saturday 06:30 local, with the Saturday a holiday
+SHIFT_START = datetime(2026, 7, 3, 18, 30, tzinfo=VENUE_ZONE).astimezone(timezone.utc)
+SHIFT_END = datetime(2026, 7, 4, 6, 30, tzinfo=VENUE_ZONE).astimezone(timezone.utc)
+HOLIDAYS = [date(2026, 7, 4)]
+
+
+def make_rows(count: int, seed: int = 5):
+    """Rows shaped like PricingService.load_guard_rates results"""
+    rng = random.Random(seed)
+    return [
+        (
+            guard_id, rng.randint(1, 20), round(rng.uniform(25, 80), 2), float(rng.choice([1, 2, 4, 8])),
+            float(rng.choice([8, 12, 16, 24])), rng.choice([1.0, 1.25, 1.5]), rng.choice([1.5, 2.0]),
+            rng.choice([1.0, 1.2, 1.5]), rng.choice([1.5, 2.0, 3.0]), 1.0, rng.choice([1.0, 1.1]), 1.0
+        )
+        for guard_id in range(1, count + 1)
+    ]
+
+
+def scalar_total(row, emergency=False, factor=1.0):
+    """Minute-by-minute reference price for one guard row (security event)"""
+    _, _, base, minimum, _, weekend, holiday, night, emergency_rate, _, _, security = row
+    weighted = 0.0
+    minute = SHIFT_START
+    while minute < SHIFT_END:
+        local = minute.astimezone(VENUE_ZONE)
+        if local.date() in HOLIDAYS:
+            rate = holiday
+        elif local.weekday() >= 5:
+            rate = weekend
+        else:
+            rate = 1.0
+        if local.hour >= settings.PRICING_NIGHT_START_HOUR or local.hour < settings.PRICING_NIGHT_END_HOUR:
+            rate *= night
+        weighted += rate / 60
+        minute += timedelta(minutes=1)
+    hours = (SHIFT_END - SHIFT_START).total_seconds() / 3600
+    multiplier = security * factor * (emergency_rate if emergency else 1.0)
+    return round(base * (weighted + max(minimum - hours, 0.0)) * multiplier, 2)
+
+
+def loop_prices(rows, shift):
+    """Per-guard Python loop over the same segment table, for comparison"""
+    totals = []
+    hours = shift.total
+    for row in rows:
+        _, _, base, minimum, _, weekend, holiday, night, _, _, _, security = row
+        weighted = 0.0
+        for day_kind, day_rate in enumerate((1.0, weekend, holiday)):
+            weighted += shift.hours[day_kind, 0] * day_rate + shift.hours[day_kind, 1] * day_rate * night
+        totals.append(round(base * (weighted + max(minimum - hours, 0.0)) * security, 2))
+    return totals
+
+
+class InMemoryPricingService(PricingService):
+    """PricingService over preloaded rows instead of Postgres"""
+
+    def __init__(self, rows):
+        super().__init__(db=None)
+        self.rows = rows
+
+    async def load_guard_rates(self, *args, **kwargs) -> GuardRates:
+        return GuardRates.from_rows(self.rows)
+
+    async def global_factor(self) -> float:
+        return 1.0
+
+    async def event_adjustment(self, event_type_id) -> str:
+        return "security"
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guards", type=int, default=10_000)
+    parser.add_argument("--checks", type=int, default=300, help="guards compared with the minute-by-minute reference")
+    args = parser.parse_args()
+
+    settings.PRICING_HOLIDAYS = [day.isoformat() for day in HOLIDAYS]
+    rows = make_rows(args.guards)
+    shift = shift_hours(
+        SHIFT_START, SHIFT_END, VENUE_ZONE, HOLIDAYS, settings.PRICING_NIGHT_START_HOUR, settings.PRICING_NIGHT_END_HOUR
+    )
+    rates = GuardRates.from_rows(rows)
+
+    print(f"{args.guards:,} guards, 12-hour Fri 18:30 to Sat 06:30 shift over a holiday")
+    _, elapsed = best_of(lambda: GuardRates.from_rows(rows))
+    print(f"  rows -> arrays             {elapsed:.2f} ms")
+    quotes, vectorized = best_of(lambda: price_shift(rates, shift))
+    totals, looped = best_of(lambda: loop_prices(rows, shift), repeat=2)
+    print(f"  price_shift                {vectorized:.2f} ms (per-guard Python loop: {looped:.0f} ms)")
+
+    service = InMemoryPricingService(rows)
+    for limit in (100, None):
+        _, elapsed = best_of(lambda: asyncio.run(service.quote(SHIFT_START, SHIFT_END, "America/New_York", limit=limit)))
+        print(f"  quote() without the DB     {elapsed:.1f} ms (limit {limit or 'none'})")
+
+    # Exact half-cent totals (e.g. 584.685) may round either way depending on
+    # float operation order, so one cent of difference is allowed
+    sample = random.Random(9).sample(range(len(rows)), min(args.checks, len(rows)))
+    off = sum(abs(quotes.totals[i] - scalar_total(rows[i])) > 0.01 + 1e-9 for i in sample)
+    off_loop = sum(abs(quotes.totals[i] - totals[i]) > 0.01 + 1e-9 for i in range(len(rows)))
+    print(f"  off by more than a cent    {off} of {len(sample)} vs minute-by-minute, {off_loop} vs the loop")
+
+
+if __name__ == "__main__":
+    main()
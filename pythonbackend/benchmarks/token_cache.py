@@ -0,0 +1,95 @@
+"""
+Benchmark JWT verification with and without the token cache (core/security.py)
+
+    python -m benchmarks.token_cache [--tokens N] [--rate N] [--seconds N]
+
+Requests carry one of N live access tokens (one per signed-in user). "decode"
+runs jwt.decode on every request, as before the cache; "cached" is
+verify_token. Both are timed flat out and then paced at --rate requests per
+second, where the share of one CPU spent verifying is reported.
+"""
+
+import argparse
+import random
+import time
+
+from jose import jwt
+
+from core import security
+from core.config import settings
+
+# Requests handled per pacing tick at the target rate
+TICK_SECONDS = 0.01
+
+
+def decode(token: str) -> dict:
+    """Reference: decode and check the signature on every request"""
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+def per_call_us(fn, requests) -> float:
+    started = time.perf_counter()
+    for token in requests:
+        fn(token)
+    return (time.perf_counter() - started) / len(requests) * 1e6
+
+
+def paced_cpu(fn, requests, rate: int, seconds: float) -> float:
+    """Share of one CPU spent in `fn` while serving `rate` requests per second"""
+    per_tick = max(int(rate * TICK_SECONDS), 1)
+    ticks = int(seconds / TICK_SECONDS)
+    position = 0
+    cpu_started = time.process_time()
+    wall_started = due = time.perf_counter()
+    for _ in range(ticks):
+        for _ in range(per_tick):
+            fn(requests[position])
+            position = (position + 1) % len(requests)
+        due += TICK_SECONDS
+        time.sleep(max(due - time.perf_counter(), 0))
+    return (time.process_time() - cpu_started) / (time.perf_counter() - wall_started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=2000, help="live tokens in the request mix")
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--rate", type=int, default=5000, help="requests per second for the paced run")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    tokens = [
+        security.create_access_token({"sub": user_id, "role": "consumer"})
+        for user_id in range(1, args.tokens + 1)
+    ]
+    rng = random.Random(8)
+    requests = [rng.choice(tokens) for _ in range(args.requests)]
+
+    for token in tokens[:100]:
+        assert security.verify_token(token) == decode(token)
+
+    print(
+        f"{args.tokens:,} live tokens, {args.requests:,} requests, "
+        f"cache holds {settings.TOKEN_CACHE_MAX_SIZE:,}"
+    )
+    security.token_cache.clear()
+    decode_us = per_call_us(decode, requests)
+    security.token_cache.clear()
+    security.token_cache.hits = security.token_cache.misses = 0
+    cached_us = per_call_us(security.verify_token, requests)
+    hit_rate = security.token_cache.hit_rate
+    print(f"  decode  {decode_us:7.2f} us/request")
+    print(f"  cached  {cached_us:7.2f} us/request ({hit_rate:.1%} hits)  {decode_us / cached_us:.1f}x faster")
+
+    print(f"At {args.rate:,} requests/s for {args.seconds:g} s (share of one CPU):")
+    # The pacing loop's own cost, to subtract from the others
+    idle = paced_cpu(lambda token: None, requests, args.rate, args.seconds)
+    print(f"  no-op   {idle:6.1%}")
+    security.token_cache.clear()
+    for name, fn in (("decode", decode), ("cached", security.verify_token)):
+        cpu = paced_cpu(fn, requests, args.rate, args.seconds)
+        print(f"  {name:<7} {cpu:6.1%}  ({cpu - idle:.1%} verifying)")
+
+
+if __name__ == "__main__":
+    main()
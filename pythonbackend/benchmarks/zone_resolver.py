@@ -0,0 +1,82 @@
+"""
+Benchmark pricing zone lookup (services/zone_resolver.py)
+
+    python -m benchmarks.zone_resolver [--zones N]
+"""
+
+import argparse
+import random
+import time
+
+from services.geo import haversine_km
+from services.zone_resolver import KM_PER_MILE, PricingZoneResolver
+
+
+def make_zones(count: int, seed: int = 2):
+    """(id, lat, lon, radius_km) circles of 5-50 miles, some straddling the antimeridian"""
+    rng = random.Random(seed)
+    zones = []
+    for zone_id in range(1, count + 1):
+        lon = rng.choice([-1, 1]) * rng.uniform(178, 180) if zone_id % 20 == 0 else rng.uniform(-180, 180)
+        zones.append((zone_id, rng.uniform(-60, 70), lon, rng.uniform(5, 50) * KM_PER_MILE))
+    return zones
+
+
+def linear_scan(zones, latitude, longitude):
+    """Reference answer: the containing zone with the nearest center"""
+    best = None
+    for zone_id, center_lat, center_lon, radius_km in zones:
+        distance = haversine_km(latitude, longitude, center_lat, center_lon)
+        if distance <= radius_km and (best is None or (distance, zone_id) < best):
+            best = (distance, zone_id)
+    return best[1] if best else None
+
+
+def per_call_us(fn, points):
+    started = time.perf_counter()
+    for latitude, longitude in points:
+        fn(latitude, longitude)
+    return (time.perf_counter() - started) / len(points) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--zones", type=int, default=2000)
+    parser.add_argument("--points", type=int, default=3000)
+    args = parser.parse_args()
+
+    zones = make_zones(args.zones)
+    resolver = PricingZoneResolver()
+    started = time.perf_counter()
+    resolver.build(zones)
+    build_s = time.perf_counter() - started
+
+    rng = random.Random(4)
+    # Points near zone centers, so most resolve to a zone, plus uniform ones
+    points = []
+    for _ in range(args.points):
+        if rng.random() < 0.7:
+            _, lat, lon, radius_km = rng.choice(zones)
+            lat = max(min(lat + rng.uniform(-1, 1) * radius_km / 111, 90), -90)
+            lon = (lon + rng.uniform(-1, 1) * radius_km / 80 + 180) % 360 - 180
+            points.append((round(lat, 6), round(lon, 6)))
+        else:
+            points.append((round(rng.uniform(-90, 90), 6), round(rng.uniform(-180, 180), 6)))
+
+    print(f"{args.zones:,} zones of 5-50 miles, {resolver.stats()['cells']:,} grid cells")
+    print(f"  build         {build_s:.2f} s")
+    print(f"  cache miss    {per_call_us(resolver.resolve, points):.1f} us")
+    print(f"  cache hit     {per_call_us(resolver.resolve, points):.1f} us")
+    scan_us = per_call_us(lambda lat, lon: linear_scan(zones, lat, lon), points[:300])
+    print(f"  linear scan   {scan_us / 1000:.2f} ms")
+
+    # The cache key is rounded to PRICING_ZONE_COORDINATE_DECIMALS; compare on the same point
+    mismatches = sum(
+        resolver.resolve(lat, lon) != linear_scan(zones, round(lat, 4), round(lon, 4)) for lat, lon in points
+    )
+    resolved = sum(resolver.resolve(lat, lon) is not None for lat, lon in points)
+    print(f"  mismatches    {mismatches} of {len(points)} ({resolved} inside a zone)")
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,9 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    TOKEN_CACHE_MAX_SIZE: int = 10000
     
     # CORS
     ALLOWED_HOSTS: List[str] = ["*"]
@@ -42,7 +45,43 @@ class Settings(BaseSettings):
     # File Upload
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     UPLOAD_DIR: str = "uploads"
-    ALLOWED_FILE_TYPES: List[str] = ["image/jpeg", "image/png", "image/gif", "video/mp4", "video/quicktime"]
+    # Verification documents are never served from the public /uploads mount
+    PRIVATE_UPLOAD_DIR: str = "private_uploads"
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    ALLOWED_FILE_TYPES: List[str] = [
+        "image/jpeg", "image/png", "image/gif", "video/mp4", "video/quicktime", "application/pdf"
+    ]
+    # Post media storage backend ("local" writes under UPLOAD_DIR, served at MEDIA_BASE_URL;
+    # the job worker renders variants from the same files, so it needs UPLOAD_DIR too)
+    MEDIA_STORAGE_BACKEND: str = "local"
+    MEDIA_BASE_URL: str = "/uploads"
+    MAX_MEDIA_PER_POST: int = 10
+    # Resized copies generated for uploaded images (WebP widths in pixels, JPEG thumbnail)
+    MEDIA_VARIANT_WIDTHS: List[int] = [320, 640, 1080]
+    MEDIA_THUMBNAIL_SIZE: int = 256
+    MEDIA_VARIANT_QUALITY: int = 80
+    MEDIA_PROCESS_WORKERS: int = 0  # processes for image resizing; 0 = one per CPU
+    
+    # Guard search
+    GUARD_SEARCH_MAX_RADIUS_KM: float = 200.0
+    GUARD_SEARCH_MAX_CELLS: int = 16  # geohash prefixes per query
+    # In-memory index of available guard locations (services/guard_index.py)
+    GUARD_INDEX_ENABLED: bool = True
+    GUARD_INDEX_CELL_DEGREES: float = 0.05  # ~5.5km cells
+    GUARD_INDEX_REFRESH_SECONDS: int = 30
+    GUARD_INDEX_REBUILD_SECONDS: int = 3600
+    GUARD_INDEX_MAX_STALENESS_SECONDS: int = 120
+    
+    # Quotes (services/pricing_service.py)
+    PRICING_NIGHT_START_HOUR: int = 22  # night-shift multiplier applies from 10 PM...
+    PRICING_NIGHT_END_HOUR: int = 6  # ...until 6 AM, in the venue's local time
+    PRICING_HOLIDAYS: List[str] = []  # ISO dates billed at the holiday multiplier
+    PRICING_MAX_QUOTE_GUARDS: int = 10000
+    BOOKING_PLATFORM_FEE_RATE: float = 0.0  # share of a booking's quoted total charged as the platform fee
+    # Point-in-zone lookup (services/zone_resolver.py)
+    PRICING_ZONE_CELL_DEGREES: float = 0.1  # ~11km grid cells
+    PRICING_ZONE_COORDINATE_DECIMALS: int = 4  # cache key precision (~11m)
+    PRICING_ZONE_CACHE_SIZE: int = 65536
     
     # Email
     SMTP_HOST: Optional[str] = None
@@ -50,9 +89,32 @@ class Settings(BaseSettings):
     SMTP_USERNAME: Optional[str] = None
     SMTP_PASSWORD: Optional[str] = None
     SMTP_USE_TLS: bool = True
+    SMTP_TIMEOUT_SECONDS: int = 30
+    SMTP_IDLE_TIMEOUT_SECONDS: int = 60
+    EMAIL_QUEUE_MAX_SIZE: int = 1000
+    EMAIL_BATCH_SIZE: int = 50
     
-    # Redis (for caching and sessions)
+    # Redis (for caching and sessions; optional, needs the redis package)
     REDIS_URL: str = "redis://localhost:6379"
+    REDIS_ENABLED: bool = False
+    
+    # Authenticated user cache
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_SIZE: int = 10000
+    
+    # Unread notification count cache
+    NOTIFICATION_COUNT_CACHE_TTL_SECONDS: int = 60
+    NOTIFICATION_COUNT_CACHE_MAX_SIZE: int = 10000
+    
+    # Live notification streams (SSE / WebSocket)
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: int = 25
+    
+    # Admin verification statistics cache
+    VERIFICATION_STATS_CACHE_TTL_SECONDS: int = 30
+    
+    # Admin review queue lease
+    VERIFICATION_CLAIM_MINUTES: int = 15
     
     # Payment Providers
     STRIPE_SECRET_KEY: Optional[str] = None
@@ -73,15 +135,45 @@ class Settings(BaseSettings):
     GOOGLE_MAPS_API_KEY: Optional[str] = None
     TWILIO_ACCOUNT_SID: Optional[str] = None
     TWILIO_AUTH_TOKEN: Optional[str] = None
-    
-    # Rate Limiting
+    TWILIO_FROM_NUMBER: Optional[str] = None
+    SMS_TIMEOUT_SECONDS: float = 10.0
+    
+    # Background jobs (see worker.py)
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_BATCH_SIZE: int = 10
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: int = 10
+    JOB_RETRY_MAX_SECONDS: int = 3600
+    JOB_LOCK_TIMEOUT_SECONDS: int = 300
+    JOB_SWEEP_INTERVAL_SECONDS: int = 60
+    
+    # Reference data cache (reloaded on NOTIFY; this is the fallback refresh)
+    REFERENCE_DATA_REFRESH_SECONDS: int = 300
+    
+    # Rate Limiting (shared across workers when Redis is enabled)
+    RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_BURST: int = 10
+    # Proxies whose X-Forwarded-For entries are believed (IPs or CIDRs); the
+    # defaults cover loopback and the private networks platform load
+    # balancers connect from
+    RATE_LIMIT_TRUSTED_PROXIES: List[str] = [
+        "127.0.0.0/8", "::1/128", "10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16", "fc00::/7"
+    ]
     
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
     
+    # Trending feed
+    TRENDING_HALF_LIFE_HOURS: float = 24.0
+    TRENDING_DECAY_INTERVAL_SECONDS: int = 300
+    TRENDING_MIN_SCORE: float = 0.01
+    
+    # Write-behind engagement counters (batch like/comment count updates)
+    ENGAGEMENT_BUFFER_ENABLED: bool = False
+    ENGAGEMENT_FLUSH_INTERVAL_MS: int = 500
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -97,5 +189,6 @@ class Settings(BaseSettings):
 # Create settings instance
 settings = Settings()
 
-# Ensure upload directory exists
+# Ensure upload directories exist
 Path(settings.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
+Path(settings.PRIVATE_UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,63 @@
+"""
+Pagination utilities (offset and keyset/cursor modes)
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, desc, tuple_
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a (created_at, id) position as an opaque cursor"""
+    raw = json.dumps({"c": created_at.isoformat(), "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode an opaque cursor back into a (created_at, id) position"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["c"]), int(data["i"])
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def paginate(
+    query: Select, model, skip: int = 0, limit: int = 20,
+    cursor: Optional[str] = None, descending: bool = True
+) -> Select:
+    """Order a query by (created_at, id) and apply a page window.
+
+    With a cursor the page starts right after the cursor position
+    (keyset pagination, served by a (created_at, id) index); otherwise
+    the classic offset is used.
+    """
+    if cursor:
+        position = tuple_(*decode_cursor(cursor))
+        columns = tuple_(model.created_at, model.id)
+        query = query.where(columns < position if descending else columns > position)
+    elif skip:
+        query = query.offset(skip)
+
+    if descending:
+        query = query.order_by(desc(model.created_at), desc(model.id))
+    else:
+        query = query.order_by(model.created_at, model.id)
+
+    return query.limit(limit)
+
+
+def next_cursor(rows: Sequence, limit: int) -> Optional[str]:
+    """Cursor for the page after `rows`, or None when this is the last page"""
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor(last.created_at, last.id)
@@ -0,0 +1,207 @@
+"""
+Rate limiting (GCRA) with in-memory and Redis backends
+"""
+
+import ipaddress
+import json
+import logging
+import math
+import time
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+
+from core.config import settings
+from core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Idle keys are swept from the in-memory backend at most this often (seconds)
+SWEEP_INTERVAL = 60.0
+
+# Atomic GCRA step: KEYS[1] holds the key's theoretical arrival time (TAT)
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+if tat - now > tolerance then
+    return {0, math.ceil((tat - now - tolerance) * 1000)}
+end
+local new_tat = tat + interval
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, 0}
+"""
+
+
+def _gcra_params(rate: int, period: float, burst: int) -> Tuple[float, float]:
+    """Emission interval and burst tolerance for `rate` requests per `period`"""
+    interval = period / max(rate, 1)
+    tolerance = interval * (max(burst, 1) - 1)
+    return interval, tolerance
+
+
+class MemoryRateLimitBackend:
+    """Per-process GCRA state: one float per active key"""
+
+    def __init__(self):
+        self._tat: Dict[str, float] = {}
+        self._last_sweep = time.monotonic()
+
+    async def hit(self, key: str, interval: float, tolerance: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        self._sweep(now)
+
+        tat = max(self._tat.get(key, now), now)
+        if tat - now > tolerance:
+            return False, tat - now - tolerance
+
+        self._tat[key] = tat + interval
+        return True, 0.0
+
+    def _sweep(self, now: float) -> None:
+        """Drop keys whose TAT has passed; they are indistinguishable from new keys"""
+        if now - self._last_sweep < SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+        self._tat = {key: tat for key, tat in self._tat.items() if tat > now}
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+class RedisRateLimitBackend:
+    """GCRA state shared by all workers through an atomic Lua script"""
+
+    def __init__(self, redis):
+        self._script = redis.register_script(GCRA_SCRIPT)
+
+    async def hit(self, key: str, interval: float, tolerance: float) -> Tuple[bool, float]:
+        allowed, retry_after_ms = await self._script(
+            keys=[f"ratelimit:{key}"], args=[interval, tolerance]
+        )
+        return bool(allowed), retry_after_ms / 1000
+
+
+class RateLimiter:
+    """Rate limiter using the generic cell rate algorithm (fixed-size state per key)"""
+
+    def __init__(self):
+        self._memory = MemoryRateLimitBackend()
+        self._redis_backend = None
+
+    def _backend(self):
+        redis = get_redis()
+        if redis is None:
+            return self._memory
+        if self._redis_backend is None:
+            self._redis_backend = RedisRateLimitBackend(redis)
+        return self._redis_backend
+
+    async def hit(self, key: str, rate: int, period: float = 60, burst: int = 1) -> Tuple[bool, float]:
+        """Count a request for `key`; returns (allowed, seconds until the next one is allowed)"""
+        interval, tolerance = _gcra_params(rate, period, burst)
+        backend = self._backend()
+        try:
+            return await backend.hit(key, interval, tolerance)
+        except Exception as e:
+            if backend is self._memory:
+                raise
+            # Keep limiting locally while Redis is unavailable
+            logger.error(f"Redis rate limiter error, using in-memory state: {e}")
+            return await self._memory.hit(key, interval, tolerance)
+
+
+rate_limiter = RateLimiter()
+
+
+@lru_cache(maxsize=4)
+def _trusted_networks(cidrs: Tuple[str, ...]) -> tuple:
+    return tuple(ipaddress.ip_network(cidr, strict=False) for cidr in cidrs)
+
+
+def _is_trusted(host: str, networks: Sequence) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+
+def client_ip(scope) -> str:
+    """IP address a request came from, as used for rate limiting.
+
+    Starting from the connecting peer, hops are read right to left through
+    X-Forwarded-For while they belong to RATE_LIMIT_TRUSTED_PROXIES; the
+    first untrusted hop is the client. Entries left of it were written by
+    the client and are ignored, so a forged leading hop can't pick the key.
+    """
+    client = scope.get("client")
+    hops = [client[0] if client else "unknown"]
+
+    forwarded_for = ",".join(
+        value.decode("latin1") for name, value in scope.get("headers", ()) if name == b"x-forwarded-for"
+    )
+    if forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()] + hops
+
+    networks = _trusted_networks(tuple(settings.RATE_LIMIT_TRUSTED_PROXIES))
+    for hop in reversed(hops):
+        if not _is_trusted(hop, networks):
+            return hop
+    # Every hop is a trusted proxy, so the request started inside them
+    return hops[0]
+
+
+class RateLimitMiddleware:
+    """ASGI middleware applying RATE_LIMIT_PER_MINUTE / RATE_LIMIT_BURST per client IP.
+
+    The client IP comes from `client_ip`, which only believes X-Forwarded-For
+    entries added by RATE_LIMIT_TRUSTED_PROXIES (the platform load balancer).
+    """
+
+    exempt_paths = ("/health",)
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in self.exempt_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        allowed, retry_after = await rate_limiter.hit(
+            f"ip:{client_ip(scope)}",
+            rate=settings.RATE_LIMIT_PER_MINUTE,
+            period=60,
+            burst=settings.RATE_LIMIT_BURST
+        )
+
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({
+            "success": False,
+            "message": "Rate limit exceeded",
+            "data": None,
+            "errors": [],
+            "timestamp": None
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,45 @@
+"""
+Optional shared Redis client
+"""
+
+import logging
+from typing import Optional
+
+from core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis is optional; callers fall back to in-process state
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_warned_missing = False
+
+
+def get_redis() -> Optional["aioredis.Redis"]:
+    """Shared Redis client, or None when Redis is disabled or not installed"""
+    global _client, _warned_missing
+
+    if not settings.REDIS_ENABLED:
+        return None
+
+    if aioredis is None:
+        if not _warned_missing:
+            logger.warning("REDIS_ENABLED is set but the redis package is not installed")
+            _warned_missing = True
+        return None
+
+    if _client is None:
+        _client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client if one was created"""
+    global _client
+
+    if _client is not None:
+        await _client.close()
+        _client = None
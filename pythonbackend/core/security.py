@@ -2,6 +2,11 @@
 Security utilities for authentication and authorization
 """
 
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
@@ -12,24 +17,57 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from core.config import settings
-from db.session import get_db
+from core.cache import TTLCache
+from core.redis_client import get_redis
+from db.session import get_db, AsyncSessionLocal
 from db.models.user import User
 
 # Password hashing - using pbkdf2_sha256 instead of bcrypt to avoid Rust compilation issues
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
+# PBKDF2 is deliberately slow, so hashing runs on a bounded thread pool
+# (hashlib releases the GIL) instead of blocking the event loop
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_hash_pending = 0
+
+# Decoded JWT payloads keyed on the token digest, kept until the token expires
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_SIZE)
+
 # JWT token scheme
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def _run_password_hashing(func, *args):
+    """Run a hashing call on the hashing pool, shedding load when the queue is full"""
+    global _hash_pending
+    
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again",
+            headers={"Retry-After": "1"},
+        )
+    
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return await _run_password_hashing(pwd_context.verify, plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return await _run_password_hashing(pwd_context.hash, password)
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -64,24 +102,116 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
 
 
 def verify_token(token: str) -> Dict[str, Any]:
-    """Verify and decode a JWT token"""
+    """Verify and decode a JWT token (cached per token until its expiry)"""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        remaining = exp - time.time()
+        if remaining > 0:
+            token_cache.set(key, payload, ttl=remaining)
+    
+    return dict(payload)
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get the current authenticated user"""
-    token = credentials.credentials
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Identity of the authenticated user, as needed for authorization"""
+    id: int
+    user_type: str
+    is_active: bool
+
+
+class UserPrincipalCache:
+    """Short-TTL cache of user principals (in-process LRU, optionally backed by Redis)"""
+    
+    def __init__(self):
+        self._local = TTLCache(
+            maxsize=settings.USER_CACHE_MAX_SIZE,
+            ttl=settings.USER_CACHE_TTL_SECONDS
+        )
+    
+    @staticmethod
+    def _redis_key(user_id: int) -> str:
+        return f"auth:principal:{user_id}"
+    
+    async def get(self, user_id: int) -> Optional[UserPrincipal]:
+        """Get a cached principal, or None on a miss"""
+        principal = self._local.get(user_id)
+        if principal is not None:
+            return principal
+        
+        redis = get_redis()
+        if redis is None:
+            return None
+        
+        try:
+            data = await redis.hgetall(self._redis_key(user_id))
+        except Exception as e:
+            print(f"Error reading user cache: {e}")
+            return None
+        
+        if not data:
+            return None
+        
+        principal = UserPrincipal(
+            id=int(data["id"]),
+            user_type=data["user_type"],
+            is_active=data["is_active"] == "1"
+        )
+        self._local.set(user_id, principal)
+        return principal
+    
+    async def set(self, principal: UserPrincipal) -> None:
+        """Cache a principal"""
+        self._local.set(principal.id, principal)
+        
+        redis = get_redis()
+        if redis is None:
+            return
+        
+        key = self._redis_key(principal.id)
+        try:
+            await redis.hset(key, mapping={
+                "id": principal.id,
+                "user_type": principal.user_type,
+                "is_active": "1" if principal.is_active else "0"
+            })
+            await redis.expire(key, settings.USER_CACHE_TTL_SECONDS)
+        except Exception as e:
+            print(f"Error writing user cache: {e}")
+    
+    async def invalidate(self, user_id: int) -> None:
+        """Drop a user's cached principal (call when activation or role changes)"""
+        self._local.pop(user_id)
+        
+        redis = get_redis()
+        if redis is None:
+            return
+        
+        try:
+            await redis.delete(self._redis_key(user_id))
+        except Exception as e:
+            print(f"Error invalidating user cache: {e}")
+
+
+user_principal_cache = UserPrincipalCache()
+
+
+async def get_principal_for_token(token: str, db: Optional[AsyncSession] = None) -> UserPrincipal:
+    """Resolve an access token to an active principal (opens a session on a cache miss if `db` is None)"""
     payload = verify_token(token)
     
     user_id_str = payload.get("sub")
@@ -101,28 +231,70 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user from database
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    principal = await user_principal_cache.get(user_id)
     
-    if user is None:
+    if principal is None:
+        # Get user from database
+        query = select(User.id, User.user_type, User.is_active).where(User.id == user_id)
+        if db is None:
+            async with AsyncSessionLocal() as session:
+                row = (await session.execute(query)).one_or_none()
+        else:
+            row = (await db.execute(query)).one_or_none()
+        
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        principal = UserPrincipal(
+            id=row.id,
+            user_type=row.user_type,
+            is_active=bool(row.is_active)
+        )
+        await user_principal_cache.set(principal)
+    
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+            detail="Inactive user",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if not user.is_active:
+    return principal
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> UserPrincipal:
+    """Get the current authenticated user (served from cache when warm)"""
+    return await get_principal_for_token(credentials.credentials, db)
+
+
+async def get_current_stream_user(
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> UserPrincipal:
+    """Authenticate a long-lived stream by Bearer header or `?token=` (EventSource can't set headers).
+    
+    Unlike get_current_user this doesn't hold a pooled session for the
+    lifetime of the response.
+    """
+    if credentials is not None:
+        token = credentials.credentials
+    if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Inactive user",
+            detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    return user
+    return await get_principal_for_token(token)
 
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: UserPrincipal = Depends(get_current_user)) -> UserPrincipal:
     """Get the current active user"""
     if not current_user.is_active:
         raise HTTPException(
@@ -132,7 +304,7 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     return current_user
 
 
-async def get_current_guard_user(current_user: User = Depends(get_current_active_user)) -> User:
+async def get_current_guard_user(current_user: UserPrincipal = Depends(get_current_active_user)) -> UserPrincipal:
     """Get the current user if they are a guard"""
     if current_user.user_type != "guard":
         raise HTTPException(
@@ -142,7 +314,7 @@ async def get_current_guard_user(current_user: User = Depends(get_current_active
     return current_user
 
 
-async def get_current_consumer_user(current_user: User = Depends(get_current_active_user)) -> User:
+async def get_current_consumer_user(current_user: UserPrincipal = Depends(get_current_active_user)) -> UserPrincipal:
     """Get the current user if they are a consumer"""
     if current_user.user_type != "consumer":
         raise HTTPException(
@@ -152,7 +324,7 @@ async def get_current_consumer_user(current_user: User = Depends(get_current_act
     return current_user
 
 
-async def get_current_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
+async def get_current_admin_user(current_user: UserPrincipal = Depends(get_current_active_user)) -> UserPrincipal:
     """Get the current user if they are an admin"""
     if current_user.user_type != "admin":
         raise HTTPException(
@@ -162,7 +334,7 @@ async def get_current_admin_user(current_user: User = Depends(get_current_active
     return current_user
 
 
-def check_permissions(user: User, required_permissions: list) -> bool:
+def check_permissions(user: UserPrincipal, required_permissions: list) -> bool:
     """Check if user has required permissions"""
     # This is a simplified permission system
     # In a real application, you might have a more complex permission system
@@ -180,7 +352,7 @@ def check_permissions(user: User, required_permissions: list) -> bool:
 
 def require_permissions(required_permissions: list):
     """Decorator to require specific permissions"""
-    def permission_checker(current_user: User = Depends(get_current_active_user)):
+    def permission_checker(current_user: UserPrincipal = Depends(get_current_active_user)):
         if not check_permissions(current_user, required_permissions):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -191,39 +363,16 @@ def require_permissions(required_permissions: list):
 
 
 # Rate limiting utilities
-from collections import defaultdict
-import time
-
-class RateLimiter:
-    """Simple in-memory rate limiter"""
-    
-    def __init__(self):
-        self.requests = defaultdict(list)
-    
-    def is_allowed(self, key: str, limit: int, window: int) -> bool:
-        """Check if request is allowed based on rate limit"""
-        now = time.time()
-        window_start = now - window
-        
-        # Clean old requests
-        self.requests[key] = [req_time for req_time in self.requests[key] if req_time > window_start]
-        
-        # Check if under limit
-        if len(self.requests[key]) < limit:
-            self.requests[key].append(now)
-            return True
-        
-        return False
-
-
-rate_limiter = RateLimiter()
+from core.rate_limit import rate_limiter, client_ip
 
 
 def rate_limit(limit: int = 60, window: int = 60):
-    """Rate limiting decorator"""
-    def rate_limit_checker(request: Request):
-        client_ip = request.client.host
-        if not rate_limiter.is_allowed(client_ip, limit, window):
+    """Rate limiting dependency (per client IP, on top of the global middleware)"""
+    async def rate_limit_checker(request: Request):
+        allowed, _ = await rate_limiter.hit(
+            f"route:{request.url.path}:{client_ip(request.scope)}", rate=limit, period=window, burst=limit
+        )
+        if not allowed:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail="Rate limit exceeded"
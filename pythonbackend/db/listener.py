@@ -0,0 +1,106 @@
+"""
+Postgres LISTEN/NOTIFY listener on a dedicated connection
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+import asyncpg
+
+from db.session import database_url
+
+logger = logging.getLogger(__name__)
+
+NotificationCallback = Callable[[str], Optional[Awaitable[None]]]
+ReconnectCallback = Callable[[], Awaitable[None]]
+
+# Seconds to wait before reconnecting after the connection drops (doubles up to the max)
+RECONNECT_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+
+
+class PostgresListener:
+    """Dispatches NOTIFY payloads to subscribers, reconnecting when the connection drops.
+
+    LISTEN needs a session-level connection, so this holds its own asyncpg
+    connection outside the SQLAlchemy pool. Subscribers may pass
+    `on_reconnect` to resynchronise after notifications missed while
+    disconnected.
+    """
+
+    def __init__(self, dsn: Optional[str] = None):
+        self.dsn = dsn or database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+        self._callbacks: Dict[str, List[NotificationCallback]] = defaultdict(list)
+        self._reconnect_callbacks: List[ReconnectCallback] = []
+        self._conn: Optional[asyncpg.Connection] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def subscribe(
+        self,
+        channel: str,
+        callback: NotificationCallback,
+        on_reconnect: Optional[ReconnectCallback] = None
+    ) -> None:
+        """Call `callback(payload)` for each NOTIFY on `channel` (call before run())"""
+        self._callbacks[channel].append(callback)
+        if on_reconnect:
+            self._reconnect_callbacks.append(on_reconnect)
+
+    def _dispatch(self, connection, pid, channel, payload) -> None:
+        for callback in self._callbacks.get(channel, []):
+            try:
+                result = callback(payload)
+            except Exception as e:
+                logger.error(f"Error handling notification on {channel}: {e}")
+                continue
+            if asyncio.iscoroutine(result):
+                task = asyncio.create_task(result)
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def run(self) -> None:
+        """Listen until cancelled (runs for the app lifetime)"""
+        delay = RECONNECT_DELAY
+        connected_before = False
+        while True:
+            closed = asyncio.Event()
+            try:
+                self._conn = await asyncpg.connect(self.dsn)
+                self._conn.add_termination_listener(lambda conn: closed.set())
+                for channel in self._callbacks:
+                    await self._conn.add_listener(channel, self._dispatch)
+                delay = RECONNECT_DELAY
+
+                if connected_before:
+                    for callback in self._reconnect_callbacks:
+                        try:
+                            await callback()
+                        except Exception as e:
+                            logger.error(f"Error resynchronising after reconnect: {e}")
+                connected_before = True
+
+                await closed.wait()
+                logger.warning("Postgres listener connection lost, reconnecting")
+            except asyncio.CancelledError:
+                await self.close()
+                raise
+            except Exception as e:
+                logger.error(f"Postgres listener error: {e}")
+
+            await self.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    async def close(self) -> None:
+        """Close the listening connection"""
+        if self._conn is not None and not self._conn.is_closed():
+            try:
+                await self._conn.close(timeout=5)
+            except Exception:
+                self._conn.terminate()
+        self._conn = None
+
+
+pg_listener = PostgresListener()
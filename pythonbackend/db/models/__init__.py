@@ -4,19 +4,26 @@ Database models package
 
 from .user import User
 from .profile import Profile, UserSettings
+from .notification import NotificationType, Notification
+from .job import BackgroundJob
+from .verification import VerificationDocumentType, Verification, BackgroundCheck
 # Temporarily comment out problematic models
-# from .verification import VerificationDocumentType, Verification, BackgroundCheck
 # from .post import Post, PostMedia, PostLike, PostComment, CommentLike, UserFollow
 # from .booking import EventType, Booking, BookingStatusHistory
 # from .pricing import PricingZone, GuardPricing, PricingFactor
 # from .payment import PaymentMethod, Transaction, TransactionStatusHistory
 # from .review import Review, ReviewResponse, ReviewVote
 # from .complaint import ComplaintCategory, Complaint, ComplaintUpdate
-# from .notification import NotificationType, Notification
 # from .app_settings import AppSetting
 
 __all__ = [
     "User",
     "Profile", 
     "UserSettings",
+    "NotificationType",
+    "Notification",
+    "BackgroundJob",
+    "VerificationDocumentType",
+    "Verification",
+    "BackgroundCheck",
 ]
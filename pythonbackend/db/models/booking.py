@@ -2,9 +2,9 @@
 Booking system models
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, DECIMAL, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, DECIMAL, ForeignKey, UniqueConstraint, CheckConstraint, Computed, DDL, event, func, literal_column
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
 from db.base import BaseModel
 
 
@@ -18,7 +18,7 @@ class EventType(BaseModel):
     is_active = Column(Boolean, default=True)
     
     # Relationships
-    bookings = relationship("Booking", back_populates="event_type")
+    bookings = relationship("Booking", back_populates="event_type", primaryjoin="EventType.id == foreign(Booking.event_type_id)")
     
     def __repr__(self):
         return f"<EventType(id={self.id}, name={self.name})>"
@@ -53,13 +53,18 @@ class Booking(BaseModel):
     # Timing
     start_datetime = Column(DateTime(timezone=True), nullable=False)
     end_datetime = Column(DateTime(timezone=True), nullable=False)
-    duration_hours = Column(DECIMAL(4, 2))  # Generated column in DB
+    duration_hours = Column(DECIMAL(4, 2), Computed("EXTRACT(EPOCH FROM (end_datetime - start_datetime)) / 3600"))
     
     # Pricing
     hourly_rate = Column(DECIMAL(10, 2), nullable=False)
-    total_amount = Column(DECIMAL(10, 2))  # Generated column in DB
+    total_amount = Column(
+        DECIMAL(10, 2), Computed("hourly_rate * EXTRACT(EPOCH FROM (end_datetime - start_datetime)) / 3600")
+    )
     platform_fee = Column(DECIMAL(10, 2), default=0.00)
-    final_amount = Column(DECIMAL(10, 2))  # Generated column in DB
+    final_amount = Column(
+        DECIMAL(10, 2),
+        Computed("hourly_rate * EXTRACT(EPOCH FROM (end_datetime - start_datetime)) / 3600 + platform_fee")
+    )
     
     # Status and workflow
     status = Column(String(20), default="pending")  # pending, confirmed, in_progress, completed, cancelled, disputed
@@ -82,18 +87,41 @@ class Booking(BaseModel):
     cancellation_reason = Column(Text)
     
     # Relationships
-    guard = relationship("User", back_populates="guard_bookings", foreign_keys=[guard_id])
-    consumer = relationship("User", back_populates="consumer_bookings", foreign_keys=[consumer_id])
-    event_type = relationship("EventType", back_populates="bookings")
-    status_history = relationship("BookingStatusHistory", back_populates="booking", cascade="all, delete-orphan")
-    transactions = relationship("Transaction", back_populates="booking", cascade="all, delete-orphan")
-    reviews = relationship("Review", back_populates="booking", cascade="all, delete-orphan")
-    complaints = relationship("Complaint", back_populates="booking", cascade="all, delete-orphan")
+    guard = relationship("User", primaryjoin="foreign(Booking.guard_id) == User.id", viewonly=True)
+    consumer = relationship("User", primaryjoin="foreign(Booking.consumer_id) == User.id", viewonly=True)
+    event_type = relationship("EventType", back_populates="bookings", primaryjoin="EventType.id == foreign(Booking.event_type_id)")
+    status_history = relationship(
+        "BookingStatusHistory",
+        back_populates="booking",
+        primaryjoin="Booking.id == foreign(BookingStatusHistory.booking_id)",
+        cascade="all, delete-orphan"
+    )
+    # Temporarily commented out: the payment, review and complaint models aren't mapped yet
+    # transactions = relationship("Transaction", back_populates="booking", cascade="all, delete-orphan")
+    # reviews = relationship("Review", back_populates="booking", cascade="all, delete-orphan")
+    # complaints = relationship("Complaint", back_populates="booking", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        CheckConstraint("end_datetime > start_datetime", name="ck_bookings_period"),
+        # A guard can't hold two live bookings whose [start, end) periods overlap;
+        # the GiST index behind it also serves overlap lookups per guard
+        ExcludeConstraint(
+            ("guard_id", "="),
+            (func.tstzrange(literal_column("start_datetime"), literal_column("end_datetime"), literal_column("'[)'")), "&&"),
+            name="excl_bookings_guard_period",
+            using="gist",
+            where="status IS DISTINCT FROM 'cancelled'"
+        ),
+    )
     
     def __repr__(self):
         return f"<Booking(id={self.id}, reference={self.booking_reference}, status={self.status})>"
 
 
+# The exclusion constraint compares guard_id with "=" inside a GiST index
+event.listen(Booking.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+
+
 class BookingStatusHistory(BaseModel):
     """Booking status change history"""
     __tablename__ = "booking_status_history"
@@ -105,7 +133,9 @@ class BookingStatusHistory(BaseModel):
     reason = Column(Text)
     
     # Relationships
-    booking = relationship("Booking", back_populates="status_history")
+    booking = relationship(
+        "Booking", back_populates="status_history", primaryjoin="Booking.id == foreign(BookingStatusHistory.booking_id)"
+    )
     
     def __repr__(self):
         return f"<BookingStatusHistory(id={self.id}, booking_id={self.booking_id}, new_status={self.new_status})>"
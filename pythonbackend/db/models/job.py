@@ -0,0 +1,34 @@
+"""
+Background job queue model
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from sqlalchemy.sql import func
+from db.base import BaseModel
+
+
+class BackgroundJob(BaseModel):
+    """Durable job processed by the worker (claimed with FOR UPDATE SKIP LOCKED)"""
+    __tablename__ = "background_jobs"
+
+    queue = Column(String(50), nullable=False, default="default")
+    kind = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+
+    # Scheduling
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+
+    __table_args__ = (
+        Index(
+            'idx_background_jobs_claimable', 'queue', 'run_at',
+            postgresql_where=(status.in_(["pending", "running"]))
+        ),
+    )
+
+    def __repr__(self):
+        return f"<BackgroundJob(id={self.id}, kind={self.kind}, status={self.status})>"
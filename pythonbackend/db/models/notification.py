@@ -2,7 +2,7 @@
 Notification system models
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from db.base import BaseModel
@@ -19,7 +19,11 @@ class NotificationType(BaseModel):
     is_active = Column(Boolean, default=True)
     
     # Relationships
-    notifications = relationship("Notification", back_populates="notification_type")
+    notifications = relationship(
+        "Notification",
+        primaryjoin="NotificationType.id == foreign(Notification.type_id)",
+        back_populates="notification_type"
+    )
     
     def __repr__(self):
         return f"<NotificationType(id={self.id}, name={self.name})>"
@@ -45,8 +49,17 @@ class Notification(BaseModel):
     sent_push = Column(Boolean, default=False)
     
     # Relationships
-    user = relationship("User", back_populates="notifications")
-    notification_type = relationship("NotificationType", back_populates="notifications")
+    user = relationship("User", primaryjoin="foreign(Notification.user_id) == User.id", viewonly=True)
+    notification_type = relationship(
+        "NotificationType",
+        primaryjoin="foreign(Notification.type_id) == NotificationType.id",
+        back_populates="notifications"
+    )
+    
+    __table_args__ = (
+        Index('idx_notifications_unread', 'user_id', 'is_read', postgresql_where=(is_read == False)),
+        Index('idx_notifications_user_created_at_id', 'user_id', 'created_at', 'id'),
+    )
     
     def __repr__(self):
         return f"<Notification(id={self.id}, user_id={self.user_id}, title={self.title})>"
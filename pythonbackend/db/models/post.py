@@ -2,7 +2,7 @@
 Social post models
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, DECIMAL, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, DECIMAL, Float, ForeignKey, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from db.base import BaseModel, Base
@@ -29,6 +29,10 @@ class Post(BaseModel):
     comment_count = Column(Integer, default=0)
     share_count = Column(Integer, default=0)
     
+    # Time-decayed engagement score, exact as of trending_decayed_at
+    trending_score = Column(Float, nullable=False, default=0.0, server_default="0")
+    trending_decayed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
     # Moderation
     is_flagged = Column(Boolean, default=False)
     flagged_reason = Column(Text)
@@ -41,6 +45,16 @@ class Post(BaseModel):
     likes = relationship("PostLike", back_populates="post", cascade="all, delete-orphan")
     comments = relationship("PostComment", back_populates="post", cascade="all, delete-orphan")
     
+    # Keyset pagination index for feeds ordered by (created_at, id) and
+    # trending index for feeds ordered by (trending_score, id)
+    __table_args__ = (
+        Index('idx_posts_created_at_id', 'created_at', 'id'),
+        Index(
+            'idx_posts_trending_public', 'trending_score', 'id',
+            postgresql_where=(visibility == "public")
+        ),
+    )
+    
     def __repr__(self):
         return f"<Post(id={self.id}, user_id={self.user_id}, type={self.post_type})>"
 
@@ -53,9 +67,10 @@ class PostMedia(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     post_id = Column(Integer, ForeignKey("posts.id"), nullable=False, index=True)
-    media_url = Column(Text, nullable=False)
+    media_url = Column(Text, nullable=False, index=True)
     media_type = Column(String(20), nullable=False)  # image, video
     thumbnail_url = Column(Text)
+    variants = Column(JSON)  # [{"url", "width", "height"}] ordered by width
     file_size = Column(Integer)
     duration = Column(Integer)  # For videos, in seconds
     width = Column(Integer)
@@ -80,8 +95,11 @@ class PostLike(BaseModel):
     post = relationship("Post", back_populates="likes")
     user = relationship("User", back_populates="post_likes")
     
-    # Unique constraint
-    __table_args__ = (UniqueConstraint('post_id', 'user_id', name='uq_post_like'),)
+    # Unique constraint and keyset pagination index
+    __table_args__ = (
+        UniqueConstraint('post_id', 'user_id', name='uq_post_like'),
+        Index('idx_post_likes_post_created_at_id', 'post_id', 'created_at', 'id'),
+    )
     
     def __repr__(self):
         return f"<PostLike(id={self.id}, post_id={self.post_id}, user_id={self.user_id})>"
@@ -106,6 +124,9 @@ class PostComment(BaseModel):
     replies = relationship("PostComment", back_populates="parent_comment")
     likes = relationship("CommentLike", back_populates="comment", cascade="all, delete-orphan")
     
+    # Keyset pagination index for comment threads ordered by (created_at, id)
+    __table_args__ = (Index('idx_post_comments_post_created_at_id', 'post_id', 'created_at', 'id'),)
+    
     def __repr__(self):
         return f"<PostComment(id={self.id}, post_id={self.post_id}, user_id={self.user_id})>"
 
@@ -22,7 +22,9 @@ class PricingZone(BaseModel):
     is_active = Column(Boolean, default=True)
     
     # Relationships
-    guard_pricing = relationship("GuardPricing", back_populates="pricing_zone")
+    guard_pricing = relationship(
+        "GuardPricing", back_populates="pricing_zone", primaryjoin="PricingZone.id == foreign(GuardPricing.pricing_zone_id)"
+    )
     
     def __repr__(self):
         return f"<PricingZone(id={self.id}, name={self.name}, city={self.city})>"
@@ -57,8 +59,10 @@ class GuardPricing(BaseModel):
     available_until = Column(DateTime(timezone=True))
     
     # Relationships
-    guard = relationship("User", back_populates="guard_pricing")
-    pricing_zone = relationship("PricingZone", back_populates="guard_pricing")
+    guard = relationship("User", primaryjoin="foreign(GuardPricing.guard_id) == User.id", viewonly=True)
+    pricing_zone = relationship(
+        "PricingZone", back_populates="guard_pricing", primaryjoin="PricingZone.id == foreign(GuardPricing.pricing_zone_id)"
+    )
     
     # Unique constraint
     __table_args__ = (UniqueConstraint('guard_id', 'pricing_zone_id', name='uq_guard_pricing'),)
@@ -2,7 +2,7 @@
 Profile and user settings models
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Date, DECIMAL, ARRAY, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Date, DECIMAL, ARRAY, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from db.base import BaseModel
@@ -34,6 +34,8 @@ class Profile(BaseModel):
     latitude = Column(DECIMAL(10, 8))
     longitude = Column(DECIMAL(11, 8))
     location_accuracy = Column(Integer)  # in meters
+    # Geohash of latitude/longitude (services.geo); "C" collation keeps prefix ranges index-friendly
+    geohash = Column(String(12, collation="C"))
     
     # User type and status
     user_type = Column(String(20), nullable=False)  # guard, consumer, admin
@@ -56,6 +58,13 @@ class Profile(BaseModel):
     # Relationships - temporarily commented out for basic functionality
     # user = relationship("User", back_populates="profile")
     
+    __table_args__ = (
+        Index(
+            'idx_profiles_guard_geohash', 'geohash',
+            postgresql_where=(user_type == "guard")
+        ),
+    )
+    
     def __repr__(self):
         return f"<Profile(id={self.id}, user_id={self.user_id}, user_type={self.user_type})>"
 
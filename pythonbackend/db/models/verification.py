@@ -2,7 +2,7 @@
 Verification models
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Date, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Date, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from db.base import BaseModel
@@ -33,7 +33,7 @@ class Verification(BaseModel):
     document_type_id = Column(Integer, ForeignKey('verification_document_types.id'), nullable=False, index=True)
     document_name = Column(String(255), nullable=False)
     document_url = Column(Text, nullable=False)
-    document_hash = Column(String(255))  # For integrity checking
+    document_hash = Column(String(255), index=True)  # SHA-256, for integrity checking and dedupe
     file_size = Column(Integer)
     mime_type = Column(String(100))
     
@@ -44,6 +44,10 @@ class Verification(BaseModel):
     verified_at = Column(DateTime(timezone=True))
     expires_at = Column(DateTime(timezone=True))
     
+    # Review queue lease (admin currently reviewing, and until when)
+    claimed_by = Column(Integer)
+    claim_expires_at = Column(DateTime(timezone=True))
+    
     # Document details
     document_number = Column(String(255))  # ID number, license number, etc.
     issuing_authority = Column(String(255))
@@ -54,6 +58,13 @@ class Verification(BaseModel):
     user = relationship("User", foreign_keys=[user_id])
     document_type = relationship("VerificationDocumentType", back_populates="verifications")
     
+    __table_args__ = (
+        Index(
+            'idx_verifications_pending_created_at_id', 'created_at', 'id',
+            postgresql_where=(status == "pending")
+        ),
+    )
+    
     def __repr__(self):
         return f"<Verification(id={self.id}, user_id={self.user_id}, status={self.status})>"
 
@@ -73,7 +84,7 @@ class BackgroundCheck(BaseModel):
     expires_at = Column(DateTime(timezone=True))
     
     # Relationships
-    user = relationship("User", back_populates="background_checks")
+    user = relationship("User", primaryjoin="foreign(BackgroundCheck.user_id) == User.id", viewonly=True)
     
     def __repr__(self):
         return f"<BackgroundCheck(id={self.id}, user_id={self.user_id}, check_type={self.check_type})>"
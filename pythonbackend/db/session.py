@@ -37,7 +37,7 @@ async def get_db() -> AsyncSession:
 
 
 # Import all models to ensure they are registered
-from db.models import user, profile, post
+from db.models import user, profile, post, notification, job, verification, booking, pricing
 # Temporarily comment out problematic models
-# from db.models import verification, booking, payment, review, complaint, notification, app_settings
+# from db.models import payment, review, complaint, app_settings
 from db.base import Base
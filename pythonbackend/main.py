@@ -10,14 +10,24 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
 from starlette.exceptions import HTTPException as StarletteHTTPException
 import uvicorn
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
 
 from core.config import settings
-from core.security import get_current_user
+from core.security import get_current_user, token_cache
+from core.rate_limit import RateLimitMiddleware
 from db.session import engine, Base
+from db.listener import pg_listener
 from api.routes import api_router
+from services.trending_service import run_trending_decay_loop
+from services.engagement_buffer import engagement_buffer
+from services.mail_transport import mail_transport
+from services.reference_data import reference_data, REFERENCE_DATA_CHANNEL
+from services.notification_stream import notification_broker, NOTIFICATION_CHANNEL
+from services.guard_index import guard_index, GUARD_LOCATIONS_CHANNEL
+from services.zone_resolver import zone_resolver
 # from services.notification_service import NotificationService
 
 # Configure logging
@@ -38,12 +48,69 @@ async def lifespan(app: FastAPI):
     # Initialize notification service
     # app.state.notification_service = NotificationService()
     
+    # Load reference tables and keep them fresh via LISTEN/NOTIFY
+    try:
+        await reference_data.load()
+    except Exception as e:
+        # Lookups load lazily if the tables become reachable later
+        logger.error(f"Error loading reference data: {e}")
+    pg_listener.subscribe(
+        REFERENCE_DATA_CHANNEL,
+        reference_data.handle_notification,
+        on_reconnect=reference_data.reload
+    )
+    try:
+        await zone_resolver.load()
+    except Exception as e:
+        # Zones load lazily on the first lookup instead
+        logger.error(f"Error loading pricing zones: {e}")
+    pg_listener.subscribe(
+        REFERENCE_DATA_CHANNEL,
+        zone_resolver.handle_notification,
+        on_reconnect=zone_resolver.reload
+    )
+    pg_listener.subscribe(NOTIFICATION_CHANNEL, notification_broker.handle_notification)
+    if settings.GUARD_INDEX_ENABLED:
+        try:
+            await guard_index.load()
+        except Exception as e:
+            # Queries go to Postgres until the refresh loop manages a sync
+            logger.error(f"Error loading guard index: {e}")
+        pg_listener.subscribe(
+            GUARD_LOCATIONS_CHANNEL,
+            guard_index.handle_notification,
+            on_reconnect=guard_index.reload
+        )
+    
+    # Start background jobs
+    listener_task = asyncio.create_task(pg_listener.run())
+    reference_refresh_task = asyncio.create_task(reference_data.run_refresh_loop())
+    zone_refresh_task = asyncio.create_task(zone_resolver.run_refresh_loop())
+    trending_task = asyncio.create_task(run_trending_decay_loop())
+    guard_index_task = None
+    if settings.GUARD_INDEX_ENABLED:
+        guard_index_task = asyncio.create_task(guard_index.run_refresh_loop())
+    engagement_task = None
+    if engagement_buffer.enabled:
+        engagement_task = asyncio.create_task(engagement_buffer.run())
+    
     logger.info("Application startup complete")
     
     yield
     
     # Shutdown
     logger.info("Shutting down Security Guard App...")
+    trending_task.cancel()
+    listener_task.cancel()
+    reference_refresh_task.cancel()
+    zone_refresh_task.cancel()
+    if guard_index_task:
+        guard_index_task.cancel()
+    if engagement_task:
+        # Not cancelled: the loop finishes any flush in progress, then flushes what's left
+        engagement_buffer.stop()
+        await engagement_task
+    await mail_transport.close()
 
 
 # Create FastAPI application
@@ -56,6 +123,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rate limiting sits inside CORS so 429 responses still carry CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # Add middleware with dynamic Tailscale support
 app.add_middleware(
     CORSMiddleware,
@@ -145,7 +216,11 @@ async def health_check():
         "data": {
             "status": "healthy",
             "version": "1.0.0",
-            "environment": settings.ENVIRONMENT
+            "environment": settings.ENVIRONMENT,
+            "token_cache": token_cache.stats(),
+            "notification_streams": notification_broker.stats(),
+            "guard_index": guard_index.stats(),
+            "pricing_zones": zone_resolver.stats()
         },
         "timestamp": None
     }
@@ -0,0 +1,64 @@
+"""Guard location change notifications
+
+Revision ID: 0e4c7a9d2b61
+Revises: 6b2d8e4f1a97
+Create Date: 2026-10-17 20:14:06.731952
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0e4c7a9d2b61'
+down_revision: Union[str, Sequence[str], None] = '6b2d8e4f1a97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tell listeners (services/guard_index.py) which guard's location or availability changed
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_guard_location_change() RETURNS trigger AS $$
+        DECLARE
+            old_id integer;
+            new_id integer;
+        BEGIN
+            IF TG_TABLE_NAME = 'profiles' THEN
+                IF TG_OP <> 'INSERT' THEN old_id := OLD.user_id; END IF;
+                IF TG_OP <> 'DELETE' THEN new_id := NEW.user_id; END IF;
+            ELSE
+                IF TG_OP <> 'INSERT' THEN old_id := OLD.guard_id; END IF;
+                IF TG_OP <> 'DELETE' THEN new_id := NEW.guard_id; END IF;
+            END IF;
+
+            IF new_id IS NOT NULL THEN
+                PERFORM pg_notify('guard_locations', new_id::text);
+            END IF;
+            IF old_id IS NOT NULL AND old_id IS DISTINCT FROM new_id THEN
+                PERFORM pg_notify('guard_locations', old_id::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER profiles_notify_guard_location
+        AFTER INSERT OR DELETE OR UPDATE OF user_id, latitude, longitude, user_type, status ON profiles
+        FOR EACH ROW EXECUTE FUNCTION notify_guard_location_change()
+    """)
+    op.execute("""
+        CREATE TRIGGER guard_pricing_notify_guard_location
+        AFTER INSERT OR DELETE OR UPDATE OF guard_id, is_available, available_from, available_until ON guard_pricing
+        FOR EACH ROW EXECUTE FUNCTION notify_guard_location_change()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS guard_pricing_notify_guard_location ON guard_pricing")
+    op.execute("DROP TRIGGER IF EXISTS profiles_notify_guard_location ON profiles")
+    op.execute("DROP FUNCTION IF EXISTS notify_guard_location_change()")
@@ -0,0 +1,28 @@
+"""Post media variants
+
+Revision ID: 1d5f9b2e7a60
+Revises: e3b7a1c9d054
+Create Date: 2026-10-17 17:41:09.532871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d5f9b2e7a60'
+down_revision: Union[str, Sequence[str], None] = 'e3b7a1c9d054'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('post_media', sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('post_media', 'variants')
@@ -0,0 +1,35 @@
+"""Verification review queue
+
+Revision ID: 2f6d8b4c0a93
+Revises: 9a3c5e7b1d46
+Create Date: 2026-10-17 14:15:37.582046
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f6d8b4c0a93'
+down_revision: Union[str, Sequence[str], None] = '9a3c5e7b1d46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('verifications', sa.Column('claimed_by', sa.Integer(), nullable=True))
+    op.add_column('verifications', sa.Column('claim_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'idx_verifications_pending_created_at_id', 'verifications', ['created_at', 'id'], unique=False,
+        postgresql_where=sa.text("status = 'pending'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_verifications_pending_created_at_id', table_name='verifications', postgresql_where=sa.text("status = 'pending'"))
+    op.drop_column('verifications', 'claim_expires_at')
+    op.drop_column('verifications', 'claimed_by')
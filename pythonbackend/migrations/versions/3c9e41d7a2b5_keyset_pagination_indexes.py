@@ -0,0 +1,32 @@
+"""Keyset pagination indexes
+
+Revision ID: 3c9e41d7a2b5
+Revises: 72db628bfbc7
+Create Date: 2026-10-17 09:12:31.482113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e41d7a2b5'
+down_revision: Union[str, Sequence[str], None] = '72db628bfbc7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_posts_created_at_id', 'posts', ['created_at', 'id'], unique=False)
+    op.create_index('idx_post_likes_post_created_at_id', 'post_likes', ['post_id', 'created_at', 'id'], unique=False)
+    op.create_index('idx_post_comments_post_created_at_id', 'post_comments', ['post_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_post_comments_post_created_at_id', table_name='post_comments')
+    op.drop_index('idx_post_likes_post_created_at_id', table_name='post_likes')
+    op.drop_index('idx_posts_created_at_id', table_name='posts')
@@ -0,0 +1,33 @@
+"""Notification unread and listing indexes
+
+Revision ID: 5e0b3a9d7f21
+Revises: d4a8f17c9e52
+Create Date: 2026-10-17 12:48:19.306572
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b3a9d7f21'
+down_revision: Union[str, Sequence[str], None] = 'd4a8f17c9e52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'idx_notifications_unread', 'notifications', ['user_id', 'is_read'], unique=False,
+        postgresql_where=sa.text('is_read = false')
+    )
+    op.create_index('idx_notifications_user_created_at_id', 'notifications', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_notifications_user_created_at_id', table_name='notifications')
+    op.drop_index('idx_notifications_unread', table_name='notifications', postgresql_where=sa.text('is_read = false'))
@@ -0,0 +1,61 @@
+"""Profile geohash for guard search
+
+Revision ID: 6b2d8e4f1a97
+Revises: 1d5f9b2e7a60
+Create Date: 2026-10-17 18:55:32.207514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from services.geo import encode
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b2d8e4f1a97'
+down_revision: Union[str, Sequence[str], None] = '1d5f9b2e7a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('profiles', sa.Column('geohash', sa.String(length=12, collation='C'), nullable=True))
+
+    # Backfill existing locations in batches
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, latitude, longitude FROM profiles "
+                "WHERE id > :last_id AND latitude IS NOT NULL AND longitude IS NOT NULL "
+                "ORDER BY id LIMIT :batch"
+            ),
+            {"last_id": last_id, "batch": BACKFILL_BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            sa.text("UPDATE profiles SET geohash = :geohash WHERE id = :id"),
+            [
+                {"id": row.id, "geohash": encode(float(row.latitude), float(row.longitude))}
+                for row in rows
+            ]
+        )
+        last_id = rows[-1].id
+
+    op.create_index(
+        'idx_profiles_guard_geohash', 'profiles', ['geohash'], unique=False,
+        postgresql_where=sa.text("user_type = 'guard'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_profiles_guard_geohash', table_name='profiles')
+    op.drop_column('profiles', 'geohash')
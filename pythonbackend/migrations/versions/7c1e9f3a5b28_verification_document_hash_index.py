@@ -0,0 +1,28 @@
+"""Verification document hash index
+
+Revision ID: 7c1e9f3a5b28
+Revises: 2f6d8b4c0a93
+Create Date: 2026-10-17 15:02:11.604387
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e9f3a5b28'
+down_revision: Union[str, Sequence[str], None] = '2f6d8b4c0a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_verifications_document_hash'), 'verifications', ['document_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_verifications_document_hash'), table_name='verifications')
@@ -0,0 +1,41 @@
+"""Post trending score
+
+Revision ID: 8f2a6c0e5d13
+Revises: 3c9e41d7a2b5
+Create Date: 2026-10-17 10:04:52.217640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2a6c0e5d13'
+down_revision: Union[str, Sequence[str], None] = '3c9e41d7a2b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('trending_score', sa.Float(), server_default='0', nullable=False))
+    op.add_column('posts', sa.Column('trending_decayed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    # Seed scores from existing engagement, decayed by post age (24h half-life)
+    op.execute(
+        "UPDATE posts SET trending_score = "
+        "(COALESCE(like_count, 0) + COALESCE(comment_count, 0)) "
+        "* power(0.5, extract(epoch FROM now() - created_at) / 86400.0)"
+    )
+    op.create_index(
+        'idx_posts_trending_public', 'posts', ['trending_score', 'id'], unique=False,
+        postgresql_where=sa.text("visibility = 'public'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_posts_trending_public', table_name='posts', postgresql_where=sa.text("visibility = 'public'"))
+    op.drop_column('posts', 'trending_decayed_at')
+    op.drop_column('posts', 'trending_score')
@@ -0,0 +1,65 @@
+"""Notify listeners of new notifications
+
+Revision ID: 9a3c5e7b1d46
+Revises: 5e0b3a9d7f21
+Create Date: 2026-10-17 13:30:52.740118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3c5e7b1d46'
+down_revision: Union[str, Sequence[str], None] = '5e0b3a9d7f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Push each new row to the API workers (services/notification_stream.py).
+    # NOTIFY payloads are capped at 8000 bytes, so large rows are sent
+    # without their message/data and flagged as truncated.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_notification_insert() RETURNS trigger AS $$
+        DECLARE
+            payload text;
+        BEGIN
+            payload := json_build_object(
+                'id', NEW.id,
+                'user_id', NEW.user_id,
+                'type_id', NEW.type_id,
+                'title', NEW.title,
+                'message', NEW.message,
+                'data', NEW.data,
+                'created_at', NEW.created_at
+            )::text;
+            IF octet_length(payload) > 7900 THEN
+                payload := json_build_object(
+                    'id', NEW.id,
+                    'user_id', NEW.user_id,
+                    'type_id', NEW.type_id,
+                    'title', left(NEW.title, 200),
+                    'created_at', NEW.created_at,
+                    'truncated', true
+                )::text;
+            END IF;
+            PERFORM pg_notify('notifications', payload);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER notifications_notify_insert
+        AFTER INSERT ON notifications
+        FOR EACH ROW EXECUTE FUNCTION notify_notification_insert()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS notifications_notify_insert ON notifications")
+    op.execute("DROP FUNCTION IF EXISTS notify_notification_insert()")
@@ -0,0 +1,37 @@
+"""Booking overlap exclusion constraint
+
+Revision ID: a5c2e8f0b714
+Revises: 0e4c7a9d2b61
+Create Date: 2026-10-17 22:41:19.508326
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5c2e8f0b714'
+down_revision: Union[str, Sequence[str], None] = '0e4c7a9d2b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Lets the GiST index compare guard_id with "="
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.create_check_constraint('ck_bookings_period', 'bookings', 'end_datetime > start_datetime')
+    # Fails if existing live bookings already overlap; those need resolving by hand first
+    op.execute("""
+        ALTER TABLE bookings ADD CONSTRAINT excl_bookings_guard_period
+        EXCLUDE USING gist (guard_id WITH =, tstzrange(start_datetime, end_datetime, '[)') WITH &&)
+        WHERE (status IS DISTINCT FROM 'cancelled')
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('excl_bookings_guard_period', 'bookings', type_='exclude')
+    op.drop_constraint('ck_bookings_period', 'bookings', type_='check')
@@ -0,0 +1,34 @@
+"""Pricing zone change notifications
+
+Revision ID: c8d3f6a1e295
+Revises: a5c2e8f0b714
+Create Date: 2026-10-17 23:52:37.214680
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d3f6a1e295'
+down_revision: Union[str, Sequence[str], None] = 'a5c2e8f0b714'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Reuses the reference data notifier (migration d4a8f17c9e52); the payload is
+    # 'pricing_zones', which services/zone_resolver.py reloads on
+    op.execute("""
+        CREATE TRIGGER pricing_zones_notify_change
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON pricing_zones
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_data_change()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS pricing_zones_notify_change ON pricing_zones")
@@ -0,0 +1,52 @@
+"""Reference data change notifications
+
+Revision ID: d4a8f17c9e52
+Revises: b71d4e9a0c38
+Create Date: 2026-10-17 12:02:44.913205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8f17c9e52'
+down_revision: Union[str, Sequence[str], None] = 'b71d4e9a0c38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REFERENCE_TABLES = (
+    'notification_types',
+    'event_types',
+    'verification_document_types',
+    'complaint_categories',
+    'pricing_factors',
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tell listeners (services/reference_data.py) which reference table changed
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_reference_data_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('reference_data', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in REFERENCE_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_notify_change
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_data_change()
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in REFERENCE_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_change ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS notify_reference_data_change()")
@@ -0,0 +1,28 @@
+"""Post media url index
+
+Revision ID: e3b7a1c9d054
+Revises: 7c1e9f3a5b28
+Create Date: 2026-10-17 16:20:45.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7a1c9d054'
+down_revision: Union[str, Sequence[str], None] = '7c1e9f3a5b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_post_media_media_url'), 'post_media', ['media_url'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_post_media_media_url'), table_name='post_media')
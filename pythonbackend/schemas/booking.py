@@ -3,7 +3,7 @@ Booking schemas
 """
 
 from pydantic import BaseModel, validator
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
 
@@ -68,8 +68,7 @@ class BookingCreate(BaseModel):
     longitude: Optional[float] = None
     start_datetime: datetime
     end_datetime: datetime
-    hourly_rate: Decimal
-    platform_fee: Decimal = 0.00
+    timezone: str = "UTC"  # venue timezone, for night and weekend hours; the price is quoted server-side
     special_requirements: Optional[str] = None
     uniform_required: bool = False
     equipment_provided: bool = True
@@ -103,3 +102,22 @@ class BookingUpdate(BaseModel):
     equipment_provided: Optional[bool] = None
     consumer_notes: Optional[str] = None
     guard_notes: Optional[str] = None
+
+
+class BusyPeriod(BaseModel):
+    """A period during which a guard is booked"""
+    start_datetime: datetime
+    end_datetime: datetime
+
+
+class FreeGuard(BaseModel):
+    """Guard free for a requested period"""
+    user_id: int
+    first_name: str
+    last_name: str
+    profile_picture_url: Optional[str]
+    city: Optional[str]
+    state: Optional[str]
+    years_experience: Optional[int]
+    certifications: Optional[List[str]]
+    distance_km: Optional[float]
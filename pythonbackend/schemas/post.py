@@ -14,6 +14,7 @@ class PostMediaResponse(BaseModel):
     media_url: str
     media_type: str
     thumbnail_url: Optional[str]
+    variants: Optional[List[dict]]
     file_size: Optional[int]
     duration: Optional[int]
     width: Optional[int]
@@ -0,0 +1,45 @@
+"""
+Pricing schemas
+"""
+
+from pydantic import BaseModel, Field, validator
+from typing import Optional, List
+from datetime import datetime
+
+
+class QuoteRequest(BaseModel):
+    """Bulk quote request: one shift priced for many guards"""
+    start_datetime: datetime
+    end_datetime: datetime
+    timezone: str = "UTC"  # venue timezone, for night and weekend hours
+    event_type_id: Optional[int] = None
+    emergency: bool = False
+    guard_ids: Optional[List[int]] = None  # default: every guard open for booking
+    pricing_zone_id: Optional[int] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)  # venue; resolves the pricing zone
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    exclude_booked: bool = True
+    limit: int = Field(100, ge=1, le=1000)  # cheapest quotes returned
+    
+    @validator('end_datetime')
+    def validate_end_datetime(cls, v, values):
+        if 'start_datetime' in values and v <= values['start_datetime']:
+            raise ValueError('End datetime must be after start datetime')
+        return v
+
+
+class GuardQuote(BaseModel):
+    """Price of a shift from one guard"""
+    guard_id: int
+    pricing_zone_id: int
+    base_hourly_rate: float
+    hours: float
+    billable_hours: float
+    total_amount: float
+
+
+class ZoneResolution(BaseModel):
+    """Pricing zone containing a point"""
+    latitude: float
+    longitude: float
+    pricing_zone_id: Optional[int]
@@ -0,0 +1,29 @@
+"""
+Search schemas
+"""
+
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class GuardSearchResult(BaseModel):
+    """Guard search result schema (exact coordinates are not exposed)"""
+    user_id: int
+    first_name: str
+    last_name: str
+    profile_picture_url: Optional[str]
+    city: Optional[str]
+    state: Optional[str]
+    years_experience: Optional[int]
+    certifications: Optional[List[str]]
+    languages_spoken: Optional[List[str]]
+    max_travel_distance: Optional[int]
+    distance_km: float
+    rating: Optional[float]
+    review_count: int
+
+
+class NearbyGuard(BaseModel):
+    """Nearest available guard schema"""
+    user_id: int
+    distance_km: float
@@ -39,6 +39,8 @@ class VerificationResponse(BaseModel):
     issuing_authority: Optional[str]
     issued_date: Optional[datetime]
     expiry_date: Optional[datetime]
+    claimed_by: Optional[int] = None
+    claim_expires_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     
@@ -60,6 +62,36 @@ class VerificationCreate(BaseModel):
     expiry_date: Optional[datetime] = None
 
 
+class VerificationBatchApprove(BaseModel):
+    """Batch approval schema"""
+    verification_ids: List[int]
+    notes: Optional[str] = None
+    
+    @validator('verification_ids')
+    def validate_verification_ids(cls, v):
+        if not v or len(v) > 100:
+            raise ValueError('Provide between 1 and 100 verification ids')
+        return v
+
+
+class VerificationBatchReject(BaseModel):
+    """Batch rejection schema"""
+    verification_ids: List[int]
+    reason: str
+    
+    @validator('verification_ids')
+    def validate_verification_ids(cls, v):
+        if not v or len(v) > 100:
+            raise ValueError('Provide between 1 and 100 verification ids')
+        return v
+
+
+class VerificationBatchResult(BaseModel):
+    """Batch review result schema"""
+    updated: List[int]
+    skipped: List[int]
+
+
 class BackgroundCheckResponse(BaseModel):
     """Background check response schema"""
     id: int
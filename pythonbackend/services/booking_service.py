@@ -0,0 +1,385 @@
+"""
+Booking service: booking lifecycle, double-booking checks and guard availability
+"""
+
+import secrets
+from datetime import datetime, timedelta, time as dt_time, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import select, and_, func, literal_column
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models.booking import Booking, BookingStatusHistory
+from db.models.profile import Profile
+from core.config import settings
+from schemas.booking import BookingCreate, BookingUpdate
+from services.search_service import distance_km, within_radius
+from services.zone_resolver import zone_resolver
+
+# Enforced by Postgres (see migration a5c2e8f0b714)
+OVERLAP_CONSTRAINT = "excl_bookings_guard_period"
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+# action -> (statuses it applies to, resulting status)
+BOOKING_TRANSITIONS = {
+    "confirm": (("pending",), "confirmed"),
+    "start": (("confirmed",), "in_progress"),
+    "complete": (("confirmed", "in_progress"), "completed"),
+    "cancel": (("pending", "confirmed"), "cancelled"),
+}
+
+# Bookings whose details can still be edited
+EDITABLE_STATUSES = ("pending", "confirmed")
+
+CONSUMER_FIELDS = {
+    "event_name", "event_description", "venue_name", "address_line1", "address_line2", "city",
+    "state", "postal_code", "country", "latitude", "longitude", "start_datetime", "end_datetime",
+    "special_requirements", "uniform_required", "equipment_provided", "consumer_notes"
+}
+GUARD_FIELDS = {"guard_notes"}
+
+CENT = Decimal("0.01")
+
+
+class BookingConflict(Exception):
+    """The guard already has a live booking overlapping the requested period"""
+
+    def __init__(self, conflicts: List[Tuple[datetime, datetime]]):
+        super().__init__("Guard is already booked during the requested period")
+        self.conflicts = conflicts
+
+
+def booking_period(start, end):
+    """SQL half-open [start, end) timestamptz range"""
+    return func.tstzrange(start, end, literal_column("'[)'"))
+
+
+def overlaps(start: datetime, end: datetime):
+    """SQL condition: the booking still holds the guard's time and overlaps [start, end).
+
+    Written exactly like the exclusion constraint so Postgres answers it from
+    the constraint's GiST index (guard_id, period) instead of scanning the
+    guard's bookings.
+    """
+    return and_(
+        Booking.status.is_distinct_from(literal_column("'cancelled'")),
+        booking_period(Booking.start_datetime, Booking.end_datetime).op("&&")(booking_period(start, end))
+    )
+
+
+def _parse_time(value: str) -> timedelta:
+    hours, minutes = value.split(":")
+    offset = timedelta(hours=int(hours), minutes=int(minutes))
+    if not timedelta(0) <= offset <= timedelta(hours=24):
+        raise ValueError(f"Invalid time {value}")
+    return offset
+
+
+def schedule_covers(schedule: Optional[dict], start: datetime, end: datetime) -> bool:
+    """Whether a weekly availability schedule covers all of [start, end).
+
+    Schedules map weekday names to lists of {"start": "HH:MM", "end": "HH:MM"}
+    windows in the guard's local time, plus an optional IANA "timezone" (UTC
+    by default). A window that ends at or before its start runs past midnight.
+    Guards without a schedule are available at any time; a malformed schedule
+    covers nothing.
+    """
+    if not schedule:
+        return True
+    try:
+        zone = ZoneInfo(schedule.get("timezone") or "UTC")
+        local_start, local_end = start.astimezone(zone), end.astimezone(zone)
+
+        # Windows starting the day before can run past midnight into the period
+        windows = []
+        day = local_start.date() - timedelta(days=1)
+        while day <= local_end.date():
+            midnight = datetime.combine(day, dt_time(0))
+            for window in schedule.get(WEEKDAYS[day.weekday()]) or []:
+                opens, closes = _parse_time(window["start"]), _parse_time(window["end"])
+                if closes <= opens:
+                    closes += timedelta(days=1)
+                # Attach the zone after the arithmetic so DST changes land on wall-clock times
+                windows.append((
+                    (midnight + opens).replace(tzinfo=zone),
+                    (midnight + closes).replace(tzinfo=zone)
+                ))
+            day += timedelta(days=1)
+    except (AttributeError, KeyError, TypeError, ValueError, ZoneInfoNotFoundError):
+        return False
+
+    # Walk the windows in order, extending the covered stretch from `start`
+    covered = local_start
+    for opens, closes in sorted(windows):
+        if opens > covered:
+            break
+        covered = max(covered, closes)
+        if covered >= local_end:
+            return True
+    return covered >= local_end
+
+
+class BookingService:
+    """Booking service for business logic"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def find_conflicts(
+        self,
+        guard_id: int,
+        start: datetime,
+        end: datetime,
+        exclude_booking_id: Optional[int] = None
+    ) -> List[Tuple[datetime, datetime]]:
+        """(start, end) of the guard's live bookings overlapping [start, end)"""
+        query = select(Booking.start_datetime, Booking.end_datetime).where(
+            Booking.guard_id == guard_id, overlaps(start, end)
+        )
+        if exclude_booking_id is not None:
+            query = query.where(Booking.id != exclude_booking_id)
+        result = await self.db.execute(query.order_by(Booking.start_datetime))
+        return [tuple(row) for row in result.all()]
+
+    async def busy_periods(self, guard_id: int, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """The guard's booked periods within [start, end)"""
+        return await self.find_conflicts(guard_id, start, end)
+
+    async def find_free_guards(
+        self,
+        start: datetime,
+        end: datetime,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        radius_km: Optional[float] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Tuple[Profile, Optional[float]]]:
+        """(Profile, distance_km) of active guards free for all of [start, end).
+
+        Postgres drops guards with an overlapping booking through one GiST
+        probe each; the remaining candidates are checked against their
+        availability schedule here. With a location, guards within
+        `radius_km` are returned nearest first.
+        """
+        booked = select(literal_column("1")).where(
+            Booking.guard_id == Profile.user_id, overlaps(start, end)
+        ).exists()
+
+        if latitude is not None and longitude is not None and radius_km is not None:
+            distance = distance_km(latitude, longitude)
+            query = (
+                select(Profile, distance.label("distance_km"))
+                .where(Profile.status == "active", *within_radius(latitude, longitude, radius_km, distance), ~booked)
+                .order_by(distance, Profile.user_id)
+            )
+        else:
+            query = (
+                select(Profile, literal_column("NULL").label("distance_km"))
+                .where(Profile.user_type == "guard", Profile.status == "active", ~booked)
+                .order_by(Profile.user_id)
+            )
+
+        free = []
+        result = await self.db.stream(query.execution_options(yield_per=500))
+        async for profile, distance in result:
+            if not schedule_covers(profile.availability_schedule, start, end):
+                continue
+            free.append((profile, distance))
+            if len(free) >= skip + limit:
+                break
+        await result.close()
+        return free[skip:]
+
+    async def create_booking(self, consumer_id: int, booking_data: BookingCreate) -> Booking:
+        """Book a guard, raising BookingConflict if the guard is already booked"""
+        guard = await self.db.execute(
+            select(Profile.availability_schedule).where(
+                Profile.user_id == booking_data.guard_id,
+                Profile.user_type == "guard",
+                Profile.status == "active"
+            )
+        )
+        guard = guard.first()
+        if guard is None:
+            raise ValueError("Guard not found")
+
+        start, end = booking_data.start_datetime, booking_data.end_datetime
+        if start.tzinfo is None or end.tzinfo is None:
+            raise ValueError("Booking times must include a timezone")
+        if not schedule_covers(guard.availability_schedule, start, end):
+            raise ValueError("Guard is not available during the requested period")
+
+        conflicts = await self.find_conflicts(booking_data.guard_id, start, end)
+        if conflicts:
+            raise BookingConflict(conflicts)
+
+        hourly_rate, platform_fee = await self.price(booking_data)
+        booking = Booking(
+            booking_reference=f"BK{secrets.token_hex(5).upper()}",
+            consumer_id=consumer_id,
+            status="pending",
+            hourly_rate=hourly_rate,
+            platform_fee=platform_fee,
+            **booking_data.dict(exclude={"timezone"})
+        )
+        booking.status_history.append(BookingStatusHistory(new_status="pending", changed_by=consumer_id))
+        self.db.add(booking)
+        await self._commit_period(booking)
+        return booking
+
+    async def price(self, booking_data: BookingCreate) -> Tuple[Decimal, Decimal]:
+        """(hourly_rate, platform_fee) for a new booking from the guard's pricing profile.
+
+        The shift is quoted like the quotes endpoint (the venue's pricing
+        zone, else the guard's cheapest) and stored as the hourly rate
+        that reproduces the quoted total, since the booking's total is
+        computed from its rate and duration.
+        """
+        # Imported here: the quote engine reuses this module's overlap condition
+        from services.pricing_service import PricingService
+
+        try:
+            ZoneInfo(booking_data.timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError("Unknown timezone")
+
+        pricing_zone_id = None
+        if booking_data.latitude is not None and booking_data.longitude is not None:
+            pricing_zone_id = await zone_resolver.zone_for(booking_data.latitude, booking_data.longitude)
+
+        start, end = booking_data.start_datetime, booking_data.end_datetime
+        quotes = await PricingService(self.db).quote(
+            start,
+            end,
+            timezone=booking_data.timezone,
+            event_type_id=booking_data.event_type_id,
+            guard_ids=[booking_data.guard_id],
+            pricing_zone_id=pricing_zone_id,
+            # Overlapping bookings were already reported as a BookingConflict
+            exclude_booked=False,
+            limit=1
+        )
+        if not quotes:
+            raise ValueError("Guard has no pricing for the requested period")
+
+        total = Decimal(str(quotes[0]["total_amount"]))
+        hours = Decimal(str((end - start).total_seconds())) / 3600
+        hourly_rate = (total / hours).quantize(CENT, rounding=ROUND_HALF_UP)
+        platform_fee = (total * Decimal(str(settings.BOOKING_PLATFORM_FEE_RATE))).quantize(CENT, rounding=ROUND_HALF_UP)
+        return hourly_rate, platform_fee
+
+    async def get_booking(self, booking_id: int) -> Optional[Booking]:
+        """Get a booking by ID"""
+        result = await self.db.execute(select(Booking).where(Booking.id == booking_id))
+        return result.scalar_one_or_none()
+
+    async def get_bookings(
+        self,
+        user_id: int,
+        user_type: str,
+        status: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Booking]:
+        """Bookings the user takes part in, latest start first (admins see all)"""
+        query = select(Booking)
+        if user_type == "guard":
+            query = query.where(Booking.guard_id == user_id)
+        elif user_type != "admin":
+            query = query.where(Booking.consumer_id == user_id)
+        if status:
+            query = query.where(Booking.status == status)
+
+        result = await self.db.execute(
+            query.order_by(Booking.start_datetime.desc(), Booking.id.desc()).offset(skip).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def update_booking(self, booking: Booking, user_id: int, booking_data: BookingUpdate) -> Booking:
+        """Update the fields the user's side of the booking owns"""
+        if booking.status not in EDITABLE_STATUSES:
+            raise ValueError(f"Cannot edit a {booking.status} booking")
+
+        allowed = CONSUMER_FIELDS if user_id == booking.consumer_id else GUARD_FIELDS
+        changes = booking_data.dict(exclude_unset=True)
+        forbidden = set(changes) - allowed
+        if forbidden:
+            raise ValueError(f"Not allowed to change {', '.join(sorted(forbidden))}")
+
+        start = changes.get("start_datetime") or booking.start_datetime
+        end = changes.get("end_datetime") or booking.end_datetime
+        rescheduled = "start_datetime" in changes or "end_datetime" in changes
+        if rescheduled:
+            if start.tzinfo is None or end.tzinfo is None:
+                raise ValueError("Booking times must include a timezone")
+            if end <= start:
+                raise ValueError("End datetime must be after start datetime")
+            schedule = await self.db.scalar(
+                select(Profile.availability_schedule).where(Profile.user_id == booking.guard_id)
+            )
+            if not schedule_covers(schedule, start, end):
+                raise ValueError("Guard is not available during the requested period")
+            conflicts = await self.find_conflicts(booking.guard_id, start, end, exclude_booking_id=booking.id)
+            if conflicts:
+                raise BookingConflict(conflicts)
+
+        for field, value in changes.items():
+            setattr(booking, field, value)
+        await self._commit_period(booking)
+        return booking
+
+    async def change_status(
+        self, booking: Booking, action: str, user_id: int, reason: Optional[str] = None
+    ) -> Booking:
+        """Apply a lifecycle action (confirm, start, complete, cancel) and record it"""
+        allowed_from, new_status = BOOKING_TRANSITIONS[action]
+        if booking.status not in allowed_from:
+            raise ValueError(f"Cannot {action} a {booking.status} booking")
+
+        now = datetime.now(timezone.utc)
+        old_status = booking.status
+        booking.status = new_status
+        if new_status == "confirmed":
+            booking.confirmed_at = now
+        elif new_status == "in_progress":
+            booking.started_at = now
+        elif new_status == "completed":
+            booking.completed_at = now
+        elif new_status == "cancelled":
+            booking.cancelled_at = now
+            booking.cancelled_by = user_id
+            booking.cancellation_reason = reason
+
+        self.db.add(BookingStatusHistory(
+            booking_id=booking.id,
+            old_status=old_status,
+            new_status=new_status,
+            changed_by=user_id,
+            reason=reason
+        ))
+        await self.db.commit()
+        # Reload server-computed columns (amounts, updated_at)
+        await self.db.refresh(booking)
+        return booking
+
+    async def _commit_period(self, booking: Booking) -> None:
+        # The pre-check can race a concurrent booking; the exclusion constraint settles it.
+        # Read the period first: rollback expires the booking, and loading
+        # expired attributes lazily isn't possible on an async session
+        booking_id, guard_id = booking.id, booking.guard_id
+        start, end = booking.start_datetime, booking.end_datetime
+        try:
+            await self.db.commit()
+        except IntegrityError as e:
+            await self.db.rollback()
+            if OVERLAP_CONSTRAINT in str(e.orig):
+                raise BookingConflict(
+                    await self.find_conflicts(guard_id, start, end, exclude_booking_id=booking_id)
+                ) from e
+            raise
+        await self.db.refresh(booking)
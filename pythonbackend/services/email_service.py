@@ -2,11 +2,11 @@
 Email service for sending emails
 """
 
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from typing import Optional, List, Tuple
 from core.config import settings
+from services.mail_transport import mail_transport
 
 
 class EmailService:
@@ -19,6 +19,25 @@ class EmailService:
         self.smtp_password = settings.SMTP_PASSWORD
         self.smtp_use_tls = settings.SMTP_USE_TLS
     
+    @property
+    def is_configured(self) -> bool:
+        return all([self.smtp_host, self.smtp_username, self.smtp_password])
+    
+    def _build_message(
+        self, to_email: str, subject: str, body: str, is_html: bool = False
+    ) -> MIMEMultipart:
+        msg = MIMEMultipart()
+        msg['From'] = self.smtp_username
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        
+        if is_html:
+            msg.attach(MIMEText(body, 'html'))
+        else:
+            msg.attach(MIMEText(body, 'plain'))
+        
+        return msg
+    
     async def send_email(
         self, 
         to_email: str, 
@@ -26,34 +45,34 @@ class EmailService:
         body: str, 
         is_html: bool = False
     ) -> bool:
-        """Send email"""
-        if not all([self.smtp_host, self.smtp_username, self.smtp_password]):
+        """Send email, returning whether the SMTP server accepted it"""
+        if not self.is_configured:
             print(f"Email not configured. Would send to {to_email}: {subject}")
             return True
         
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.smtp_username
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            if is_html:
-                msg.attach(MIMEText(body, 'html'))
-            else:
-                msg.attach(MIMEText(body, 'plain'))
-            
-            server = smtplib.SMTP(self.smtp_host, self.smtp_port)
-            if self.smtp_use_tls:
-                server.starttls()
-            server.login(self.smtp_username, self.smtp_password)
-            server.send_message(msg)
-            server.quit()
-            
-            return True
+            msg = self._build_message(to_email, subject, body, is_html)
+            return await mail_transport.send(msg)
         except Exception as e:
             print(f"Error sending email: {e}")
             return False
     
+    async def send_bulk_emails(
+        self,
+        emails: List[Tuple[str, str, str]],
+        is_html: bool = False
+    ) -> List[bool]:
+        """Send many (to_email, subject, body) emails, returning whether each was accepted"""
+        if not self.is_configured:
+            print(f"Email not configured. Would send {len(emails)} emails")
+            return [True] * len(emails)
+        
+        messages = [
+            self._build_message(to_email, subject, body, is_html)
+            for to_email, subject, body in emails
+        ]
+        return await mail_transport.send_many(messages)
+    
     async def send_verification_email(self, email: str, token: str) -> bool:
         """Send email verification email"""
         subject = "Verify Your Email - Security Guard App"
@@ -0,0 +1,128 @@
+"""
+Write-behind buffer for post engagement counters
+"""
+
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import update, values, column, func, Integer
+from sqlalchemy.orm.attributes import set_committed_value
+
+from core.config import settings
+from db.session import AsyncSessionLocal
+from db.models.post import Post
+from services.trending_service import trending_bump_values, LIKE_WEIGHT, COMMENT_WEIGHT
+
+logger = logging.getLogger(__name__)
+
+# Posts per UPDATE statement (3 bind parameters each)
+FLUSH_CHUNK_SIZE = 1000
+
+
+class EngagementCounterBuffer:
+    """Collects like/comment deltas per post and flushes them in batches.
+
+    Bursts of likes on a viral post then cost one row update per flush
+    interval instead of one per like. The buffer is per process; reads
+    merge in the pending deltas of the current process.
+    """
+
+    def __init__(self):
+        self._pending: Dict[int, List[int]] = {}
+        self._stopping = asyncio.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ENGAGEMENT_BUFFER_ENABLED
+
+    def add(self, post_id: int, likes: int = 0, comments: int = 0) -> None:
+        """Record a counter delta for a post"""
+        delta = self._pending.setdefault(post_id, [0, 0])
+        delta[0] += likes
+        delta[1] += comments
+
+    def pending(self, post_id: int) -> Tuple[int, int]:
+        """Unflushed (likes, comments) delta for a post"""
+        likes, comments = self._pending.get(post_id, (0, 0))
+        return likes, comments
+
+    def merge(self, posts: Iterable[Post]) -> None:
+        """Add unflushed deltas to the counters of loaded posts.
+
+        The values are set as already committed, so the session never
+        writes them back on top of the buffered deltas.
+        """
+        for post in posts:
+            likes, comments = self.pending(post.id)
+            if likes:
+                set_committed_value(post, "like_count", max((post.like_count or 0) + likes, 0))
+            if comments:
+                set_committed_value(post, "comment_count", max((post.comment_count or 0) + comments, 0))
+
+    async def flush(self) -> int:
+        """Write all pending deltas to posts, returning the number of posts touched"""
+        if not self._pending:
+            return 0
+
+        # Swap the buffer out before awaiting so new deltas go to a fresh dict
+        batch, self._pending = self._pending, {}
+        rows = [
+            (post_id, likes, comments)
+            for post_id, (likes, comments) in batch.items()
+            if likes or comments
+        ]
+
+        committed = False
+        try:
+            async with AsyncSessionLocal() as db:
+                for start in range(0, len(rows), FLUSH_CHUNK_SIZE):
+                    deltas = values(
+                        column("post_id", Integer),
+                        column("likes", Integer),
+                        column("comments", Integer),
+                        name="deltas"
+                    ).data(rows[start:start + FLUSH_CHUNK_SIZE])
+                    await db.execute(
+                        update(Post)
+                        .where(Post.id == deltas.c.post_id)
+                        .values(
+                            like_count=func.greatest(Post.like_count + deltas.c.likes, 0),
+                            comment_count=func.greatest(Post.comment_count + deltas.c.comments, 0),
+                            **trending_bump_values(
+                                deltas.c.likes * LIKE_WEIGHT + deltas.c.comments * COMMENT_WEIGHT
+                            )
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                await db.commit()
+                committed = True
+        except BaseException:
+            # Put the deltas back so the next flush retries them (also when
+            # the flush is cancelled), unless they were already committed and
+            # only closing the session failed
+            if not committed:
+                for post_id, likes, comments in rows:
+                    self.add(post_id, likes, comments)
+            raise
+
+        return len(rows)
+
+    async def run(self) -> None:
+        """Flush pending deltas every ENGAGEMENT_FLUSH_INTERVAL_MS until stop() is called"""
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), settings.ENGAGEMENT_FLUSH_INTERVAL_MS / 1000)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing engagement counters: {e}")
+
+    def stop(self) -> None:
+        """Make run() do a final flush and return, without interrupting a flush in progress"""
+        self._stopping.set()
+
+
+engagement_buffer = EngagementCounterBuffer()
@@ -0,0 +1,107 @@
+"""
+Geohash encoding and radius covering for location search
+"""
+
+import math
+from typing import List, Tuple
+
+# Stored precision of Profile.geohash (~4.8m x 4.8m cells)
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _cell_size(precision: int) -> Tuple[float, float]:
+    """(latitude, longitude) size in degrees of a cell at `precision`"""
+    bits = 5 * precision
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Geohash of a point"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    value = 0
+    bit = 0
+    even = True  # bits alternate longitude, latitude
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_BASE32[value])
+            value = 0
+            bit = 0
+    return "".join(chars)
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) of a spherical cap; longitudes may exceed ±180"""
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    min_lat, max_lat = latitude - dlat, latitude + dlat
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        # The cap contains a pole, so every longitude is within reach
+        return max(min_lat, -90.0), min(max_lat, 90.0), longitude - 180.0, longitude + 180.0
+    dlon = math.degrees(math.asin(min(math.sin(angle) / math.cos(math.radians(latitude)), 1.0)))
+    return min_lat, max_lat, longitude - dlon, longitude + dlon
+
+
+def covering_cells(
+    latitude: float,
+    longitude: float,
+    radius_km: float,
+    max_cells: int = 16,
+    max_precision: int = GEOHASH_PRECISION
+) -> List[str]:
+    """Geohash prefixes whose cells together cover the circle's bounding box.
+
+    Uses the finest precision that needs at most `max_cells` cells, so the
+    covered area stays close to the circle while the query stays small.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+
+    best = None
+    for precision in range(1, max_precision + 1):
+        lat_size, lon_size = _cell_size(precision)
+        rows = math.floor((max_lat + 90.0) / lat_size) - math.floor((min_lat + 90.0) / lat_size) + 1
+        columns = math.floor((max_lon + 180.0) / lon_size) - math.floor((min_lon + 180.0) / lon_size) + 1
+        columns = min(columns, 1 << ((5 * precision + 1) // 2))
+        if rows * columns > max_cells:
+            break
+        best = (precision, lat_size, lon_size, rows, columns)
+
+    if best is None:
+        return [""]  # even precision 1 needs too many cells: search everything
+    precision, lat_size, lon_size, rows, columns = best
+
+    first_row = math.floor((min_lat + 90.0) / lat_size)
+    first_column = math.floor((min_lon + 180.0) / lon_size)
+    cells = set()
+    for row in range(first_row, first_row + rows):
+        cell_lat = min(-90.0 + (row + 0.5) * lat_size, 90.0)
+        for column in range(first_column, first_column + columns):
+            # Wrap across the antimeridian
+            cell_lon = (column + 0.5) * lon_size % 360.0 - 180.0
+            cells.add(encode(cell_lat, cell_lon, precision))
+    return sorted(cells)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(math.sqrt(a), 1.0))
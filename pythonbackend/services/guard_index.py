@@ -0,0 +1,359 @@
+"""
+In-memory grid index of available guard locations
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, union, or_, and_, func, any_, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from core.config import settings
+from db.session import AsyncSessionLocal
+from db.models.profile import Profile
+from services.geo import bounding_box, haversine_km, EARTH_RADIUS_KM
+from services.search_service import SearchService, guard_pricing, guard_is_available
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY channel fed by the profiles/guard_pricing triggers (see migration 0e4c7a9d2b61)
+GUARD_LOCATIONS_CHANNEL = "guard_locations"
+
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+Cell = Tuple[int, int]
+
+
+class GuardGridIndex:
+    """Answers k-nearest available guard queries from memory.
+
+    Guards are bucketed into a uniform latitude/longitude grid of
+    GUARD_INDEX_CELL_DEGREES cells; a query walks rings of cells outward
+    from the query point and stops once no unvisited cell can hold a
+    closer guard. The index is built at startup, updated per guard when
+    Postgres signals a change on GUARD_LOCATIONS_CHANNEL, caught up from
+    `updated_at` every GUARD_INDEX_REFRESH_SECONDS and rebuilt every
+    GUARD_INDEX_REBUILD_SECONDS. Queries fall back to Postgres when the
+    index hasn't synced recently or the caller asks for consistency.
+    """
+
+    def __init__(self, cell_degrees: Optional[float] = None):
+        self.cell_degrees = cell_degrees or settings.GUARD_INDEX_CELL_DEGREES
+        self._columns = math.ceil(360.0 / self.cell_degrees)
+        self._rows = math.ceil(180.0 / self.cell_degrees)
+        self._cells: Dict[Cell, Dict[int, Tuple[float, float]]] = {}
+        self._positions: Dict[int, Cell] = {}
+        self._row_columns: Dict[int, Set[int]] = {}  # occupied columns of each row
+        self._pending: Set[int] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._changed_during_build: Optional[Set[int]] = None
+        self._synced_at: Optional[float] = None  # monotonic time of the last successful sync
+        self._db_synced_at = None  # database clock at the last sync, for catch-up queries
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _cell(self, latitude: float, longitude: float) -> Cell:
+        row = min(int((latitude + 90.0) / self.cell_degrees), self._rows - 1)
+        column = int((longitude + 180.0) / self.cell_degrees) % self._columns
+        return row, column
+
+    def _index(self, guards: Iterable[Tuple[int, float, float]]):
+        cells: Dict[Cell, Dict[int, Tuple[float, float]]] = {}
+        positions: Dict[int, Cell] = {}
+        row_columns: Dict[int, Set[int]] = {}
+        for user_id, latitude, longitude in guards:
+            cell = self._cell(latitude, longitude)
+            cells.setdefault(cell, {})[user_id] = (latitude, longitude)
+            positions[user_id] = cell
+            row_columns.setdefault(cell[0], set()).add(cell[1])
+        return cells, positions, row_columns
+
+    def build(self, guards: Iterable[Tuple[int, float, float]]) -> None:
+        """Replace the whole index with (user_id, latitude, longitude) entries"""
+        # Swap in whole structures so queries never see a partial index
+        self._cells, self._positions, self._row_columns = self._index(guards)
+        self.loaded = True
+
+    def upsert(self, user_id: int, latitude: float, longitude: float) -> None:
+        """Add a guard or move it to a new location"""
+        self.remove(user_id)
+        if self._changed_during_build is not None:
+            self._changed_during_build.add(user_id)
+        cell = self._cell(latitude, longitude)
+        self._cells.setdefault(cell, {})[user_id] = (latitude, longitude)
+        self._positions[user_id] = cell
+        self._row_columns.setdefault(cell[0], set()).add(cell[1])
+
+    def remove(self, user_id: int) -> None:
+        """Drop a guard (no-op if it isn't indexed)"""
+        if self._changed_during_build is not None:
+            self._changed_during_build.add(user_id)
+        cell = self._positions.pop(user_id, None)
+        if cell is None:
+            return
+        members = self._cells[cell]
+        del members[user_id]
+        if not members:
+            del self._cells[cell]
+            columns = self._row_columns[cell[0]]
+            columns.discard(cell[1])
+            if not columns:
+                del self._row_columns[cell[0]]
+
+    def _ring(self, row: int, column: int, ring: int, row_span: int, column_span: int) -> Iterable[Cell]:
+        """Cells `ring` steps from (row, column), clipped to `row_span` rows and `column_span` columns"""
+        if ring == 0:
+            yield row, column
+            return
+        first, last = column - min(ring, column_span), column + min(ring, column_span)
+        if ring <= row_span:
+            for r in (row - ring, row + ring):
+                if 0 <= r < self._rows:
+                    for c in range(first, last + 1):
+                        yield r, c % self._columns
+        if ring <= column_span:
+            for r in range(max(row - ring + 1, row - row_span, 0), min(row + ring - 1, row + row_span, self._rows - 1) + 1):
+                yield r, (column - ring) % self._columns
+                yield r, (column + ring) % self._columns
+
+    def _window_cells(self, row: int, column: int, row_span: int, column_span: int) -> Iterable[Tuple[int, Cell]]:
+        """(ring, cell) of the cells in the search window, nearest rings first.
+
+        Walks rings of cells outward, or, when the window holds more cells than
+        its rows have occupied ones (typically at high latitudes, where cells
+        are narrow and the window is many columns wide), sorts just the
+        occupied cells by ring.
+        """
+        rows = range(max(row - row_span, 0), min(row + row_span, self._rows - 1) + 1)
+        occupied = sum(len(self._row_columns.get(r, ())) for r in rows)
+        if occupied < (2 * row_span + 1) * (2 * column_span + 1):
+            cells = []
+            for r in rows:
+                for c in self._row_columns.get(r, ()):
+                    offset = min((c - column) % self._columns, (column - c) % self._columns)
+                    if offset <= column_span:
+                        cells.append((max(abs(r - row), offset), (r, c)))
+            cells.sort()
+            yield from cells
+            return
+
+        # Near the poles the window spans every longitude, so rings overlap themselves
+        seen: Optional[Set[Cell]] = set() if 2 * column_span + 1 >= self._columns else None
+        for ring in range(max(row_span, column_span) + 1):
+            for cell in self._ring(row, column, ring, row_span, column_span):
+                if seen is not None:
+                    if cell in seen:
+                        continue
+                    seen.add(cell)
+                if cell in self._cells:
+                    yield ring, cell
+
+    def nearest(
+        self, latitude: float, longitude: float, k: int, radius_km: float
+    ) -> List[Tuple[int, float]]:
+        """(user_id, distance_km) of the `k` nearest indexed guards within `radius_km`"""
+        row, column = self._cell(latitude, longitude)
+        cell_km = self.cell_degrees * KM_PER_DEGREE
+        # Matches lie within the radius in latitude (rows have constant height)
+        # and within the search circle's bounding box in longitude
+        row_span = math.ceil(radius_km / cell_km) + 1
+        _, _, _, max_lon = bounding_box(latitude, longitude, radius_km)
+        column_span = min(math.ceil((max_lon - longitude) / self.cell_degrees) + 1, self._columns // 2)
+
+        heap: List[Tuple[float, int]] = []  # (-distance, user_id), the k best so far
+        checked_ring = 0
+        for ring, cell in self._window_cells(row, column, row_span, column_span):
+            if ring > checked_ring and len(heap) == k:
+                checked_ring = ring
+                # Points in this ring are at least ring - 1 whole cells away; cells
+                # narrow towards the poles, so use the most poleward row's width
+                poleward = min(abs(latitude) + (ring + 1) * self.cell_degrees, 90.0)
+                bound = (ring - 1) * cell_km * min(1.0, math.cos(math.radians(poleward))) * 0.99
+                if bound > -heap[0][0]:
+                    break
+
+            for user_id, (lat, lon) in self._cells[cell].items():
+                distance = haversine_km(latitude, longitude, lat, lon)
+                if distance > radius_km:
+                    continue
+                if len(heap) < k:
+                    heapq.heappush(heap, (-distance, user_id))
+                elif distance < -heap[0][0]:
+                    heapq.heapreplace(heap, (-distance, user_id))
+
+        return sorted(((user_id, -negative) for negative, user_id in heap), key=lambda item: item[1])
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the index has synced with Postgres recently enough to answer queries"""
+        return (
+            self.loaded
+            and self._synced_at is not None
+            and time.monotonic() - self._synced_at <= settings.GUARD_INDEX_MAX_STALENESS_SECONDS
+        )
+
+    async def nearest_available(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int,
+        radius_km: float,
+        consistent: bool = False
+    ) -> Tuple[List[Tuple[int, float]], str]:
+        """k nearest available guards and where they came from ("memory" or "database").
+
+        Pass `consistent=True` to read committed state from Postgres instead
+        of the (possibly slightly behind) in-memory index.
+        """
+        if not consistent and self.fresh:
+            return self.nearest(latitude, longitude, k, radius_km), "memory"
+        async with AsyncSessionLocal() as db:
+            guards = await SearchService(db).nearest_available_guards(latitude, longitude, k, radius_km)
+        return guards, "database"
+
+    @staticmethod
+    def _available_guards():
+        return (
+            select(Profile.user_id, Profile.latitude, Profile.longitude)
+            .where(
+                Profile.user_type == "guard",
+                Profile.status == "active",
+                Profile.latitude.is_not(None),
+                Profile.longitude.is_not(None),
+                guard_is_available()
+            )
+        )
+
+    async def load(self) -> None:
+        """Rebuild the index from Postgres"""
+        started = time.monotonic()
+        async with AsyncSessionLocal() as db:
+            db_now = (await db.execute(select(func.now()))).scalar()
+            result = await db.stream(self._available_guards().execution_options(yield_per=10000))
+            guards = [
+                (user_id, float(latitude), float(longitude))
+                async for user_id, latitude, longitude in result
+            ]
+        # Large indexes take seconds to build, so do it off the event loop;
+        # guards updated meanwhile are re-read once the new index is in place
+        self._changed_during_build = set()
+        try:
+            cells, positions, row_columns = await asyncio.to_thread(self._index, guards)
+            changed = self._changed_during_build
+        finally:
+            self._changed_during_build = None
+        self._cells, self._positions, self._row_columns = cells, positions, row_columns
+        self.loaded = True
+        await self.refresh_guards(changed)
+        self._db_synced_at = db_now
+        self._synced_at = started
+        logger.info(f"Loaded guard index: {len(guards)} guards in {time.monotonic() - started:.2f}s")
+
+    async def refresh_guards(self, user_ids: Iterable[int]) -> None:
+        """Re-read the given guards, indexing the available ones and dropping the rest"""
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                self._available_guards().where(
+                    Profile.user_id == any_(bindparam("user_ids", user_ids, type_=ARRAY(Integer)))
+                )
+            )
+            available = {
+                user_id: (float(latitude), float(longitude)) for user_id, latitude, longitude in result.all()
+            }
+        for user_id in user_ids:
+            if user_id in available:
+                self.upsert(user_id, *available[user_id])
+            else:
+                self.remove(user_id)
+
+    def handle_notification(self, payload: str) -> None:
+        """NOTIFY callback; the payload is the user_id of a guard whose location or availability changed"""
+        try:
+            self._pending.add(int(payload))
+        except ValueError:
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_pending())
+
+    async def _flush_pending(self) -> None:
+        # Bursts of notifications are coalesced into one query per pass
+        while self._pending:
+            user_ids, self._pending = self._pending, set()
+            try:
+                await self.refresh_guards(user_ids)
+            except Exception as e:
+                logger.error(f"Error refreshing guard index: {e}")
+
+    async def catch_up(self) -> None:
+        """Refresh guards changed since the last sync (covers missed notifications)"""
+        if not self.loaded or self._db_synced_at is None:
+            await self.load()
+            return
+
+        started = time.monotonic()
+        # Overlap the previous window so rows committed late by long transactions aren't skipped
+        since = self._db_synced_at - timedelta(seconds=settings.GUARD_INDEX_REFRESH_SECONDS)
+        async with AsyncSessionLocal() as db:
+            db_now = (await db.execute(select(func.now()))).scalar()
+            result = await db.execute(
+                union(
+                    select(Profile.user_id).where(
+                        Profile.user_type == "guard", Profile.updated_at > since
+                    ),
+                    select(guard_pricing.c.guard_id).where(
+                        or_(
+                            guard_pricing.c.updated_at > since,
+                            # Availability windows that opened or closed since the last sync
+                            and_(guard_pricing.c.available_from > since, guard_pricing.c.available_from <= db_now),
+                            and_(guard_pricing.c.available_until > since, guard_pricing.c.available_until <= db_now)
+                        )
+                    )
+                )
+            )
+            changed = result.scalars().all()
+        await self.refresh_guards(changed)
+        self._db_synced_at = db_now
+        self._synced_at = started
+
+    async def reload(self) -> None:
+        """Resynchronise after the listener reconnects"""
+        await self.catch_up()
+
+    async def run_refresh_loop(self) -> None:
+        """Catch up and periodically rebuild the index (runs for the app lifetime)"""
+        last_rebuild = time.monotonic()
+        while True:
+            await asyncio.sleep(settings.GUARD_INDEX_REFRESH_SECONDS)
+            try:
+                if time.monotonic() - last_rebuild >= settings.GUARD_INDEX_REBUILD_SECONDS:
+                    # Deleted rows and missed window changes don't show up in catch-up
+                    await self.load()
+                    last_rebuild = time.monotonic()
+                else:
+                    await self.catch_up()
+            except Exception as e:
+                logger.error(f"Error syncing guard index: {e}")
+
+    def stats(self) -> dict:
+        """Index size and sync age for the health endpoint"""
+        return {
+            "guards": len(self._positions),
+            "cells": len(self._cells),
+            "fresh": self.fresh,
+            "synced_seconds_ago": (
+                round(time.monotonic() - self._synced_at, 1) if self._synced_at is not None else None
+            )
+        }
+
+
+guard_index = GuardGridIndex()
@@ -0,0 +1,246 @@
+"""
+Durable background job queue backed by Postgres
+"""
+
+import asyncio
+import logging
+import random
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, func, and_, or_, literal_column
+
+from core.config import settings
+from db.session import AsyncSessionLocal
+from db.models.job import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[AsyncSession, Dict[str, Any]], Awaitable[None]]
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str):
+    """Register an async `handler(db, payload)` for jobs of `kind`"""
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(
+    db: AsyncSession,
+    kind: str,
+    payload: Dict[str, Any],
+    queue: str = "default",
+    delay: Optional[timedelta] = None,
+    max_attempts: Optional[int] = None
+) -> BackgroundJob:
+    """Add a job to the caller's transaction; it becomes visible to workers on commit"""
+    job = BackgroundJob(
+        queue=queue,
+        kind=kind,
+        payload=payload,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS
+    )
+    if delay:
+        job.run_at = func.now() + delay
+    db.add(job)
+    return job
+
+
+def _lease_held(job):
+    """SQL condition: the claimed attempt `job` still holds its unexpired lease"""
+    return and_(
+        BackgroundJob.id == job.id,
+        BackgroundJob.status == literal_column("'running'"),
+        BackgroundJob.attempts == job.attempts,
+        BackgroundJob.locked_at >= func.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+    )
+
+
+def _retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, capped at JOB_RETRY_MAX_SECONDS"""
+    base = settings.JOB_RETRY_BASE_SECONDS
+    return min(base * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS) + random.uniform(0, base)
+
+
+class JobWorker:
+    """Claims due jobs with FOR UPDATE SKIP LOCKED and runs their handlers"""
+
+    def __init__(self, queues: Sequence[str] = ("default",), batch_size: Optional[int] = None):
+        self.queues = list(queues)
+        self.batch_size = batch_size or settings.JOB_BATCH_SIZE
+        self._stopping = asyncio.Event()
+
+    async def claim(self) -> list:
+        """Lease up to `batch_size` due jobs (and jobs whose lease has expired)"""
+        now = func.now()
+        lease_expired = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+        claimable = (
+            select(BackgroundJob.id)
+            .where(
+                BackgroundJob.queue.in_(self.queues),
+                # Statuses are inlined so prepared (generic) plans can still
+                # match the partial index
+                or_(
+                    and_(BackgroundJob.status == literal_column("'pending'"), BackgroundJob.run_at <= now),
+                    and_(
+                        BackgroundJob.status == literal_column("'running'"),
+                        BackgroundJob.locked_at < lease_expired,
+                        BackgroundJob.attempts < BackgroundJob.max_attempts
+                    )
+                )
+            )
+            .order_by(BackgroundJob.run_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id.in_(claimable))
+                .values(status="running", locked_at=now, attempts=BackgroundJob.attempts + 1)
+                .returning(
+                    BackgroundJob.id,
+                    BackgroundJob.kind,
+                    BackgroundJob.payload,
+                    BackgroundJob.attempts,
+                    BackgroundJob.max_attempts
+                )
+                .execution_options(synchronize_session=False)
+            )
+            jobs = result.all()
+            await db.commit()
+        return jobs
+
+    async def sweep(self) -> int:
+        """Mark jobs whose lease expired on their final attempt as failed.
+
+        claim() no longer picks these up, so without the sweep a job whose
+        worker died during its last attempt would stay 'running' forever.
+        """
+        lease_expired = func.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(BackgroundJob)
+                .where(
+                    BackgroundJob.queue.in_(self.queues),
+                    BackgroundJob.status == literal_column("'running'"),
+                    BackgroundJob.locked_at < lease_expired,
+                    BackgroundJob.attempts >= BackgroundJob.max_attempts
+                )
+                .values(
+                    status="failed",
+                    locked_at=None,
+                    last_error=func.coalesce(BackgroundJob.last_error, "Lease expired on the final attempt")
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        if result.rowcount:
+            logger.warning(f"Marked {result.rowcount} jobs with expired leases as failed")
+        return result.rowcount
+
+    async def execute(self, job) -> None:
+        """Run one claimed job, then delete it or schedule a retry"""
+        handler = _handlers.get(job.kind)
+        error = None
+        lease = asyncio.create_task(self._renew_lease(job))
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind '{job.kind}'")
+            async with AsyncSessionLocal() as db:
+                await handler(db, job.payload)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.error(f"Job {job.id} ({job.kind}) failed on attempt {job.attempts}: {error}")
+        finally:
+            lease.cancel()
+
+        # Only finish the job while this attempt still holds it; once the
+        # lease has expired another worker may have claimed the job again
+        async with AsyncSessionLocal() as db:
+            if error is None:
+                result = await db.execute(delete(BackgroundJob).where(_lease_held(job)))
+            elif job.attempts >= job.max_attempts:
+                result = await db.execute(
+                    update(BackgroundJob)
+                    .where(_lease_held(job))
+                    .values(status="failed", locked_at=None, last_error=error)
+                )
+            else:
+                result = await db.execute(
+                    update(BackgroundJob)
+                    .where(_lease_held(job))
+                    .values(
+                        status="pending",
+                        locked_at=None,
+                        last_error=error,
+                        run_at=func.now() + timedelta(seconds=_retry_delay(job.attempts))
+                    )
+                )
+            await db.commit()
+        if not result.rowcount:
+            logger.warning(f"Job {job.id} ({job.kind}) lost its lease on attempt {job.attempts}; left to the next claim")
+
+    async def _renew_lease(self, job) -> None:
+        """Refresh a running job's lease so another worker doesn't claim it mid-run.
+
+        Handlers wait on delivery results (e.g. SMTP), which can take longer
+        than JOB_LOCK_TIMEOUT_SECONDS for a large batch.
+        """
+        while True:
+            await asyncio.sleep(settings.JOB_LOCK_TIMEOUT_SECONDS / 3)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(BackgroundJob)
+                        .where(_lease_held(job))
+                        .values(locked_at=func.now())
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.error(f"Error renewing lease for job {job.id}: {e}")
+
+    async def run(self) -> None:
+        """Process jobs until stop() is called"""
+        logger.info(f"Job worker started (queues: {', '.join(self.queues)})")
+        loop = asyncio.get_running_loop()
+        next_sweep = loop.time()
+        while not self._stopping.is_set():
+            if loop.time() >= next_sweep:
+                next_sweep = loop.time() + settings.JOB_SWEEP_INTERVAL_SECONDS
+                try:
+                    await self.sweep()
+                except Exception as e:
+                    logger.error(f"Error sweeping expired jobs: {e}")
+
+            try:
+                jobs = await self.claim()
+            except Exception as e:
+                logger.error(f"Error claiming jobs: {e}")
+                jobs = []
+
+            if jobs:
+                # One job failing to record its outcome must not stop the worker;
+                # its lease expires and it is claimed again (or swept)
+                results = await asyncio.gather(*(self.execute(job) for job in jobs), return_exceptions=True)
+                for job, result in zip(jobs, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Error finishing job {job.id} ({job.kind}): {result}")
+                continue
+
+            try:
+                await asyncio.wait_for(self._stopping.wait(), settings.JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+        logger.info("Job worker stopped")
+
+    def stop(self) -> None:
+        """Finish in-flight jobs and exit the run loop"""
+        self._stopping.set()
@@ -0,0 +1,162 @@
+"""
+Queued SMTP transport with a reused, authenticated connection
+"""
+
+import asyncio
+import logging
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import List, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPTransport:
+    """Delivers queued messages over one long-lived SMTP connection.
+
+    Messages go through a bounded queue, so the event loop never waits on
+    the SMTP handshake. A background task drains the queue in batches and
+    hands each batch to a single dedicated thread that owns the
+    connection, reconnecting when it goes idle or drops. Each queued
+    message carries a future that resolves to whether the server accepted
+    it; send() and send_many() wait for those results.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp")
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _ensure_started(self) -> None:
+        if self._worker is None or self._worker.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=settings.EMAIL_QUEUE_MAX_SIZE)
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, message: Message) -> "asyncio.Future[bool]":
+        """Queue a message, waiting for room when the queue is full.
+
+        Returns a future that resolves to True once the SMTP server has
+        accepted the message, or False if delivery failed.
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((message, future))
+        return future
+
+    async def send(self, message: Message) -> bool:
+        """Deliver a message, returning whether the SMTP server accepted it"""
+        return await (await self.submit(message))
+
+    async def send_many(self, messages: List[Message]) -> List[bool]:
+        """Deliver several messages, returning each one's result in order.
+
+        Messages are queued as room frees up, so a batch larger than
+        EMAIL_QUEUE_MAX_SIZE waits for the transport instead of overflowing.
+        """
+        futures = [await self.submit(message) for message in messages]
+        return list(await asyncio.gather(*futures))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < settings.EMAIL_BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            results = [False] * len(batch)
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self._deliver_batch, [message for message, _ in batch]
+                )
+            except Exception as e:
+                logger.error(f"Error delivering email batch: {e}")
+            finally:
+                for (_, future), delivered in zip(batch, results):
+                    # The sender may have given up waiting
+                    if not future.done():
+                        future.set_result(delivered)
+                    self._queue.task_done()
+
+    # The methods below run on the transport's dedicated thread
+
+    def _connection(self) -> smtplib.SMTP:
+        idle = time.monotonic() - self._last_used
+        if self._smtp is not None and idle > settings.SMTP_IDLE_TIMEOUT_SECONDS:
+            # Servers drop idle sessions; probe before reusing
+            try:
+                self._smtp.noop()
+            except smtplib.SMTPException:
+                self._disconnect()
+
+        if self._smtp is None:
+            smtp = smtplib.SMTP(
+                settings.SMTP_HOST, settings.SMTP_PORT,
+                timeout=settings.SMTP_TIMEOUT_SECONDS
+            )
+            if settings.SMTP_USE_TLS:
+                smtp.starttls()
+            smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+            self._smtp = smtp
+
+        return self._smtp
+
+    def _disconnect(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._smtp = None
+
+    def _deliver_batch(self, batch: List[Message]) -> List[bool]:
+        results = []
+        for message in batch:
+            delivered = False
+            # Retry once on a fresh connection if the reused one has died
+            for attempt in range(2):
+                try:
+                    self._connection().send_message(message)
+                    self._last_used = time.monotonic()
+                    delivered = True
+                    break
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                    # The server refused this message; the connection is still good
+                    logger.error(f"Error sending email to {message['To']}: {e}")
+                    break
+                except OSError as e:
+                    # SMTPException is an OSError too: anything else drops the connection
+                    self._disconnect()
+                    if attempt:
+                        logger.error(f"Error sending email to {message['To']}: {e}")
+            results.append(delivered)
+        return results
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Drain the queue (up to `timeout` seconds) and close the connection"""
+        if self._worker is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dropping {self._queue.qsize()} undelivered emails on shutdown")
+            self._worker.cancel()
+            self._worker = None
+            # Anyone still waiting on a dropped message sees it as failed
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_result(False)
+                self._queue.task_done()
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._disconnect)
+
+
+mail_transport = SMTPTransport()
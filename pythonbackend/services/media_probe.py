@@ -0,0 +1,130 @@
+"""
+Pure-Python dimension and duration probing for uploaded media
+"""
+
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+# MP4/QuickTime boxes that contain the boxes we read
+_CONTAINER_BOXES = {b"moov", b"trak"}
+
+# JPEG start-of-frame markers (all SOFn except DHT, JPG and DAC)
+_JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+@dataclass
+class MediaInfo:
+    """Dimensions (pixels) and duration (seconds) of a media file"""
+    width: Optional[int] = None
+    height: Optional[int] = None
+    duration: Optional[int] = None
+
+
+def probe_media(path: Path, mime_type: str) -> MediaInfo:
+    """Read dimensions/duration from the file headers (seeks, never reads the whole file)"""
+    try:
+        with open(path, "rb") as f:
+            if mime_type == "image/png":
+                return _probe_png(f)
+            if mime_type == "image/gif":
+                return _probe_gif(f)
+            if mime_type == "image/jpeg":
+                return _probe_jpeg(f)
+            if mime_type in ("video/mp4", "video/quicktime"):
+                return _probe_mp4(f)
+    except (OSError, struct.error) as e:
+        print(f"Error probing media {path}: {e}")
+    return MediaInfo()
+
+
+def _probe_png(f: BinaryIO) -> MediaInfo:
+    # IHDR is always the first chunk: signature(8) length(4) type(4) width(4) height(4)
+    f.seek(16)
+    width, height = struct.unpack(">II", f.read(8))
+    return MediaInfo(width, height)
+
+
+def _probe_gif(f: BinaryIO) -> MediaInfo:
+    f.seek(6)
+    width, height = struct.unpack("<HH", f.read(4))
+    return MediaInfo(width, height)
+
+
+def _probe_jpeg(f: BinaryIO) -> MediaInfo:
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return MediaInfo()
+        if byte != b"\xff":
+            continue
+        marker = f.read(1)
+        while marker == b"\xff":  # fill bytes
+            marker = f.read(1)
+        if not marker:
+            return MediaInfo()
+
+        code = marker[0]
+        if code == 0x01 or 0xD0 <= code <= 0xD9:  # markers without a length
+            continue
+        (length,) = struct.unpack(">H", f.read(2))
+        if code in _JPEG_SOF_MARKERS:
+            _precision, height, width = struct.unpack(">BHH", f.read(5))
+            return MediaInfo(width, height)
+        f.seek(length - 2, 1)
+
+
+def _iter_boxes(f: BinaryIO, end: int):
+    """Yield (type, payload_start, box_end) for the boxes between f.tell() and `end`"""
+    while f.tell() + 8 <= end:
+        start = f.tell()
+        size, box_type = struct.unpack(">I4s", f.read(8))
+        header = 8
+        if size == 1:
+            (size,) = struct.unpack(">Q", f.read(8))
+            header = 16
+        elif size == 0:
+            size = end - start
+        if size < header:
+            return
+        yield box_type, start + header, start + size
+        f.seek(start + size)
+
+
+def _probe_mp4(f: BinaryIO) -> MediaInfo:
+    info = MediaInfo()
+    f.seek(0, 2)
+    end = f.tell()
+    f.seek(0)
+    _walk_mp4(f, end, info)
+    return info
+
+
+def _walk_mp4(f: BinaryIO, end: int, info: MediaInfo) -> None:
+    for box_type, payload, box_end in _iter_boxes(f, end):
+        if box_type in _CONTAINER_BOXES:
+            f.seek(payload)
+            _walk_mp4(f, box_end, info)
+        elif box_type == b"mvhd":
+            f.seek(payload)
+            version = f.read(1)[0]
+            if version == 1:
+                f.seek(3 + 16, 1)
+                timescale, duration = struct.unpack(">IQ", f.read(12))
+            else:
+                f.seek(3 + 8, 1)
+                timescale, duration = struct.unpack(">II", f.read(8))
+            if timescale:
+                info.duration = round(duration / timescale)
+        elif box_type == b"tkhd" and not info.width:
+            f.seek(payload)
+            version = f.read(1)[0]
+            # flags, times, track id, reserved, duration, reserved, layer,
+            # alternate group, volume, reserved, matrix
+            f.seek(3 + (32 if version == 1 else 20) + 8 + 8 + 36, 1)
+            width, height = struct.unpack(">II", f.read(8))
+            # Audio tracks report 0x0; dimensions are 16.16 fixed point
+            if width:
+                info.width, info.height = width >> 16, height >> 16
@@ -0,0 +1,173 @@
+"""
+Thumbnail and responsive variant generation for post media
+"""
+
+import asyncio
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.models.post import PostMedia
+from services.job_queue import job_handler
+from services.post_service import media_storage, MEDIA_PREFIX
+
+# (name, path, width, height) of each file written by render_variants
+RenderedFile = Tuple[str, str, int, int]
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def render_variants(
+    source: str,
+    out_dir: str,
+    widths: Sequence[int],
+    thumbnail_size: int,
+    quality: int
+) -> List[RenderedFile]:
+    """Write WebP copies at each width narrower than the image plus a square
+    JPEG thumbnail into `out_dir` (runs in a worker process)"""
+    from PIL import Image, ImageOps
+
+    written: List[RenderedFile] = []
+    try:
+        with Image.open(source) as original:
+            # Let the JPEG decoder downscale by DCT (much cheaper than a full decode)
+            target = max(max(widths, default=0), thumbnail_size)
+            original.draft("RGB", (target, target))
+            image = ImageOps.exif_transpose(original)
+
+            has_alpha = image.mode in ("RGBA", "LA") or (
+                image.mode == "P" and "transparency" in image.info
+            )
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+            # Resize from the previous (larger) step rather than the original each time
+            current = image
+            for width in sorted(set(widths), reverse=True):
+                if width >= image.width:
+                    continue  # never upscale
+                height = max(round(image.height * width / image.width), 1)
+                current = current.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+                path = os.path.join(out_dir, f".{uuid.uuid4().hex}.webp")
+                current.save(path, "WEBP", quality=quality, method=4)
+                written.append((f"w{width}", path, width, height))
+
+            if min(current.size) < thumbnail_size:
+                current = image  # e.g. panoramas, whose narrow variants are too short
+            thumbnail = ImageOps.fit(current, (thumbnail_size, thumbnail_size), Image.LANCZOS)
+            if has_alpha:
+                background = Image.new("RGB", thumbnail.size, (255, 255, 255))
+                background.paste(thumbnail, mask=thumbnail.getchannel("A"))
+                thumbnail = background
+            path = os.path.join(out_dir, f".{uuid.uuid4().hex}.jpg")
+            thumbnail.save(path, "JPEG", quality=quality, optimize=True, progressive=True)
+            written.append(("thumbnail", path, thumbnail_size, thumbnail_size))
+    except BaseException:
+        for _, path, _, _ in written:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    return written
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.MEDIA_PROCESS_WORKERS or None)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the image processing worker processes"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+async def generate_variants(key: str) -> Tuple[List[Dict[str, Any]], str]:
+    """Render and store the variants of one image, returning (variants, thumbnail_url).
+
+    Runs in the job worker, which reads the original through media_storage:
+    with the local backend the worker must see the API's UPLOAD_DIR (same
+    host or a shared volume), otherwise fetch() raises FileNotFoundError.
+    """
+    source = await media_storage.fetch(key)
+    out_dir = media_storage.temp_dir(MEDIA_PREFIX)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    loop = asyncio.get_running_loop()
+    rendered = await loop.run_in_executor(
+        _get_pool(),
+        render_variants,
+        str(source),
+        str(out_dir),
+        settings.MEDIA_VARIANT_WIDTHS,
+        settings.MEDIA_THUMBNAIL_SIZE,
+        settings.MEDIA_VARIANT_QUALITY
+    )
+
+    stem = os.path.splitext(key)[0]
+    variants = []
+    thumbnail_url = None
+    for name, path, width, height in rendered:
+        variant_key = f"{stem}_{name}{os.path.splitext(path)[1]}"
+        # Identical images share a source key, so their variants may already exist
+        await media_storage.store_file(Path(path), variant_key)
+        url = media_storage.url(variant_key)
+        if name == "thumbnail":
+            thumbnail_url = url
+        else:
+            variants.append({"url": url, "width": width, "height": height})
+
+    variants.sort(key=lambda variant: variant["width"])
+    return variants, thumbnail_url
+
+
+@job_handler("media.generate_variants")
+async def generate_media_variants(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """Fill in thumbnails and responsive variants for newly uploaded images"""
+    result = await db.execute(
+        select(PostMedia).where(
+            PostMedia.id.in_(payload["media_ids"]),
+            PostMedia.media_type == "image",
+            PostMedia.variants.is_(None)
+        )
+    )
+    pending = []
+    for media in result.scalars().all():
+        # Deduplicated uploads can reuse variants already made for the same file
+        existing = await db.execute(
+            select(PostMedia.variants, PostMedia.thumbnail_url)
+            .where(PostMedia.media_url == media.media_url, PostMedia.variants.is_not(None))
+            .limit(1)
+        )
+        done = existing.first()
+        if done:
+            media.variants, media.thumbnail_url = done
+            continue
+        key = media_storage.key_for_url(media.media_url)
+        if key:
+            pending.append((media, key))
+
+    # Images render in parallel across the process pool
+    results = await asyncio.gather(
+        *(generate_variants(key) for _, key in pending), return_exceptions=True
+    )
+    errors = []
+    for (media, _), result in zip(pending, results):
+        if isinstance(result, BaseException):
+            errors.append(result)
+            continue
+        media.variants, media.thumbnail_url = result
+    await db.commit()
+
+    # Keep what succeeded; the retry only redoes media still without variants
+    if errors:
+        raise errors[0]
@@ -2,15 +2,145 @@
 Notification service for sending notifications
 """
 
-from typing import Optional, Dict, Any
+import asyncio
+from typing import Optional, Dict, Any, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from datetime import datetime
+from sqlalchemy import select, insert, update, literal, func, any_, bindparam, Integer, JSON
+from sqlalchemy.dialects.postgresql import ARRAY
 
-from db.models.notification import Notification, NotificationType
+from core.cache import TTLCache
+from core.config import settings
+from core.pagination import paginate
+from core.redis_client import get_redis
+from db.models.notification import Notification
 from db.models.user import User
+from db.models.profile import UserSettings
 from services.email_service import EmailService
-from services.push_notification_service import PushNotificationService
+from services.sms_service import SMSService
+from services.job_queue import enqueue, job_handler
+from services.reference_data import reference_data
+
+DELIVER_JOB = "notification.deliver"
+DELIVER_BULK_JOB = "notification.deliver_bulk"
+
+# Recipients per bulk delivery job
+BULK_DELIVERY_BATCH_SIZE = 500
+
+
+class _TemplateContext(dict):
+    """Leaves unknown {placeholders} in a template untouched"""
+    
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+def _render(template: Optional[str], context: Dict[str, Any]) -> str:
+    try:
+        return (template or "").format_map(_TemplateContext(context))
+    except (ValueError, IndexError, AttributeError):
+        return template or ""
+
+
+class UnreadCountCache:
+    """Per-user unread notification counts (in-process, optionally shared through Redis).
+    
+    Counts are adjusted in place on insert and mark-read rather than
+    dropped, so the badge rarely needs a COUNT(*). Entries expire after
+    NOTIFICATION_COUNT_CACHE_TTL_SECONDS, which bounds the drift between
+    processes when Redis is not enabled.
+    """
+    
+    # Only adjust counts that are cached, so a miss always recounts
+    _ADJUST_SCRIPT = """
+    if redis.call('EXISTS', KEYS[1]) == 1 then
+        return redis.call('INCRBY', KEYS[1], ARGV[1])
+    end
+    return nil
+    """
+    
+    def __init__(self):
+        self._local = TTLCache(
+            maxsize=settings.NOTIFICATION_COUNT_CACHE_MAX_SIZE,
+            ttl=settings.NOTIFICATION_COUNT_CACHE_TTL_SECONDS
+        )
+        self._adjust_script = None
+    
+    @staticmethod
+    def _redis_key(user_id: int) -> str:
+        return f"notifications:unread:{user_id}"
+    
+    async def get(self, user_id: int) -> Optional[int]:
+        """Cached count, or None on a miss"""
+        count = self._local.get(user_id)
+        if count is not None:
+            return count
+        
+        redis = get_redis()
+        if redis is None:
+            return None
+        
+        try:
+            value = await redis.get(self._redis_key(user_id))
+        except Exception as e:
+            print(f"Error reading unread count cache: {e}")
+            return None
+        
+        if value is None:
+            return None
+        
+        count = max(int(value), 0)
+        self._local.set(user_id, count)
+        return count
+    
+    async def set(self, user_id: int, count: int) -> None:
+        """Cache a freshly counted value"""
+        self._local.set(user_id, count)
+        
+        redis = get_redis()
+        if redis is None:
+            return
+        
+        try:
+            await redis.set(
+                self._redis_key(user_id), count, ex=settings.NOTIFICATION_COUNT_CACHE_TTL_SECONDS
+            )
+        except Exception as e:
+            print(f"Error writing unread count cache: {e}")
+    
+    async def adjust(self, user_id: int, delta: int) -> None:
+        """Add `delta` to a cached count (no-op on a miss)"""
+        count = self._local.get(user_id)
+        if count is not None:
+            self._local.set(user_id, max(count + delta, 0))
+        
+        redis = get_redis()
+        if redis is None:
+            return
+        
+        try:
+            if self._adjust_script is None:
+                self._adjust_script = redis.register_script(self._ADJUST_SCRIPT)
+            await self._adjust_script(keys=[self._redis_key(user_id)], args=[delta])
+        except Exception as e:
+            print(f"Error adjusting unread count cache: {e}")
+    
+    async def invalidate_many(self, user_ids: List[int]) -> None:
+        """Drop cached counts for many users (bulk sends)"""
+        for user_id in user_ids:
+            self._local.pop(user_id)
+        
+        redis = get_redis()
+        if redis is None or not user_ids:
+            return
+        
+        try:
+            for start in range(0, len(user_ids), 1000):
+                await redis.delete(*[self._redis_key(u) for u in user_ids[start:start + 1000]])
+        except Exception as e:
+            print(f"Error invalidating unread count cache: {e}")
+
+
+unread_count_cache = UnreadCountCache()
 
 
 class NotificationService:
@@ -18,7 +148,7 @@ class NotificationService:
     
     def __init__(self):
         self.email_service = EmailService()
-        self.push_service = PushNotificationService()
+        self.sms_service = SMSService()
     
     async def send_notification(
         self,
@@ -29,23 +159,24 @@ class NotificationService:
         message: str,
         data: Optional[Dict[str, Any]] = None,
         send_email: bool = True,
-        send_push: bool = True
+        send_push: bool = True,
+        send_sms: bool = False
     ) -> bool:
-        """Send notification to user"""
+        """Record a notification and queue its email/SMS delivery for the worker.
+        
+        `send_push` is accepted for callers but nothing is pushed: no device
+        tokens are stored, so there is nowhere to deliver to yet.
+        """
         try:
-            # Get notification type
-            result = await db.execute(
-                select(NotificationType).where(NotificationType.name == notification_type)
-            )
-            notification_type_obj = result.scalar_one_or_none()
+            notification_type_row = await reference_data.get_by_name("notification_types", notification_type)
             
-            if not notification_type_obj:
+            if not notification_type_row:
                 return False
             
             # Create notification record
             notification = Notification(
                 user_id=user_id,
-                type_id=notification_type_obj.id,
+                type_id=notification_type_row.id,
                 title=title,
                 message=message,
                 data=data or {}
@@ -54,37 +185,230 @@ class NotificationService:
             db.add(notification)
             await db.flush()
             
-            # Send email if requested
-            if send_email:
-                user = await db.get(User, user_id)
-                if user and user.settings.email_notifications:
-                    await self.email_service.send_email(
-                        user.email,
-                        title,
-                        message
-                    )
-                    notification.sent_email = True
-            
-            # Send push notification if requested
-            if send_push:
-                user = await db.get(User, user_id)
-                if user and user.settings.push_notifications:
-                    success = await self.push_service.send_notification(
-                        user_id,
-                        title,
-                        message,
-                        data
-                    )
-                    if success:
-                        notification.sent_push = True
+            # Delivery runs in the worker; the job commits atomically with the notification
+            channels = [
+                channel for channel, wanted in (
+                    ("email", send_email), ("sms", send_sms)
+                ) if wanted
+            ]
+            if channels:
+                enqueue(db, DELIVER_JOB, {"notification_id": notification.id, "channels": channels})
             
             await db.commit()
+            await unread_count_cache.adjust(user_id, 1)
             return True
             
         except Exception as e:
             print(f"Error sending notification: {e}")
             return False
     
+    async def send_bulk(
+        self,
+        db: AsyncSession,
+        user_ids: List[int],
+        notification_type: str,
+        template_ctx: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        send_email: bool = True,
+        send_push: bool = True,
+        send_sms: bool = False
+    ) -> int:
+        """Notify many users at once, returning the number of notifications created.
+        
+        Title and message are rendered once from the type's templates (or the
+        "title"/"message" keys of template_ctx), recipients and their
+        preferences are read in one query, all rows go in with a single
+        INSERT ... SELECT unnest(...), and delivery is queued in batches.
+        """
+        template_ctx = template_ctx or {}
+        try:
+            notification_type_row = await reference_data.get_by_name("notification_types", notification_type)
+            
+            if not notification_type_row or notification_type_row.is_active is False or not user_ids:
+                return 0
+            
+            title = _render(notification_type_row.template_subject, template_ctx) or template_ctx.get("title", "")
+            message = _render(notification_type_row.template_body, template_ctx) or template_ctx.get("message", "")
+            
+            # Active recipients and their channel preferences, in one query
+            id_array = bindparam("user_ids", list(set(user_ids)), type_=ARRAY(Integer))
+            result = await db.execute(
+                select(
+                    User.id,
+                    UserSettings.email_notifications,
+                    UserSettings.sms_notifications
+                )
+                .outerjoin(UserSettings, UserSettings.user_id == User.id)
+                .where(User.id == any_(id_array), User.is_active.isnot(False))
+            )
+            recipients = {row.id: row for row in result.all()}
+            if not recipients:
+                return 0
+            
+            recipient_ids = bindparam("recipient_ids", list(recipients), type_=ARRAY(Integer))
+            result = await db.execute(
+                insert(Notification)
+                .from_select(
+                    ["user_id", "type_id", "title", "message", "data"],
+                    select(
+                        func.unnest(recipient_ids),
+                        literal(notification_type_row.id),
+                        literal(title),
+                        literal(message),
+                        literal(data or {}, JSON)
+                    )
+                )
+                .returning(Notification.id, Notification.user_id)
+            )
+            created = result.all()
+            
+            # Users without a settings row get the column defaults (enabled)
+            # Push isn't delivered (no device tokens are stored), so send_push is ignored
+            wanted = {"email": send_email, "sms": send_sms}
+            for start in range(0, len(created), BULK_DELIVERY_BATCH_SIZE):
+                batch = created[start:start + BULK_DELIVERY_BATCH_SIZE]
+                payload = {
+                    channel: [
+                        notification_id for notification_id, user_id in batch
+                        if getattr(recipients[user_id], f"{channel}_notifications") is not False
+                    ]
+                    for channel, enabled in wanted.items() if enabled
+                }
+                if any(payload.values()):
+                    enqueue(db, DELIVER_BULK_JOB, payload)
+            
+            await db.commit()
+            await unread_count_cache.invalidate_many([user_id for _, user_id in created])
+            return len(created)
+            
+        except Exception as e:
+            print(f"Error sending bulk notification: {e}")
+            await db.rollback()
+            return 0
+    
+    async def deliver_notification(
+        self,
+        db: AsyncSession,
+        notification_id: int,
+        channels: List[str]
+    ) -> None:
+        """Deliver a notification over the requested channels the user has enabled.
+        
+        Channels that already succeeded are skipped, so a retried job only
+        resends what failed. Raises if any channel failed.
+        """
+        result = await db.execute(
+            select(
+                Notification,
+                User.email,
+                User.phone_number,
+                UserSettings.email_notifications,
+                UserSettings.sms_notifications
+            )
+            .join(User, User.id == Notification.user_id)
+            .outerjoin(UserSettings, UserSettings.user_id == Notification.user_id)
+            .where(Notification.id == notification_id)
+        )
+        row = result.first()
+        if not row:
+            return
+        
+        notification = row.Notification
+        failed = []
+        
+        # Users without a settings row get the column defaults (enabled)
+        if "email" in channels and not notification.sent_email and row.email_notifications is not False:
+            if await self.email_service.send_email(row.email, notification.title, notification.message):
+                notification.sent_email = True
+            else:
+                failed.append("email")
+        
+        # Skipped (sent_sms stays False) while Twilio isn't configured
+        if (
+            "sms" in channels and self.sms_service.available and not notification.sent_sms
+            and row.phone_number and row.sms_notifications is not False
+        ):
+            if await self.sms_service.send_sms(row.phone_number, notification.message):
+                notification.sent_sms = True
+            else:
+                failed.append("sms")
+        
+        await db.commit()
+        
+        if failed:
+            raise RuntimeError(f"Delivery failed for {', '.join(failed)}")
+    
+    async def deliver_bulk(
+        self,
+        db: AsyncSession,
+        channel_ids: Dict[str, List[int]]
+    ) -> None:
+        """Deliver a batch of notifications; `channel_ids` maps channel to notification ids.
+        
+        Notifications already marked sent on a channel are skipped, so a
+        retried job only resends what failed. Raises if any channel failed.
+        """
+        all_ids = sorted({notification_id for ids in channel_ids.values() for notification_id in ids})
+        if not all_ids:
+            return
+        
+        result = await db.execute(
+            select(
+                Notification.id,
+                Notification.user_id,
+                Notification.title,
+                Notification.message,
+                Notification.data,
+                Notification.sent_email,
+                Notification.sent_sms,
+                User.email,
+                User.phone_number
+            )
+            .join(User, User.id == Notification.user_id)
+            .where(Notification.id == any_(bindparam("ids", all_ids, type_=ARRAY(Integer))))
+        )
+        rows = {row.id: row for row in result.all()}
+        failed = []
+        
+        email_rows = [
+            rows[i] for i in channel_ids.get("email", []) if i in rows and not rows[i].sent_email
+        ]
+        if email_rows:
+            # Concurrent batches share the transport's EMAIL_QUEUE_MAX_SIZE queue;
+            # senders wait for room, so a broadcast can't overflow it
+            results = await self.email_service.send_bulk_emails(
+                [(row.email, row.title, row.message) for row in email_rows]
+            )
+            await self._mark_sent(db, "sent_email", [row.id for row, ok in zip(email_rows, results) if ok])
+            if not all(results):
+                failed.append("email")
+        
+        sms_rows = [
+            rows[i] for i in channel_ids.get("sms", [])
+            if i in rows and not rows[i].sent_sms and rows[i].phone_number
+        ] if self.sms_service.available else []
+        if sms_rows:
+            results = await asyncio.gather(*(
+                self.sms_service.send_sms(row.phone_number, row.message) for row in sms_rows
+            ))
+            await self._mark_sent(db, "sent_sms", [row.id for row, ok in zip(sms_rows, results) if ok])
+            if not all(results):
+                failed.append("sms")
+        
+        await db.commit()
+        
+        if failed:
+            raise RuntimeError(f"Bulk delivery failed for {', '.join(failed)}")
+    
+    async def _mark_sent(self, db: AsyncSession, flag: str, notification_ids: List[int]) -> None:
+        if notification_ids:
+            await db.execute(
+                update(Notification)
+                .where(Notification.id == any_(bindparam("sent_ids", notification_ids, type_=ARRAY(Integer))))
+                .values({flag: True})
+                .execution_options(synchronize_session=False)
+            )
+    
     async def send_booking_notification(
         self,
         db: AsyncSession,
@@ -151,39 +475,66 @@ class NotificationService:
         """Mark notification as read"""
         try:
             result = await db.execute(
-                select(Notification).where(
+                update(Notification)
+                .where(
                     Notification.id == notification_id,
-                    Notification.user_id == user_id
+                    Notification.user_id == user_id,
+                    Notification.is_read == False
                 )
+                .values(is_read=True, read_at=func.now())
+                .returning(Notification.id)
+                .execution_options(synchronize_session=False)
             )
-            notification = result.scalar_one_or_none()
+            marked = result.scalar_one_or_none() is not None
+            await db.commit()
             
-            if notification:
-                notification.is_read = True
-                notification.read_at = datetime.utcnow()
-                await db.commit()
+            if marked:
+                await unread_count_cache.adjust(user_id, -1)
                 return True
             
-            return False
+            # Already read still counts as success for the caller's notification
+            result = await db.execute(
+                select(Notification.id).where(
+                    Notification.id == notification_id,
+                    Notification.user_id == user_id
+                )
+            )
+            return result.scalar_one_or_none() is not None
         except Exception as e:
             print(f"Error marking notification as read: {e}")
             return False
     
+    async def mark_all_read(
+        self,
+        db: AsyncSession,
+        user_id: int
+    ) -> int:
+        """Mark all of a user's notifications as read in one UPDATE, returning how many changed"""
+        result = await db.execute(
+            update(Notification)
+            .where(Notification.user_id == user_id, Notification.is_read == False)
+            .values(is_read=True, read_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        await unread_count_cache.set(user_id, 0)
+        return result.rowcount
+    
     async def get_user_notifications(
         self,
         db: AsyncSession,
         user_id: int,
         limit: int = 20,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        unread_only: bool = False
     ) -> list:
-        """Get user notifications"""
-        result = await db.execute(
-            select(Notification)
-            .where(Notification.user_id == user_id)
-            .order_by(Notification.created_at.desc())
-            .limit(limit)
-            .offset(offset)
-        )
+        """Get user notifications, newest first"""
+        query = select(Notification).where(Notification.user_id == user_id)
+        if unread_only:
+            query = query.where(Notification.is_read == False)
+        
+        result = await db.execute(paginate(query, Notification, offset, limit, cursor))
         return result.scalars().all()
     
     async def get_unread_count(
@@ -191,12 +542,31 @@ class NotificationService:
         db: AsyncSession,
         user_id: int
     ) -> int:
-        """Get unread notification count"""
+        """Get unread notification count (cached; counted on idx_notifications_unread on a miss)"""
+        count = await unread_count_cache.get(user_id)
+        if count is not None:
+            return count
+        
         result = await db.execute(
-            select(Notification)
+            select(func.count())
+            .select_from(Notification)
             .where(
                 Notification.user_id == user_id,
                 Notification.is_read == False
             )
         )
-        return len(result.scalars().all())
+        count = result.scalar_one()
+        await unread_count_cache.set(user_id, count)
+        return count
+
+
+@job_handler(DELIVER_JOB)
+async def deliver_notification_job(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    await NotificationService().deliver_notification(
+        db, payload["notification_id"], payload["channels"]
+    )
+
+
+@job_handler(DELIVER_BULK_JOB)
+async def deliver_bulk_job(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    await NotificationService().deliver_bulk(db, payload)
@@ -0,0 +1,101 @@
+"""
+Live notification fan-out to connected clients
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Set
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY channel fed by the notifications insert trigger (see migration 9a3c5e7b1d46)
+NOTIFICATION_CHANNEL = "notifications"
+
+
+class RecentIds:
+    """Bounded set of the ids a stream has already sent.
+
+    Notification ids are not sent in increasing order (a backfilled row can
+    come again from the live queue, and transactions commit out of id
+    order), so a stream dedupes on the ids themselves rather than a
+    high-water mark. Only the last `maxsize` ids are remembered.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._order: Deque[int] = deque()
+        self._ids: Set[int] = set()
+
+    def add(self, event_id: int) -> bool:
+        """Remember an id; False if it was already sent"""
+        if event_id in self._ids:
+            return False
+        self._ids.add(event_id)
+        self._order.append(event_id)
+        if len(self._order) > self.maxsize:
+            self._ids.discard(self._order.popleft())
+        return True
+
+    def __contains__(self, event_id: int) -> bool:
+        return event_id in self._ids
+
+
+class NotificationBroker:
+    """Routes new-notification events to the streams of the user they belong to.
+
+    Every API worker LISTENs on NOTIFICATION_CHANNEL and delivers to its
+    own connections, so a notification inserted by any process reaches
+    the user wherever they are connected. Each stream has a small bounded
+    queue; a slow client loses events rather than growing memory, and can
+    catch up from the list endpoint.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+
+    @contextmanager
+    def subscribe(self, user_id: int) -> Iterator[asyncio.Queue]:
+        """Register a stream for `user_id` for the duration of the block"""
+        queue = asyncio.Queue(maxsize=settings.NOTIFICATION_STREAM_QUEUE_SIZE)
+        self._subscribers[user_id].add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Deliver an event to every local stream of its user"""
+        for queue in self._subscribers.get(event.get("user_id"), ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning(f"Dropping notification {event.get('id')} for slow stream")
+
+    def handle_notification(self, payload: str) -> None:
+        """NOTIFY callback; the payload is the JSON built by the insert trigger"""
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.error(f"Invalid notification payload: {payload[:200]}")
+            return
+        self.publish(event)
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def stats(self) -> dict:
+        """Connected users and streams for monitoring"""
+        return {"users": len(self._subscribers), "connections": self.connection_count}
+
+
+notification_broker = NotificationBroker()
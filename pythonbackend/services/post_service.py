@@ -3,13 +3,43 @@ Post service for business logic
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
-from typing import Optional, List
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import selectinload
+from typing import Optional, List, AsyncIterator
 from fastapi import UploadFile
+import asyncio
 
+from core.config import settings
+from core.pagination import paginate
 from db.models.post import Post, PostMedia, PostLike, PostComment, CommentLike
+from services.trending_service import (
+    TrendingService, trending_bump_values, LIKE_WEIGHT, COMMENT_WEIGHT
+)
+from services.engagement_buffer import engagement_buffer
+from services.job_queue import enqueue
+from services.media_probe import probe_media
+from services.storage import StorageBackend, ContentAddressedStorage, StoredFile, UploadRejected
 from schemas.post import PostCreate, PostUpdate
 
+MEDIA_PREFIX = "posts"
+MEDIA_TYPES = [t for t in settings.ALLOWED_FILE_TYPES if t.startswith(("image/", "video/"))]
+
+
+def _create_media_storage() -> StorageBackend:
+    """Storage backend for post media selected by MEDIA_STORAGE_BACKEND"""
+    if settings.MEDIA_STORAGE_BACKEND == "local":
+        return ContentAddressedStorage(settings.UPLOAD_DIR, base_url=settings.MEDIA_BASE_URL)
+    raise ValueError(f"Unknown media storage backend: {settings.MEDIA_STORAGE_BACKEND}")
+
+
+media_storage = _create_media_storage()
+
+
+async def _read_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+        yield chunk
+
 
 class PostService:
     """Post service for business logic"""
@@ -17,12 +47,48 @@ class PostService:
     def __init__(self, db: AsyncSession):
         self.db = db
     
+    def _with_pending_counters(self, posts: List[Post]) -> List[Post]:
+        """Include counter deltas the engagement buffer has not flushed yet"""
+        if engagement_buffer.enabled:
+            engagement_buffer.merge(posts)
+        return posts
+    
+    async def _commit_with_counters(self, post_id: int, likes: int = 0, comments: int = 0) -> None:
+        """Commit an engagement change together with the post's counters"""
+        if engagement_buffer.enabled:
+            await self.db.commit()
+            engagement_buffer.add(post_id, likes, comments)
+            return
+        
+        counters = {}
+        if likes:
+            counters["like_count"] = func.greatest(Post.like_count + likes, 0)
+        if comments:
+            counters["comment_count"] = func.greatest(Post.comment_count + comments, 0)
+        
+        await self.db.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(
+                **counters,
+                **trending_bump_values(likes * LIKE_WEIGHT + comments * COMMENT_WEIGHT)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+    
     async def get_posts(
         self, skip: int = 0, limit: int = 20, user_id: Optional[int] = None,
-        post_type: Optional[str] = None
+        post_type: Optional[str] = None, cursor: Optional[str] = None
     ) -> List[Post]:
         """Get posts with optional filters"""
-        query = select(Post).where(Post.visibility == "public")
+        # Authors and media are loaded with one extra query each for the
+        # whole page, so the feed costs three round trips regardless of limit
+        query = (
+            select(Post)
+            .options(selectinload(Post.user), selectinload(Post.media))
+            .where(Post.visibility == "public")
+        )
         
         if user_id:
             query = query.where(Post.user_id == user_id)
@@ -30,10 +96,10 @@ class PostService:
         if post_type:
             query = query.where(Post.post_type == post_type)
         
-        query = query.order_by(desc(Post.created_at)).offset(skip).limit(limit)
+        query = paginate(query, Post, skip, limit, cursor)
         
         result = await self.db.execute(query)
-        return result.scalars().all()
+        return self._with_pending_counters(result.scalars().all())
     
     async def create_post(self, user_id: int, post_data: PostCreate) -> Post:
         """Create a new post"""
@@ -60,7 +126,10 @@ class PostService:
         result = await self.db.execute(
             select(Post).where(Post.id == post_id)
         )
-        return result.scalar_one_or_none()
+        post = result.scalar_one_or_none()
+        if post:
+            self._with_pending_counters([post])
+        return post
     
     async def update_post(
         self, post_id: int, user_id: int, post_data: PostUpdate
@@ -104,53 +173,101 @@ class PostService:
         return True
     
     async def get_user_posts(
-        self, user_id: int, skip: int = 0, limit: int = 20
+        self, user_id: int, skip: int = 0, limit: int = 20,
+        cursor: Optional[str] = None
     ) -> List[Post]:
         """Get posts by a specific user"""
         result = await self.db.execute(
-            select(Post)
-            .where(Post.user_id == user_id)
-            .order_by(desc(Post.created_at))
-            .offset(skip)
-            .limit(limit)
+            paginate(select(Post).where(Post.user_id == user_id), Post, skip, limit, cursor)
         )
-        return result.scalars().all()
+        return self._with_pending_counters(result.scalars().all())
     
     async def get_trending_posts(self, skip: int = 0, limit: int = 20) -> List[Post]:
-        """Get trending posts based on engagement"""
-        result = await self.db.execute(
-            select(Post)
-            .where(Post.visibility == "public")
-            .order_by(desc(Post.like_count + Post.comment_count))
-            .offset(skip)
-            .limit(limit)
-        )
-        return result.scalars().all()
+        """Get trending posts based on time-decayed engagement"""
+        return self._with_pending_counters(await TrendingService(self.db).get_trending_posts(skip, limit))
     
     async def add_media_to_post(
-        self, post_id: int, user_id: int, file: UploadFile
-    ) -> Optional[PostMedia]:
-        """Add media to a post"""
+        self, post_id: int, user_id: int, files: List[UploadFile]
+    ) -> Optional[List[PostMedia]]:
+        """Store uploaded files concurrently and attach them to a post.
+        
+        Returns None if the post doesn't exist or isn't the user's; raises
+        UploadRejected for files that are too large or of a disallowed type.
+        """
         post = await self.get_post(post_id)
         
         if not post or post.user_id != user_id:
             return None
         
-        # TODO: Implement file upload logic
-        # For now, create a placeholder media record
-        media = PostMedia(
-            post_id=post_id,
-            media_url=f"placeholder_url_{file.filename}",
-            media_type="image",  # Determine from file type
-            file_size=file.size if file.size else 0
+        result = await self.db.execute(
+            select(func.count(PostMedia.id), func.max(PostMedia.sort_order))
+            .where(PostMedia.post_id == post_id)
         )
+        media_count, last_sort_order = result.one()
+        if media_count + len(files) > settings.MAX_MEDIA_PER_POST:
+            raise UploadRejected(
+                400, f"A post can have at most {settings.MAX_MEDIA_PER_POST} media files"
+            )
         
-        self.db.add(media)
-        await self.db.commit()
-        await self.db.refresh(media)
+        results = await asyncio.gather(
+            *(self._store_media(file) for file in files), return_exceptions=True
+        )
+        stored = [r for r in results if isinstance(r, StoredFile)]
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            await self._discard_files(stored)
+            raise errors[0]
+        
+        first_sort_order = 0 if last_sort_order is None else last_sort_order + 1
+        media = [
+            PostMedia(
+                post_id=post_id,
+                media_url=media_storage.url(file.key),
+                media_type=file.mime_type.split("/")[0],
+                file_size=file.size,
+                width=file.metadata.width,
+                height=file.metadata.height,
+                duration=file.metadata.duration,
+                sort_order=first_sort_order + i
+            )
+            for i, file in enumerate(stored)
+        ]
+        
+        self.db.add_all(media)
+        try:
+            await self.db.flush()
+            image_ids = [item.id for item in media if item.media_type == "image"]
+            if image_ids:
+                # Thumbnails and responsive sizes are rendered by the job worker
+                enqueue(self.db, "media.generate_variants", {"media_ids": image_ids})
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            await self._discard_files(stored)
+            raise
         
         return media
     
+    async def _store_media(self, file: UploadFile) -> StoredFile:
+        """Stream one upload into media storage, probing its dimensions"""
+        declared_type = file.content_type
+        if declared_type == "application/octet-stream":
+            declared_type = None  # let the content decide
+        return await media_storage.save_stream(
+            _read_chunks(file),
+            prefix=MEDIA_PREFIX,
+            max_size=settings.MAX_FILE_SIZE,
+            allowed_types=MEDIA_TYPES,
+            declared_type=declared_type,
+            probe=probe_media
+        )
+    
+    async def _discard_files(self, stored: List[StoredFile]) -> None:
+        """Remove files written by a failed upload (shared content is kept)"""
+        for file in stored:
+            if not file.deduplicated:
+                await media_storage.delete(file.key)
+    
     async def get_post_media(self, post_id: int) -> List[PostMedia]:
         """Get media for a post"""
         result = await self.db.execute(
@@ -183,70 +300,60 @@ class PostService:
         await self.db.delete(media)
         await self.db.commit()
         
+        # Identical files share storage, so only remove the last reference
+        result = await self.db.execute(
+            select(PostMedia.id).where(PostMedia.media_url == media.media_url).limit(1)
+        )
+        if result.scalar_one_or_none() is None:
+            urls = [media.media_url, media.thumbnail_url]
+            urls += [variant["url"] for variant in media.variants or []]
+            for url in urls:
+                key = media_storage.key_for_url(url) if url else None
+                if key:
+                    await media_storage.delete(key)
+        
         return True
     
-    async def like_post(self, post_id: int, user_id: int) -> Optional[PostLike]:
-        """Like a post"""
-        # Check if already liked
+    async def like_post(self, post_id: int, user_id: int) -> bool:
+        """Like a post, returning True if the like is new"""
+        # Insert and bump the counter atomically; a repeated like is a no-op
         result = await self.db.execute(
-            select(PostLike).where(
-                PostLike.post_id == post_id,
-                PostLike.user_id == user_id
-            )
+            pg_insert(PostLike)
+            .values(post_id=post_id, user_id=user_id)
+            .on_conflict_do_nothing(constraint="uq_post_like")
+            .returning(PostLike.id)
         )
-        existing_like = result.scalar_one_or_none()
-        
-        if existing_like:
-            return existing_like
-        
-        # Create new like
-        like = PostLike(post_id=post_id, user_id=user_id)
-        self.db.add(like)
-        
-        # Update like count
-        post = await self.get_post(post_id)
-        if post:
-            post.like_count += 1
+        if result.scalar_one_or_none() is None:
+            return False
         
-        await self.db.commit()
-        await self.db.refresh(like)
+        await self._commit_with_counters(post_id, likes=1)
         
-        return like
+        return True
     
     async def unlike_post(self, post_id: int, user_id: int) -> bool:
         """Unlike a post"""
         result = await self.db.execute(
-            select(PostLike).where(
-                PostLike.post_id == post_id,
-                PostLike.user_id == user_id
-            )
+            delete(PostLike)
+            .where(PostLike.post_id == post_id, PostLike.user_id == user_id)
+            .returning(PostLike.id)
         )
-        like = result.scalar_one_or_none()
-        
-        if not like:
+        if result.scalar_one_or_none() is None:
             return False
         
-        await self.db.delete(like)
-        
-        # Update like count
-        post = await self.get_post(post_id)
-        if post:
-            post.like_count = max(0, post.like_count - 1)
-        
-        await self.db.commit()
+        await self._commit_with_counters(post_id, likes=-1)
         
         return True
     
     async def get_post_likes(
-        self, post_id: int, skip: int = 0, limit: int = 20
+        self, post_id: int, skip: int = 0, limit: int = 20,
+        cursor: Optional[str] = None
     ) -> List[PostLike]:
         """Get likes for a post"""
         result = await self.db.execute(
-            select(PostLike)
-            .where(PostLike.post_id == post_id)
-            .order_by(desc(PostLike.created_at))
-            .offset(skip)
-            .limit(limit)
+            paginate(
+                select(PostLike).where(PostLike.post_id == post_id),
+                PostLike, skip, limit, cursor
+            )
         )
         return result.scalars().all()
     
@@ -255,38 +362,52 @@ class PostService:
         parent_comment_id: Optional[int] = None
     ) -> Optional[PostComment]:
         """Create a comment on a post"""
-        post = await self.get_post(post_id)
-        
-        if not post or not post.allow_comments:
-            return None
-        
-        comment = PostComment(
-            post_id=post_id,
-            user_id=user_id,
-            parent_comment_id=parent_comment_id,
-            content=content
+        if engagement_buffer.enabled:
+            # The counter is buffered, so only check the post accepts comments
+            result = await self.db.execute(
+                select(Post.id).where(Post.id == post_id, Post.allow_comments.is_(True))
+            )
+            if result.scalar_one_or_none() is None:
+                return None
+        else:
+            # Bump the counter only if the post exists and accepts comments
+            result = await self.db.execute(
+                update(Post)
+                .where(Post.id == post_id, Post.allow_comments.is_(True))
+                .values(comment_count=Post.comment_count + 1, **trending_bump_values(COMMENT_WEIGHT))
+                .returning(Post.id)
+                .execution_options(synchronize_session=False)
+            )
+            if result.scalar_one_or_none() is None:
+                return None
+        
+        comment = await self.db.scalar(
+            insert(PostComment)
+            .values(
+                post_id=post_id,
+                user_id=user_id,
+                parent_comment_id=parent_comment_id,
+                content=content
+            )
+            .returning(PostComment)
         )
-        
-        self.db.add(comment)
-        
-        # Update comment count
-        post.comment_count += 1
-        
         await self.db.commit()
-        await self.db.refresh(comment)
+        
+        if engagement_buffer.enabled:
+            engagement_buffer.add(post_id, comments=1)
         
         return comment
     
     async def get_post_comments(
-        self, post_id: int, skip: int = 0, limit: int = 20
+        self, post_id: int, skip: int = 0, limit: int = 20,
+        cursor: Optional[str] = None
     ) -> List[PostComment]:
         """Get comments for a post"""
         result = await self.db.execute(
-            select(PostComment)
-            .where(PostComment.post_id == post_id)
-            .order_by(desc(PostComment.created_at))
-            .offset(skip)
-            .limit(limit)
+            paginate(
+                select(PostComment).where(PostComment.post_id == post_id),
+                PostComment, skip, limit, cursor
+            )
         )
         return result.scalars().all()
     
@@ -312,79 +433,72 @@ class PostService:
     
     async def delete_comment(self, comment_id: int, user_id: int) -> bool:
         """Delete a comment"""
+        owned = select(PostComment.id).where(
+            PostComment.id == comment_id,
+            PostComment.user_id == user_id
+        )
+        
+        # Drop the comment's likes and detach its replies before removing it
+        await self.db.execute(
+            delete(CommentLike).where(CommentLike.comment_id.in_(owned))
+        )
+        await self.db.execute(
+            update(PostComment)
+            .where(PostComment.parent_comment_id.in_(owned))
+            .values(parent_comment_id=None)
+            .execution_options(synchronize_session=False)
+        )
         result = await self.db.execute(
-            select(PostComment).where(PostComment.id == comment_id)
+            delete(PostComment)
+            .where(PostComment.id == comment_id, PostComment.user_id == user_id)
+            .returning(PostComment.post_id)
         )
-        comment = result.scalar_one_or_none()
+        post_id = result.scalar_one_or_none()
         
-        if not comment or comment.user_id != user_id:
+        if post_id is None:
             return False
         
-        await self.db.delete(comment)
-        
-        # Update comment count
-        post = await self.get_post(comment.post_id)
-        if post:
-            post.comment_count = max(0, post.comment_count - 1)
-        
-        await self.db.commit()
+        await self._commit_with_counters(post_id, comments=-1)
         
         return True
     
-    async def like_comment(self, comment_id: int, user_id: int) -> Optional[CommentLike]:
-        """Like a comment"""
-        # Check if already liked
+    async def like_comment(self, comment_id: int, user_id: int) -> bool:
+        """Like a comment, returning True if the like is new"""
         result = await self.db.execute(
-            select(CommentLike).where(
-                CommentLike.comment_id == comment_id,
-                CommentLike.user_id == user_id
-            )
+            pg_insert(CommentLike)
+            .values(comment_id=comment_id, user_id=user_id)
+            .on_conflict_do_nothing(constraint="uq_comment_like")
+            .returning(CommentLike.id)
         )
-        existing_like = result.scalar_one_or_none()
-        
-        if existing_like:
-            return existing_like
-        
-        # Create new like
-        like = CommentLike(comment_id=comment_id, user_id=user_id)
-        self.db.add(like)
+        if result.scalar_one_or_none() is None:
+            return False
         
-        # Update like count
-        result = await self.db.execute(
-            select(PostComment).where(PostComment.id == comment_id)
+        await self.db.execute(
+            update(PostComment)
+            .where(PostComment.id == comment_id)
+            .values(like_count=PostComment.like_count + 1)
+            .execution_options(synchronize_session=False)
         )
-        comment = result.scalar_one_or_none()
-        if comment:
-            comment.like_count += 1
-        
         await self.db.commit()
-        await self.db.refresh(like)
         
-        return like
+        return True
     
     async def unlike_comment(self, comment_id: int, user_id: int) -> bool:
         """Unlike a comment"""
         result = await self.db.execute(
-            select(CommentLike).where(
-                CommentLike.comment_id == comment_id,
-                CommentLike.user_id == user_id
-            )
+            delete(CommentLike)
+            .where(CommentLike.comment_id == comment_id, CommentLike.user_id == user_id)
+            .returning(CommentLike.id)
         )
-        like = result.scalar_one_or_none()
-        
-        if not like:
+        if result.scalar_one_or_none() is None:
             return False
         
-        await self.db.delete(like)
-        
-        # Update like count
-        result = await self.db.execute(
-            select(PostComment).where(PostComment.id == comment_id)
+        await self.db.execute(
+            update(PostComment)
+            .where(PostComment.id == comment_id)
+            .values(like_count=func.greatest(PostComment.like_count - 1, 0))
+            .execution_options(synchronize_session=False)
         )
-        comment = result.scalar_one_or_none()
-        if comment:
-            comment.like_count = max(0, comment.like_count - 1)
-        
         await self.db.commit()
         
-        return True
+        return True
\ No newline at end of file
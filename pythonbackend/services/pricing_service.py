@@ -0,0 +1,285 @@
+"""
+Quote engine for guard pricing profiles
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy import select, or_, func, cast, any_, bindparam, Integer, Float
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.models.booking import Booking
+from db.models.pricing import GuardPricing
+from db.models.profile import Profile
+from services.booking_service import overlaps
+from services.reference_data import reference_data
+
+# Event types priced with the corporate or private adjustment; every other
+# event type uses the security adjustment
+EVENT_CATEGORIES = {
+    "Corporate Event": "corporate",
+    "Private Party": "private",
+    "Wedding": "private",
+}
+EVENT_ADJUSTMENTS = ("corporate", "private", "security")
+
+# Segment classes: rows index the day rate, columns the time of day
+DAY_KINDS = ("regular", "weekend", "holiday")
+TIME_KINDS = ("day", "night")
+
+
+@dataclass
+class ShiftHours:
+    """Hours of a shift by (day kind, time kind), from its hour segments"""
+    hours: np.ndarray  # shape (len(DAY_KINDS), len(TIME_KINDS))
+
+    @property
+    def total(self) -> float:
+        return float(self.hours.sum())
+
+
+@dataclass
+class GuardRates:
+    """Pricing profiles of a candidate set of guards, one array element per guard"""
+    guard_ids: np.ndarray
+    pricing_zone_ids: np.ndarray
+    base_rates: np.ndarray
+    minimum_hours: np.ndarray
+    maximum_hours: np.ndarray
+    day_multipliers: np.ndarray  # (guards, len(DAY_KINDS))
+    night_multipliers: np.ndarray  # (guards, len(TIME_KINDS))
+    emergency_multipliers: np.ndarray
+    event_adjustments: np.ndarray  # (guards, len(EVENT_ADJUSTMENTS))
+
+    def __len__(self) -> int:
+        return len(self.guard_ids)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple]) -> "GuardRates":
+        """Build from rows of (guard_id, pricing_zone_id, base_hourly_rate, minimum_hours,
+        maximum_hours, weekend, holiday, night_shift, emergency, corporate, private, security)"""
+        values = np.array(rows, dtype=np.float64).reshape(-1, 12)
+        ones = np.ones(len(values))
+        return cls(
+            guard_ids=values[:, 0].astype(np.int64),
+            pricing_zone_ids=values[:, 1].astype(np.int64),
+            base_rates=values[:, 2],
+            minimum_hours=values[:, 3],
+            maximum_hours=values[:, 4],
+            day_multipliers=np.column_stack([ones, values[:, 5], values[:, 6]]),
+            night_multipliers=np.column_stack([ones, values[:, 7]]),
+            emergency_multipliers=values[:, 8],
+            event_adjustments=values[:, 9:12]
+        )
+
+
+@dataclass
+class Quotes:
+    """Quotes for every guard of a GuardRates, in the same order"""
+    hours: float
+    billable_hours: np.ndarray
+    totals: np.ndarray
+    eligible: np.ndarray  # shift within the guard's maximum hours
+
+
+def shift_hours(
+    start: datetime,
+    end: datetime,
+    zone: ZoneInfo,
+    holidays: Iterable[date] = (),
+    night_start: int = 22,
+    night_end: int = 6
+) -> ShiftHours:
+    """Split [start, end) at local hour boundaries and total the hours of each segment class"""
+    holidays = set(holidays)
+    hours = np.zeros((len(DAY_KINDS), len(TIME_KINDS)))
+    current = start
+    while current < end:
+        local = current.astimezone(zone)
+        # Step to the next local hour (offset changes happen on hour boundaries)
+        boundary = current + timedelta(minutes=60 - local.minute) - timedelta(
+            seconds=local.second, microseconds=local.microsecond
+        )
+        segment_end = min(boundary, end)
+
+        if local.date() in holidays:
+            day_kind = 2
+        elif local.weekday() >= 5:
+            day_kind = 1
+        else:
+            day_kind = 0
+        if night_start > night_end:
+            night = local.hour >= night_start or local.hour < night_end
+        else:
+            night = night_start <= local.hour < night_end
+        hours[day_kind, int(night)] += (segment_end - current).total_seconds() / 3600
+        current = segment_end
+    return ShiftHours(hours)
+
+
+def price_shift(
+    rates: GuardRates,
+    shift: ShiftHours,
+    event_adjustment: str = "security",
+    emergency: bool = False,
+    factor: float = 1.0
+) -> Quotes:
+    """Quote one shift for every guard at once.
+
+    Each guard's hourly multiplier for a segment is its day rate (regular,
+    weekend or holiday; a holiday weekend is billed as a holiday) times its
+    night-shift rate when the segment is at night. Hours short of the guard's
+    minimum are billed at the base rate. The event adjustment, emergency
+    multiplier and global `factor` then scale the whole shift.
+    """
+    # (guards, day kinds) @ (day kinds, time kinds) -> weighted hours per time kind
+    weighted = (rates.day_multipliers @ shift.hours) * rates.night_multipliers
+    hours = shift.total
+    shortfall = np.maximum(rates.minimum_hours - hours, 0.0)
+
+    multiplier = rates.event_adjustments[:, EVENT_ADJUSTMENTS.index(event_adjustment)] * factor
+    if emergency:
+        multiplier = multiplier * rates.emergency_multipliers
+    totals = rates.base_rates * (weighted.sum(axis=1) + shortfall) * multiplier
+
+    return Quotes(
+        hours=hours,
+        billable_hours=hours + shortfall,
+        totals=np.round(totals, 2),
+        eligible=rates.maximum_hours >= hours
+    )
+
+
+def _holidays() -> List[date]:
+    return [date.fromisoformat(day) for day in settings.PRICING_HOLIDAYS]
+
+
+class PricingService:
+    """Pricing service for business logic"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def load_guard_rates(
+        self,
+        start: datetime,
+        end: datetime,
+        guard_ids: Optional[List[int]] = None,
+        pricing_zone_id: Optional[int] = None,
+        exclude_booked: bool = True
+    ) -> GuardRates:
+        """Pricing profiles of active guards open for booking over all of [start, end).
+
+        Guards priced in several zones are quoted at their cheapest profile
+        unless a zone is given.
+        """
+        query = (
+            select(
+                GuardPricing.guard_id,
+                GuardPricing.pricing_zone_id,
+                # Floats, so rows convert to arrays without going through Decimal
+                *(
+                    cast(func.coalesce(column, default), Float)
+                    for column, default in (
+                        (GuardPricing.base_hourly_rate, 0),
+                        (GuardPricing.minimum_hours, 1),
+                        (GuardPricing.maximum_hours, 24),
+                        (GuardPricing.weekend_multiplier, 1.0),
+                        (GuardPricing.holiday_multiplier, 1.5),
+                        (GuardPricing.night_shift_multiplier, 1.2),
+                        (GuardPricing.emergency_multiplier, 2.0),
+                        (GuardPricing.corporate_event_adjustment, 1.0),
+                        (GuardPricing.private_event_adjustment, 1.0),
+                        (GuardPricing.security_event_adjustment, 1.0)
+                    )
+                )
+            )
+            .join(Profile, Profile.user_id == GuardPricing.guard_id)
+            .where(
+                Profile.user_type == "guard",
+                Profile.status == "active",
+                GuardPricing.is_available.is_(True),
+                or_(GuardPricing.available_from.is_(None), GuardPricing.available_from <= start),
+                or_(GuardPricing.available_until.is_(None), GuardPricing.available_until >= end)
+            )
+        )
+        if guard_ids is not None:
+            query = query.where(
+                GuardPricing.guard_id == any_(bindparam("guard_ids", guard_ids, type_=ARRAY(Integer)))
+            )
+        if pricing_zone_id is not None:
+            query = query.where(GuardPricing.pricing_zone_id == pricing_zone_id)
+        else:
+            query = query.distinct(GuardPricing.guard_id).order_by(
+                GuardPricing.guard_id, GuardPricing.base_hourly_rate, GuardPricing.pricing_zone_id
+            )
+        if exclude_booked:
+            query = query.where(
+                ~select(Booking.id).where(Booking.guard_id == GuardPricing.guard_id, overlaps(start, end)).exists()
+            )
+
+        result = await self.db.execute(query)
+        return GuardRates.from_rows(result.all())
+
+    async def global_factor(self) -> float:
+        """Product of the active demand/supply pricing factors"""
+        factors = await reference_data.all("pricing_factors")
+        return float(np.prod([float(factor.multiplier) for factor in factors]))
+
+    async def event_adjustment(self, event_type_id: Optional[int]) -> str:
+        """Which event adjustment applies to an event type"""
+        if event_type_id is None:
+            return "security"
+        event_type = await reference_data.get("event_types", event_type_id)
+        if event_type is None:
+            raise ValueError("Unknown event type")
+        return EVENT_CATEGORIES.get(event_type.name, "security")
+
+    async def quote(
+        self,
+        start: datetime,
+        end: datetime,
+        timezone: str = "UTC",
+        event_type_id: Optional[int] = None,
+        emergency: bool = False,
+        guard_ids: Optional[List[int]] = None,
+        pricing_zone_id: Optional[int] = None,
+        exclude_booked: bool = True,
+        limit: Optional[int] = None
+    ) -> List[dict]:
+        """Quotes for a shift from matching guards, cheapest first"""
+        zone = ZoneInfo(timezone)
+        shift = shift_hours(
+            start, end, zone, _holidays(), settings.PRICING_NIGHT_START_HOUR, settings.PRICING_NIGHT_END_HOUR
+        )
+        adjustment = await self.event_adjustment(event_type_id)
+        rates = await self.load_guard_rates(start, end, guard_ids, pricing_zone_id, exclude_booked)
+        if not len(rates):
+            return []
+
+        quotes = price_shift(rates, shift, adjustment, emergency, await self.global_factor())
+        order = np.flatnonzero(quotes.eligible)
+        order = order[np.argsort(quotes.totals[order], kind="stable")][:limit]
+        hours = round(quotes.hours, 2)
+        return [
+            {
+                "guard_id": guard_id,
+                "pricing_zone_id": pricing_zone_id,
+                "base_hourly_rate": base_rate,
+                "hours": hours,
+                "billable_hours": billable_hours,
+                "total_amount": total
+            }
+            for guard_id, pricing_zone_id, base_rate, billable_hours, total in zip(
+                rates.guard_ids[order].tolist(),
+                rates.pricing_zone_ids[order].tolist(),
+                rates.base_rates[order].round(2).tolist(),
+                quotes.billable_hours[order].round(2).tolist(),
+                quotes.totals[order].tolist()
+            )
+        ]
@@ -0,0 +1,139 @@
+"""
+In-memory cache of small reference tables
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, table, column
+
+from core.config import settings
+from db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY channel fed by the reference_data triggers (see migration d4a8f17c9e52)
+REFERENCE_DATA_CHANNEL = "reference_data"
+
+# Lightweight table clauses, so loading doesn't depend on the ORM mappers
+# of every module that owns one of these tables
+REFERENCE_TABLES = {
+    "notification_types": table(
+        "notification_types",
+        column("id"), column("name"), column("description"),
+        column("template_subject"), column("template_body"), column("is_active")
+    ),
+    "event_types": table(
+        "event_types",
+        column("id"), column("name"), column("description"),
+        column("icon_url"), column("is_active")
+    ),
+    "verification_document_types": table(
+        "verification_document_types",
+        column("id"), column("name"), column("description"),
+        column("required_for_guards"), column("required_for_consumers"), column("is_active")
+    ),
+    "complaint_categories": table(
+        "complaint_categories",
+        column("id"), column("name"), column("description"), column("is_active")
+    ),
+    "pricing_factors": table(
+        "pricing_factors",
+        column("id"), column("factor_name"), column("factor_type"),
+        column("multiplier"), column("is_active")
+    ),
+}
+
+# Column each table is looked up by
+NAME_COLUMNS = {"pricing_factors": "factor_name"}
+
+
+class _Snapshot:
+    """Immutable rows of one table, indexed by id and by name"""
+
+    def __init__(self, name_column: str, rows: list):
+        self.rows = tuple(sorted(rows, key=lambda row: row.id))
+        self.by_id = {row.id: row for row in self.rows}
+        self.by_name = {getattr(row, name_column): row for row in self.rows}
+
+
+class ReferenceDataCache:
+    """Serves reference-table lookups from memory.
+
+    Tables are loaded at startup (or lazily on first use) and reloaded
+    when Postgres signals a change on REFERENCE_DATA_CHANNEL, when
+    invalidate() is called, and every REFERENCE_DATA_REFRESH_SECONDS as a
+    backstop. Each reload bumps `version`.
+    """
+
+    def __init__(self):
+        self._snapshots: Dict[str, _Snapshot] = {}
+        self._lock = asyncio.Lock()
+        self.version = 0
+
+    async def load(self, tables: Optional[List[str]] = None) -> None:
+        """(Re)load the given tables, or all of them, in one session"""
+        names = tables or list(REFERENCE_TABLES)
+        async with self._lock:
+            async with AsyncSessionLocal() as db:
+                snapshots = {}
+                for name in names:
+                    result = await db.execute(select(REFERENCE_TABLES[name]))
+                    snapshots[name] = _Snapshot(NAME_COLUMNS.get(name, "name"), result.all())
+            # Swap whole snapshots in so readers never see a partial table
+            self._snapshots = {**self._snapshots, **snapshots}
+            self.version += 1
+        logger.info(f"Loaded reference data: {', '.join(names)} (version {self.version})")
+
+    async def _snapshot(self, name: str) -> _Snapshot:
+        if name not in REFERENCE_TABLES:
+            raise KeyError(f"Unknown reference table '{name}'")
+        if name not in self._snapshots:
+            await self.load([name])
+        return self._snapshots[name]
+
+    async def all(self, name: str, active_only: bool = True) -> list:
+        """All rows of a table, ordered by id"""
+        snapshot = await self._snapshot(name)
+        if not active_only:
+            return list(snapshot.rows)
+        return [row for row in snapshot.rows if row.is_active is not False]
+
+    async def get(self, name: str, id: int):
+        """Row by id, or None"""
+        return (await self._snapshot(name)).by_id.get(id)
+
+    async def get_by_name(self, name: str, value: str):
+        """Row by its name column, or None"""
+        return (await self._snapshot(name)).by_name.get(value)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop a table (or everything) so the next lookup reloads it"""
+        if name is None:
+            self._snapshots = {}
+        else:
+            self._snapshots = {k: v for k, v in self._snapshots.items() if k != name}
+        self.version += 1
+
+    async def handle_notification(self, payload: str) -> None:
+        """NOTIFY callback; the payload is the name of the changed table"""
+        if payload in REFERENCE_TABLES:
+            await self.load([payload])
+
+    async def reload(self) -> None:
+        """Reload every table already in memory"""
+        if self._snapshots:
+            await self.load(list(self._snapshots))
+
+    async def run_refresh_loop(self) -> None:
+        """Reload periodically in case a notification was missed (runs for the app lifetime)"""
+        while True:
+            await asyncio.sleep(settings.REFERENCE_DATA_REFRESH_SECONDS)
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error(f"Error refreshing reference data: {e}")
+
+
+reference_data = ReferenceDataCache()
@@ -0,0 +1,155 @@
+"""
+Search service for finding guards near a location
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, or_, true, literal_column, table, column, bindparam, String, Float
+from sqlalchemy.dialects.postgresql import ARRAY
+from typing import Optional, List
+import math
+
+from core.config import settings
+from db.models.profile import Profile
+from db.models.pricing import GuardPricing
+from services.geo import covering_cells, bounding_box, EARTH_RADIUS_KM
+
+# Lightweight table clause: the Review model isn't mapped in this app yet
+reviews = table(
+    "reviews",
+    column("reviewed_user_id"),
+    column("overall_rating"),
+    column("is_public"),
+    column("is_flagged")
+)
+
+guard_pricing = GuardPricing.__table__
+
+GUARD_SEARCH_SORTS = ("distance", "rating")
+
+
+def guard_is_available():
+    """SQL condition: the profile's guard has a pricing profile open for booking now"""
+    now = func.now()
+    return (
+        select(literal_column("1"))
+        .where(
+            guard_pricing.c.guard_id == Profile.user_id,
+            guard_pricing.c.is_available.is_(True),
+            or_(guard_pricing.c.available_from.is_(None), guard_pricing.c.available_from <= now),
+            or_(guard_pricing.c.available_until.is_(None), guard_pricing.c.available_until > now)
+        )
+        .exists()
+    )
+
+
+def distance_km(latitude: float, longitude: float):
+    """SQL haversine distance in kilometres from a point to a profile's location"""
+    lat1 = math.radians(latitude)
+    lat2 = func.radians(Profile.latitude, type_=Float)
+    half_dlat = (lat2 - lat1) * 0.5
+    half_dlon = (func.radians(Profile.longitude, type_=Float) - math.radians(longitude)) * 0.5
+    a = (
+        func.power(func.sin(half_dlat, type_=Float), 2)
+        + math.cos(lat1) * func.cos(lat2, type_=Float) * func.power(func.sin(half_dlon, type_=Float), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(func.sqrt(a, type_=Float), 1.0), type_=Float)
+
+
+def within_radius(latitude: float, longitude: float, radius_km: float, distance) -> list:
+    """Conditions selecting guard profiles within `radius_km`.
+
+    Candidates are read through geohash prefix ranges covering the search
+    circle, so only nearby index entries are scanned; the exact distance
+    check then trims the corners.
+    """
+    cells = covering_cells(latitude, longitude, radius_km, max_cells=settings.GUARD_SEARCH_MAX_CELLS)
+    min_lat, max_lat, _, _ = bounding_box(latitude, longitude, radius_km)
+    return [
+        # Inlined so the partial geohash index matches under generic plans
+        Profile.user_type == literal_column("'guard'"),
+        # "~" sorts after every geohash character under the column's C collation
+        or_(*(and_(Profile.geohash >= cell, Profile.geohash < cell + "~") for cell in cells)),
+        Profile.latitude.between(min_lat, max_lat),
+        distance <= radius_km
+    ]
+
+
+class SearchService:
+    """Search service for business logic"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def search_guards(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        certifications: Optional[List[str]] = None,
+        languages: Optional[List[str]] = None,
+        min_experience: Optional[int] = None,
+        sort: str = "distance",
+        skip: int = 0,
+        limit: int = 20
+    ) -> list:
+        """Active guards within `radius_km`, as rows of (Profile, distance_km, rating, review_count)"""
+        distance = distance_km(latitude, longitude)
+
+        ratings = (
+            select(
+                func.avg(reviews.c.overall_rating).label("rating"),
+                func.count().label("review_count")
+            )
+            .where(
+                reviews.c.reviewed_user_id == Profile.user_id,
+                reviews.c.is_public.is_not(False),
+                reviews.c.is_flagged.is_not(True)
+            )
+            .lateral("ratings")
+        )
+
+        query = (
+            select(Profile, distance.label("distance_km"), ratings.c.rating, ratings.c.review_count)
+            .outerjoin(ratings, true())
+            .where(
+                Profile.status == "active",
+                *within_radius(latitude, longitude, radius_km, distance)
+            )
+        )
+
+        if certifications:
+            query = query.where(Profile.certifications.op("@>")(
+                bindparam("certifications", certifications, type_=ARRAY(String))
+            ))
+        if languages:
+            query = query.where(Profile.languages_spoken.op("&&")(
+                bindparam("languages", languages, type_=ARRAY(String))
+            ))
+        if min_experience is not None:
+            query = query.where(Profile.years_experience >= min_experience)
+
+        if sort == "rating":
+            order = (ratings.c.rating.desc().nulls_last(), distance, Profile.id)
+        else:
+            order = (distance, ratings.c.rating.desc().nulls_last(), Profile.id)
+
+        result = await self.db.execute(query.order_by(*order).offset(skip).limit(limit))
+        return result.all()
+
+    async def nearest_available_guards(
+        self, latitude: float, longitude: float, k: int, radius_km: float
+    ) -> List[tuple]:
+        """(user_id, distance_km) of the `k` nearest available guards, read from Postgres"""
+        distance = distance_km(latitude, longitude)
+        result = await self.db.execute(
+            select(Profile.user_id, distance.label("distance_km"))
+            .where(
+                Profile.status == "active",
+                *within_radius(latitude, longitude, radius_km, distance),
+                guard_is_available()
+            )
+            .order_by(distance, Profile.user_id)
+            .limit(k)
+        )
+        return [tuple(row) for row in result.all()]
+
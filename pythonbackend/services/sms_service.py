@@ -0,0 +1,73 @@
+"""
+SMS service
+"""
+
+from typing import Optional
+
+import httpx
+
+from core.config import settings
+
+TWILIO_MESSAGES_URL = "https://api.twilio.com/2010-04-01/Accounts/{account_sid}/Messages.json"
+
+# Longest body the Messages API accepts
+MAX_SMS_LENGTH = 1600
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _shared_client() -> httpx.AsyncClient:
+    """HTTP client reused by every SMSService, so bulk sends share connections"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=settings.SMS_TIMEOUT_SECONDS)
+    return _client
+
+
+async def close_sms_client() -> None:
+    """Close the shared HTTP client (call on shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class SMSService:
+    """SMS service for text message notifications, sent through the Twilio Messages API"""
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self.account_sid = settings.TWILIO_ACCOUNT_SID
+        self.auth_token = settings.TWILIO_AUTH_TOKEN
+        self.from_number = settings.TWILIO_FROM_NUMBER
+        self._client = client
+
+    @property
+    def available(self) -> bool:
+        """Whether Twilio is configured; callers skip the channel otherwise"""
+        return all([self.account_sid, self.auth_token, self.from_number])
+
+    async def send_sms(self, phone_number: str, message: str) -> bool:
+        """Send SMS to a phone number, returning whether Twilio accepted it"""
+        if not self.available:
+            print(f"SMS not configured. Would send to {phone_number}: {message}")
+            return False
+
+        try:
+            response = await (self._client or _shared_client()).post(
+                TWILIO_MESSAGES_URL.format(account_sid=self.account_sid),
+                auth=(self.account_sid, self.auth_token),
+                data={"To": phone_number, "From": self.from_number, "Body": message[:MAX_SMS_LENGTH]}
+            )
+        except httpx.HTTPError as e:
+            print(f"Error sending SMS: {e}")
+            return False
+
+        if response.is_success:
+            return True
+
+        try:
+            error = response.json().get("message")
+        except ValueError:
+            error = response.text[:200]
+        print(f"Twilio rejected SMS to {phone_number} ({response.status_code}): {error}")
+        return False
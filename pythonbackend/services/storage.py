@@ -0,0 +1,222 @@
+"""
+Streaming file storage for uploads
+"""
+
+import asyncio
+import hashlib
+import tempfile
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+
+import aiofiles
+import aiofiles.os
+
+# File extension stored for each accepted MIME type
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "video/mp4": ".mp4",
+    "video/quicktime": ".mov",
+    "application/pdf": ".pdf",
+}
+
+
+class UploadRejected(Exception):
+    """Upload refused while streaming (carries the HTTP status to report)"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    """A file written to content-addressed storage"""
+    key: str  # path relative to the storage root
+    sha256: str
+    size: int
+    mime_type: str
+    deduplicated: bool  # identical content was already stored
+    metadata: Any = None  # result of the probe passed to save_stream
+
+
+def sniff_mime_type(head: bytes) -> Optional[str]:
+    """Detect the MIME type of a file from its first bytes"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if head[4:8] == b"ftyp":
+        return "video/quicktime" if head[8:12] == b"qt  " else "video/mp4"
+    return None
+
+
+class StorageBackend:
+    """Content-addressed store for streamed uploads.
+
+    Chunks go straight to a local temporary file while the SHA-256 is
+    updated, so memory use is one chunk regardless of file size. Size and
+    type are enforced as bytes arrive. Backends decide where the finished
+    file lives by implementing `store_file`, `fetch`, `delete`, `url` and
+    `key_for_url`. Keys are `<prefix>/<sha[:2]>/<sha><ext>`, so identical
+    content is stored once.
+    """
+
+    def temp_dir(self, prefix: str) -> Path:
+        """Local directory for files being written before they are stored"""
+        return Path(tempfile.gettempdir())
+
+    async def store_file(self, temp_path: Path, key: str) -> bool:
+        """Move a finished temp file to `key`, returning True if it already existed"""
+        raise NotImplementedError
+
+    async def fetch(self, key: str) -> Path:
+        """Local path to read a stored file from"""
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        """Remove a stored file if it exists"""
+        raise NotImplementedError
+
+    def url(self, key: str) -> str:
+        """Public URL of a stored key"""
+        raise NotImplementedError
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        """Storage key of a URL returned by `url`, or None if it isn't ours"""
+        raise NotImplementedError
+
+    async def save_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        prefix: str,
+        max_size: int,
+        allowed_types: Iterable[str],
+        declared_type: Optional[str] = None,
+        probe: Optional[Callable[[Path, str], Any]] = None
+    ) -> StoredFile:
+        """Stream chunks to storage, raising UploadRejected on size or type violations.
+
+        `probe(path, mime_type)` runs in a thread on the completed file
+        before it is stored; its result is returned as `StoredFile.metadata`.
+        """
+        allowed_types = set(allowed_types)
+        if declared_type is not None and declared_type not in allowed_types:
+            raise UploadRejected(415, f"File type {declared_type} is not allowed")
+
+        directory = self.temp_dir(prefix)
+        await aiofiles.os.makedirs(directory, exist_ok=True)
+        temp_path = directory / f".{uuid.uuid4().hex}.part"
+
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        mime_type = None
+        try:
+            async with aiofiles.open(temp_path, "wb") as out:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    size += len(chunk)
+                    if size > max_size:
+                        raise UploadRejected(413, f"File exceeds the {max_size} byte limit")
+
+                    if mime_type is None:
+                        # Trust the content, not the declared type
+                        head += chunk[:16]
+                        if len(head) >= 16:
+                            mime_type = self._check_type(head, allowed_types, declared_type)
+
+                    digest.update(chunk)
+                    await out.write(chunk)
+
+            if size == 0:
+                raise UploadRejected(400, "Empty file")
+            if mime_type is None:
+                mime_type = self._check_type(head, allowed_types, declared_type)
+
+            metadata = None
+            if probe is not None:
+                metadata = await asyncio.to_thread(probe, temp_path, mime_type)
+
+            sha256 = digest.hexdigest()
+            key = f"{prefix}/{sha256[:2]}/{sha256}{EXTENSIONS.get(mime_type, '')}"
+            deduplicated = await self.store_file(temp_path, key)
+            return StoredFile(key, sha256, size, mime_type, deduplicated, metadata)
+        except BaseException:
+            if await aiofiles.os.path.exists(temp_path):
+                await aiofiles.os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def _check_type(head: bytes, allowed_types: set, declared_type: Optional[str]) -> str:
+        mime_type = sniff_mime_type(head)
+        if mime_type is None or mime_type not in allowed_types:
+            raise UploadRejected(415, "File type is not allowed")
+        # MP4 and QuickTime share a container, so only the family must agree
+        if declared_type and declared_type.split("/")[0] != mime_type.split("/")[0]:
+            raise UploadRejected(415, "File content does not match its declared type")
+        return mime_type
+
+
+class ContentAddressedStorage(StorageBackend):
+    """Local filesystem backend storing files under `root/<key>`"""
+
+    def __init__(self, root: str, base_url: Optional[str] = None):
+        self.root = Path(root)
+        self.base_url = base_url
+
+    def path(self, key: str) -> Path:
+        """Absolute path of a stored key (refuses keys that escape the root)"""
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError("Invalid storage key")
+        return path
+
+    def url(self, key: str) -> str:
+        if self.base_url is None:
+            raise ValueError("Storage is not publicly served")
+        return f"{self.base_url.rstrip('/')}/{key}"
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        if self.base_url is None:
+            return None
+        prefix = f"{self.base_url.rstrip('/')}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+    def temp_dir(self, prefix: str) -> Path:
+        # Same filesystem as the final location, so the move is an atomic rename
+        return self.root / prefix
+
+    async def fetch(self, key: str) -> Path:
+        path = self.path(key)
+        if not await aiofiles.os.path.exists(path):
+            # Usually a worker that doesn't share this directory with the API
+            raise FileNotFoundError(
+                f"Stored file {key} not found under {self.root.resolve()}; processes using "
+                f"local storage must share this directory (same host or a shared volume)"
+            )
+        return path
+
+    async def store_file(self, temp_path: Path, key: str) -> bool:
+        final_path = self.root / key
+        if await aiofiles.os.path.exists(final_path):
+            await aiofiles.os.remove(temp_path)
+            return True
+
+        await aiofiles.os.makedirs(final_path.parent, exist_ok=True)
+        await aiofiles.os.replace(temp_path, final_path)
+        return False
+
+    async def delete(self, key: str) -> None:
+        path = self.path(key)
+        if await aiofiles.os.path.exists(path):
+            await aiofiles.os.remove(path)
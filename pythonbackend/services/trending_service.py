@@ -0,0 +1,103 @@
+"""
+Trending service for time-decayed post engagement scores
+"""
+
+import asyncio
+import logging
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, desc, case, literal_column
+
+from core.config import settings
+from db.session import AsyncSessionLocal
+from db.models.post import Post
+
+logger = logging.getLogger(__name__)
+
+# Engagement weights (a like and a comment count the same, as before)
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 1.0
+
+
+def _decay_factor():
+    """SQL expression for the decay since a post's score was last brought current"""
+    half_life_seconds = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    elapsed = func.extract(
+        "epoch", func.now() - func.coalesce(Post.trending_decayed_at, func.now())
+    )
+    return func.power(0.5, elapsed / half_life_seconds)
+
+
+def trending_bump_values(weight: float) -> dict:
+    """Column values that decay a post's score to now and add `weight`.
+
+    Meant to be merged into an UPDATE on posts so the score moves in the
+    same statement as the engagement counters.
+    """
+    return {
+        "trending_score": func.greatest(Post.trending_score * _decay_factor() + weight, 0),
+        "trending_decayed_at": func.now(),
+    }
+
+
+class TrendingService:
+    """Trending service for time-decayed post engagement scores"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record_engagement(self, post_id: int, weight: float) -> None:
+        """Add (or with a negative weight, remove) engagement for a post"""
+        await self.db.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(**trending_bump_values(weight))
+            .execution_options(synchronize_session=False)
+        )
+
+    async def get_trending_posts(self, skip: int = 0, limit: int = 20) -> List[Post]:
+        """Get public posts by trending score (range scan on idx_posts_trending_public)"""
+        result = await self.db.execute(
+            select(Post)
+            # Inlined so prepared (generic) plans can still match the partial index
+            .where(Post.visibility == literal_column("'public'"))
+            .order_by(desc(Post.trending_score), desc(Post.id))
+            .offset(skip)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def decay_scores(self) -> int:
+        """Bring every non-zero score current, dropping negligible ones to zero.
+
+        Each row decays by its own elapsed time, so concurrent runs from
+        several workers never over-decay a score.
+        """
+        decayed = Post.trending_score * _decay_factor()
+        result = await self.db.execute(
+            update(Post)
+            .where(Post.trending_score > 0)
+            .values(
+                trending_score=case(
+                    (decayed < settings.TRENDING_MIN_SCORE, 0.0),
+                    else_=decayed
+                ),
+                trending_decayed_at=func.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount
+
+
+async def run_trending_decay_loop() -> None:
+    """Periodically re-decay trending scores (runs for the app lifetime)"""
+    while True:
+        await asyncio.sleep(settings.TRENDING_DECAY_INTERVAL_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                updated = await TrendingService(db).decay_scores()
+            logger.info(f"Decayed trending scores for {updated} posts")
+        except Exception as e:
+            logger.error(f"Error decaying trending scores: {e}")
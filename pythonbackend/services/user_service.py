@@ -10,7 +10,8 @@ from typing import Optional
 from db.models.user import User
 from db.models.profile import Profile, UserSettings
 from schemas.auth import UserRegister
-from core.security import get_password_hash
+from core.security import get_password_hash, user_principal_cache
+from services import geo
 
 
 class UserService:
@@ -39,7 +40,7 @@ class UserService:
         # Create user
         user = User(
             email=user_data.email,
-            password_hash=get_password_hash(user_data.password),
+            password_hash=await get_password_hash(user_data.password),
             phone_number=user_data.phone_number,
             user_type=user_data.user_type,
             is_active=True,
@@ -64,7 +65,7 @@ class UserService:
         """Update user's password"""
         user = await self.get_user_by_id(user_id)
         if user:
-            user.password_hash = get_password_hash(new_password)
+            user.password_hash = await get_password_hash(new_password)
             await self.db.commit()
     
     async def verify_email(self, user_id: int) -> None:
@@ -80,6 +81,7 @@ class UserService:
         if user:
             user.is_active = False
             await self.db.commit()
+            await user_principal_cache.invalidate(user_id)
     
     async def activate_user(self, user_id: int) -> None:
         """Activate user account"""
@@ -87,6 +89,15 @@ class UserService:
         if user:
             user.is_active = True
             await self.db.commit()
+            await user_principal_cache.invalidate(user_id)
+    
+    async def update_user_type(self, user_id: int, user_type: str) -> None:
+        """Change a user's role"""
+        user = await self.get_user_by_id(user_id)
+        if user:
+            user.user_type = user_type
+            await self.db.commit()
+            await user_principal_cache.invalidate(user_id)
     
     async def get_user_profile(self, user_id: int) -> Optional[Profile]:
         """Get user profile"""
@@ -106,6 +117,12 @@ class UserService:
             if hasattr(profile, field):
                 setattr(profile, field, value)
         
+        # Keep the search geohash in step with the location
+        if profile.latitude is not None and profile.longitude is not None:
+            profile.geohash = geo.encode(float(profile.latitude), float(profile.longitude))
+        else:
+            profile.geohash = None
+        
         await self.db.commit()
         await self.db.refresh(profile)
         return profile
@@ -3,12 +3,27 @@ Verification service for business logic
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Optional, List
+from sqlalchemy import select, update, func, tuple_, literal_column, and_, or_
+from typing import Optional, List, Tuple
 from datetime import datetime, timedelta
 
-from db.models.verification import VerificationDocumentType, Verification, BackgroundCheck
+from db.models.verification import Verification, BackgroundCheck
 from schemas.verification import VerificationCreate, BackgroundCheckCreate
+from core.cache import TTLCache
+from core.config import settings
+from core.pagination import paginate
+from services.reference_data import reference_data
+from services.storage import ContentAddressedStorage, StoredFile
+
+VERIFICATION_STATUSES = ("pending", "approved", "rejected", "expired")
+STATISTICS_BUCKETS = ("day", "week", "month")
+
+# Uploaded documents live outside the public /uploads mount
+document_storage = ContentAddressedStorage(settings.PRIVATE_UPLOAD_DIR)
+DOCUMENT_PREFIX = "verifications"
+
+# Admin dashboard statistics, keyed on the requested breakdown
+_statistics_cache = TTLCache(maxsize=64, ttl=settings.VERIFICATION_STATS_CACHE_TTL_SECONDS)
 
 
 class VerificationService:
@@ -17,12 +32,9 @@ class VerificationService:
     def __init__(self, db: AsyncSession):
         self.db = db
     
-    async def get_document_types(self) -> List[VerificationDocumentType]:
-        """Get all active document types"""
-        result = await self.db.execute(
-            select(VerificationDocumentType).where(VerificationDocumentType.is_active == True)
-        )
-        return result.scalars().all()
+    async def get_document_types(self) -> list:
+        """Get all active document types (served from the reference data cache)"""
+        return await reference_data.all("verification_document_types")
     
     async def get_user_verifications(self, user_id: int) -> List[Verification]:
         """Get user's verification documents"""
@@ -56,6 +68,52 @@ class VerificationService:
         
         return verification
     
+    async def create_uploaded_verification(
+        self,
+        user_id: int,
+        document_type_id: int,
+        document_name: str,
+        stored: StoredFile,
+        document_number: Optional[str] = None,
+        issuing_authority: Optional[str] = None
+    ) -> Tuple[Verification, bool]:
+        """Record an uploaded document, reusing the user's existing verification of identical content.
+        
+        Returns (verification, created).
+        """
+        result = await self.db.execute(
+            select(Verification)
+            .where(
+                Verification.user_id == user_id,
+                Verification.document_type_id == document_type_id,
+                Verification.document_hash == stored.sha256,
+                Verification.status.in_(["pending", "approved"])
+            )
+            .limit(1)
+        )
+        existing = result.scalar_one_or_none()
+        if existing:
+            return existing, False
+        
+        verification = Verification(
+            user_id=user_id,
+            document_type_id=document_type_id,
+            document_name=document_name,
+            document_url=stored.key,
+            document_hash=stored.sha256,
+            file_size=stored.size,
+            mime_type=stored.mime_type,
+            document_number=document_number,
+            issuing_authority=issuing_authority,
+            status="pending"
+        )
+        
+        self.db.add(verification)
+        await self.db.commit()
+        await self.db.refresh(verification)
+        
+        return verification, True
+    
     async def get_verification(self, verification_id: int) -> Optional[Verification]:
         """Get a specific verification document"""
         result = await self.db.execute(
@@ -98,6 +156,16 @@ class VerificationService:
         await self.db.delete(verification)
         await self.db.commit()
         
+        # Uploaded files are shared by hash; remove one once nothing references it
+        if verification.document_hash and verification.document_url.startswith(f"{DOCUMENT_PREFIX}/"):
+            still_used = await self.db.scalar(
+                select(Verification.id)
+                .where(Verification.document_hash == verification.document_hash)
+                .limit(1)
+            )
+            if not still_used:
+                await document_storage.delete(verification.document_url)
+        
         return True
     
     async def submit_verification(self, verification_id: int, user_id: int) -> bool:
@@ -137,69 +205,211 @@ class VerificationService:
         
         return background_check
     
-    async def get_pending_verifications(self) -> List[Verification]:
-        """Get pending verifications for admin review"""
+    @staticmethod
+    def _claimable_by(admin_id: Optional[int] = None):
+        """Pending rows with no live claim (or claimed by `admin_id`)"""
+        conditions = [
+            Verification.claimed_by.is_(None),
+            Verification.claim_expires_at < func.now()
+        ]
+        if admin_id is not None:
+            conditions.append(Verification.claimed_by == admin_id)
+        # Inline the status so prepared (generic) plans can still match the partial index
+        return and_(Verification.status == literal_column("'pending'"), or_(*conditions))
+    
+    async def get_pending_verifications(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        admin_id: Optional[int] = None
+    ) -> List[Verification]:
+        """Get pending verifications for admin review, oldest first.
+        
+        Rows claimed by another reviewer are hidden. Keyset pagination runs
+        on idx_verifications_pending_created_at_id.
+        """
+        query = select(Verification).where(self._claimable_by(admin_id))
         result = await self.db.execute(
-            select(Verification).where(Verification.status == "pending")
+            paginate(query, Verification, limit=limit, cursor=cursor, descending=False)
         )
         return result.scalars().all()
     
+    async def claim_verifications(self, admin_id: int, limit: int = 10) -> List[Verification]:
+        """Lease the oldest unclaimed pending verifications to a reviewer.
+        
+        SKIP LOCKED keeps concurrent claims from blocking on, or handing
+        out, the same rows; a lease lapses after VERIFICATION_CLAIM_MINUTES.
+        """
+        claimable = (
+            select(Verification.id)
+            .where(self._claimable_by())
+            .order_by(Verification.created_at, Verification.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self.db.scalars(
+            update(Verification)
+            .where(Verification.id.in_(claimable))
+            .values(
+                claimed_by=admin_id,
+                claim_expires_at=func.now() + timedelta(minutes=settings.VERIFICATION_CLAIM_MINUTES)
+            )
+            .returning(Verification)
+            .execution_options(synchronize_session=False)
+        )
+        verifications = sorted(result.all(), key=lambda v: (v.created_at, v.id))
+        await self.db.commit()
+        return verifications
+    
+    async def release_verification(self, verification_id: int, admin_id: int) -> bool:
+        """Give back a claimed verification without deciding it"""
+        result = await self.db.execute(
+            update(Verification)
+            .where(Verification.id == verification_id, Verification.claimed_by == admin_id)
+            .values(claimed_by=None, claim_expires_at=None)
+            .returning(Verification.id)
+            .execution_options(synchronize_session=False)
+        )
+        released = result.scalar_one_or_none() is not None
+        await self.db.commit()
+        return released
+    
+    async def _review_verifications(self, verification_ids: List[int], admin_id: int, **values) -> List[int]:
+        """Decide pending verifications in one UPDATE; returns the ids that changed"""
+        result = await self.db.execute(
+            update(Verification)
+            .where(
+                Verification.id.in_(verification_ids),
+                self._claimable_by(admin_id)
+            )
+            .values(
+                verified_by=admin_id,
+                verified_at=func.now(),
+                claimed_by=None,
+                claim_expires_at=None,
+                **values
+            )
+            .returning(Verification.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated = sorted(result.scalars().all())
+        await self.db.commit()
+        return updated
+    
+    async def approve_verifications(
+        self, verification_ids: List[int], admin_id: int, notes: Optional[str] = None
+    ) -> List[int]:
+        """Approve pending verifications not claimed by another reviewer"""
+        return await self._review_verifications(
+            verification_ids,
+            admin_id,
+            status="approved",
+            verification_notes=notes,
+            # Default expiry of one year when none was set
+            expires_at=func.coalesce(Verification.expires_at, func.now() + timedelta(days=365))
+        )
+    
+    async def reject_verifications(
+        self, verification_ids: List[int], admin_id: int, reason: str
+    ) -> List[int]:
+        """Reject pending verifications not claimed by another reviewer"""
+        return await self._review_verifications(
+            verification_ids,
+            admin_id,
+            status="rejected",
+            verification_notes=reason
+        )
+    
     async def approve_verification(
         self, verification_id: int, admin_id: int, notes: Optional[str] = None
     ) -> bool:
         """Approve a verification document"""
-        verification = await self.get_verification(verification_id)
-        
-        if not verification:
-            return False
-        
-        verification.status = "approved"
-        verification.verified_by = admin_id
-        verification.verification_notes = notes
-        verification.verified_at = datetime.utcnow()
-        
-        # Set expiry date if not provided (default 1 year)
-        if not verification.expires_at:
-            verification.expires_at = datetime.utcnow() + timedelta(days=365)
-        
-        await self.db.commit()
-        
-        return True
+        return bool(await self.approve_verifications([verification_id], admin_id, notes))
     
     async def reject_verification(
         self, verification_id: int, admin_id: int, reason: str
     ) -> bool:
         """Reject a verification document"""
-        verification = await self.get_verification(verification_id)
+        return bool(await self.reject_verifications([verification_id], admin_id, reason))
+    
+    async def get_verification_statistics(
+        self,
+        by_document_type: bool = False,
+        bucket: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> dict:
+        """Get verification counts by status, optionally broken down by document type and time bucket.
         
-        if not verification:
-            return False
+        Every requested breakdown comes from one GROUPING SETS aggregate, so
+        no verification rows are loaded. Results are cached for
+        VERIFICATION_STATS_CACHE_TTL_SECONDS.
+        """
+        if bucket is not None and bucket not in STATISTICS_BUCKETS:
+            raise ValueError(f"bucket must be one of {', '.join(STATISTICS_BUCKETS)}")
         
-        verification.status = "rejected"
-        verification.verified_by = admin_id
-        verification.verification_notes = reason
-        verification.verified_at = datetime.utcnow()
+        cache_key = (by_document_type, bucket, since, until)
+        stats = _statistics_cache.get(cache_key)
+        if stats is not None:
+            return stats
         
-        await self.db.commit()
+        status_column = func.coalesce(Verification.status, literal_column("'pending'"))
+        # The unit is inlined (whitelisted above) so the SELECT and GROUP BY
+        # expressions are identical
+        bucket_column = func.date_trunc(literal_column(f"'{bucket}'"), Verification.created_at) if bucket else None
         
-        return True
-    
-    async def get_verification_statistics(self) -> dict:
-        """Get verification statistics"""
-        # Get counts by status
-        pending_count = await self.db.scalar(
-            select(Verification).where(Verification.status == "pending")
-        )
-        approved_count = await self.db.scalar(
-            select(Verification).where(Verification.status == "approved")
-        )
-        rejected_count = await self.db.scalar(
-            select(Verification).where(Verification.status == "rejected")
-        )
+        grouping_sets = [tuple_(status_column)]
+        columns = [status_column.label("status")]
+        if by_document_type:
+            grouping_sets.append(tuple_(Verification.document_type_id, status_column))
+            columns.append(Verification.document_type_id)
+        if bucket_column is not None:
+            grouping_sets.append(tuple_(bucket_column, status_column))
+            columns.append(bucket_column.label("bucket"))
+        
+        query = select(*columns, func.count().label("count")).group_by(func.grouping_sets(*grouping_sets))
+        if since:
+            query = query.where(Verification.created_at >= since)
+        if until:
+            query = query.where(Verification.created_at < until)
+        
+        result = await self.db.execute(query)
+        
+        def empty_counts() -> dict:
+            return {status: 0 for status in VERIFICATION_STATUSES}
+        
+        totals = empty_counts()
+        by_type: dict = {}
+        by_bucket: dict = {}
+        for row in result.all():
+            # A row belongs to the grouping set whose extra column is non-null
+            if by_document_type and row.document_type_id is not None:
+                counts = by_type.setdefault(row.document_type_id, empty_counts())
+            elif bucket_column is not None and row.bucket is not None:
+                counts = by_bucket.setdefault(row.bucket, empty_counts())
+            else:
+                counts = totals
+            counts[row.status] = counts.get(row.status, 0) + row.count
+        
+        stats = {**totals, "total": sum(totals.values())}
+        
+        if by_document_type:
+            stats["by_document_type"] = []
+            for document_type_id, counts in sorted(by_type.items()):
+                document_type = await reference_data.get("verification_document_types", document_type_id)
+                stats["by_document_type"].append({
+                    "document_type_id": document_type_id,
+                    "document_type": document_type.name if document_type else None,
+                    **counts,
+                    "total": sum(counts.values())
+                })
+        
+        if bucket_column is not None:
+            stats["by_" + bucket] = [
+                {"bucket": bucket_start.isoformat(), **counts, "total": sum(counts.values())}
+                for bucket_start, counts in sorted(by_bucket.items())
+            ]
         
-        return {
-            "pending": pending_count,
-            "approved": approved_count,
-            "rejected": rejected_count,
-            "total": pending_count + approved_count + rejected_count
-        }
+        _statistics_cache.set(cache_key, stats)
+        return stats
@@ -0,0 +1,176 @@
+"""
+In-memory point-in-zone lookup for pricing zones
+"""
+
+import asyncio
+import logging
+import math
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, cast, Float
+
+from core.config import settings
+from db.session import AsyncSessionLocal
+from db.models.pricing import PricingZone
+from services.geo import bounding_box, haversine_km
+
+logger = logging.getLogger(__name__)
+
+# pricing_zones changes are announced on the reference data channel
+# (see migration c8d3f6a1e295), with the table name as payload
+PRICING_ZONES_TABLE = "pricing_zones"
+
+KM_PER_MILE = 1.609344
+
+Cell = Tuple[int, int]
+# (zone id, center latitude, center longitude, radius in km)
+Zone = Tuple[int, float, float, float]
+
+
+class PricingZoneResolver:
+    """Resolves coordinates to the active pricing zone that contains them.
+
+    Zones are circles (center plus `radius_miles`). Each one is registered
+    in every PRICING_ZONE_CELL_DEGREES grid cell its bounding box touches,
+    so a lookup only distance-checks the few zones in the point's cell;
+    when zones overlap the one with the nearest center wins. Answers are
+    memoised in an LRU cache keyed on coordinates rounded to
+    PRICING_ZONE_COORDINATE_DECIMALS places (4 places is ~11m). The grid
+    and cache are replaced together whenever the zones are reloaded:
+    when Postgres signals a pricing_zones change, after invalidate(), and
+    every REFERENCE_DATA_REFRESH_SECONDS.
+    """
+
+    def __init__(self, cell_degrees: Optional[float] = None):
+        self.cell_degrees = cell_degrees or settings.PRICING_ZONE_CELL_DEGREES
+        self._columns = math.ceil(360.0 / self.cell_degrees)
+        self._rows = math.ceil(180.0 / self.cell_degrees)
+        self._lookup: Callable[[float, float], Optional[int]] = lambda latitude, longitude: None
+        self._zone_count = 0
+        self._cell_count = 0
+        self._lock = asyncio.Lock()
+        self.loaded = False
+        self.version = 0
+
+    def _cell(self, latitude: float, longitude: float) -> Cell:
+        row = min(int((latitude + 90.0) / self.cell_degrees), self._rows - 1)
+        column = int((longitude + 180.0) / self.cell_degrees) % self._columns
+        return row, column
+
+    def _index(self, zones: Iterable[Zone]) -> Dict[Cell, Tuple[Zone, ...]]:
+        cells: Dict[Cell, List[Zone]] = {}
+        for zone in zones:
+            _, latitude, longitude, radius_km = zone
+            min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+            first_row, last_row = self._cell(min_lat, 0.0)[0], self._cell(max_lat, 0.0)[0]
+            first_column = math.floor((min_lon + 180.0) / self.cell_degrees)
+            last_column = math.floor((max_lon + 180.0) / self.cell_degrees)
+            # Longitudes past ±180 wrap around the antimeridian
+            columns = {column % self._columns for column in range(first_column, last_column + 1)}
+            for row in range(first_row, last_row + 1):
+                for column in columns:
+                    cells.setdefault((row, column), []).append(zone)
+        return {cell: tuple(members) for cell, members in cells.items()}
+
+    def build(self, zones: Iterable[Zone]) -> None:
+        """Replace all zones with (id, center latitude, center longitude, radius_km) entries"""
+        zones = list(zones)
+        cells = self._index(zones)
+        locate = self._cell
+
+        @lru_cache(maxsize=settings.PRICING_ZONE_CACHE_SIZE)
+        def lookup(latitude: float, longitude: float) -> Optional[int]:
+            best = None
+            for zone_id, center_lat, center_lon, radius_km in cells.get(locate(latitude, longitude), ()):
+                distance = haversine_km(latitude, longitude, center_lat, center_lon)
+                if distance <= radius_km and (best is None or (distance, zone_id) < best):
+                    best = (distance, zone_id)
+            return best[1] if best else None
+
+        # One assignment swaps grid and cache together, so a stale answer
+        # can't outlive the zones it came from
+        self._lookup = lookup
+        self._zone_count = len(zones)
+        self._cell_count = len(cells)
+        self.loaded = True
+        self.version += 1
+
+    def resolve(self, latitude: float, longitude: float) -> Optional[int]:
+        """ID of the pricing zone containing the point, or None"""
+        decimals = settings.PRICING_ZONE_COORDINATE_DECIMALS
+        # +0.0 folds -0.0 into 0.0 so both share a cache entry
+        return self._lookup(round(latitude, decimals) + 0.0, round(longitude, decimals) + 0.0)
+
+    async def zone_for(self, latitude: float, longitude: float) -> Optional[int]:
+        """resolve(), loading the zones first if they aren't in memory yet"""
+        if not self.loaded:
+            await self.load()
+        return self.resolve(latitude, longitude)
+
+    async def load(self) -> None:
+        """(Re)load active zones from Postgres"""
+        async with self._lock:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(
+                        PricingZone.id,
+                        cast(PricingZone.center_latitude, Float),
+                        cast(PricingZone.center_longitude, Float),
+                        PricingZone.radius_miles
+                    )
+                    .where(
+                        PricingZone.is_active.is_not(False),
+                        PricingZone.center_latitude.is_not(None),
+                        PricingZone.center_longitude.is_not(None)
+                    )
+                )
+                zones = [
+                    (zone_id, latitude, longitude, (radius_miles if radius_miles is not None else 10) * KM_PER_MILE)
+                    for zone_id, latitude, longitude, radius_miles in result.all()
+                ]
+            # Large zones span thousands of cells, so index them off the event loop
+            await asyncio.to_thread(self.build, zones)
+        logger.info(f"Loaded pricing zones: {len(zones)} zones (version {self.version})")
+
+    def invalidate(self) -> None:
+        """Drop the zones and cached answers so the next lookup reloads them"""
+        self._lookup = lambda latitude, longitude: None
+        self._zone_count = self._cell_count = 0
+        self.loaded = False
+
+    async def handle_notification(self, payload: str) -> None:
+        """Reference data NOTIFY callback; reloads when pricing_zones changed"""
+        if payload == PRICING_ZONES_TABLE:
+            await self.load()
+
+    async def reload(self) -> None:
+        """Resynchronise after the listener reconnects"""
+        if self.loaded:
+            await self.load()
+
+    async def run_refresh_loop(self) -> None:
+        """Reload periodically in case a notification was missed (runs for the app lifetime)"""
+        while True:
+            await asyncio.sleep(settings.REFERENCE_DATA_REFRESH_SECONDS)
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error(f"Error refreshing pricing zones: {e}")
+
+    def stats(self) -> dict:
+        """Zone count and cache hit rate for the health endpoint"""
+        info = getattr(self._lookup, "cache_info", None)
+        cache = info() if info else None
+        return {
+            "zones": self._zone_count,
+            "cells": self._cell_count,
+            "version": self.version,
+            "cache_size": cache.currsize if cache else 0,
+            "cache_hit_rate": (
+                round(cache.hits / (cache.hits + cache.misses), 3) if cache and cache.hits + cache.misses else None
+            )
+        }
+
+
+zone_resolver = PricingZoneResolver()
@@ -0,0 +1,86 @@
+"""
+Booking prices come from the guard's pricing profile, not the request
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from core.config import settings
+from schemas.booking import BookingCreate
+from services import pricing_service
+from services.booking_service import BookingService
+
+START = datetime(2026, 3, 2, 18, tzinfo=timezone.utc)
+
+
+def booking_request(**overrides) -> BookingCreate:
+    payload = {
+        "guard_id": 7,
+        "event_type_id": 1,
+        "event_name": "Launch party",
+        "address_line1": "1 Main St",
+        "city": "Austin",
+        "start_datetime": START,
+        "end_datetime": START + timedelta(hours=3),
+        "timezone": "America/Chicago",
+        # Ignored: the server sets both
+        "hourly_rate": "1.00",
+        "platform_fee": "0",
+    }
+    payload.update(overrides)
+    return BookingCreate(**payload)
+
+
+@pytest.fixture
+def quotes(monkeypatch):
+    """Replace the quote engine with canned quotes, recording its calls"""
+    calls = []
+    canned = [{"guard_id": 7, "total_amount": 200.0}]
+
+    async def quote(self, start, end, **kwargs):
+        calls.append(kwargs)
+        return list(canned)
+
+    monkeypatch.setattr(pricing_service.PricingService, "quote", quote)
+    return calls, canned
+
+
+def test_client_prices_are_not_accepted():
+    data = booking_request().dict()
+
+    assert "hourly_rate" not in data
+    assert "platform_fee" not in data
+
+
+def test_price_reproduces_the_quoted_total(quotes, monkeypatch):
+    calls, _ = quotes
+    monkeypatch.setattr(settings, "BOOKING_PLATFORM_FEE_RATE", 0.1)
+
+    hourly_rate, platform_fee = asyncio.run(BookingService(None).price(booking_request()))
+
+    assert hourly_rate == Decimal("66.67")
+    assert platform_fee == Decimal("20.00")
+    assert calls == [{
+        "timezone": "America/Chicago",
+        "event_type_id": 1,
+        "guard_ids": [7],
+        "pricing_zone_id": None,
+        "exclude_booked": False,
+        "limit": 1,
+    }]
+
+
+def test_guards_without_pricing_cannot_be_booked(quotes):
+    _, canned = quotes
+    canned.clear()
+
+    with pytest.raises(ValueError, match="no pricing"):
+        asyncio.run(BookingService(None).price(booking_request()))
+
+
+def test_unknown_timezone_is_rejected(quotes):
+    with pytest.raises(ValueError, match="Unknown timezone"):
+        asyncio.run(BookingService(None).price(booking_request(timezone="Mars/Olympus")))
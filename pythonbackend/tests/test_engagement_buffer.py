@@ -0,0 +1,128 @@
+"""
+Tests for the write-behind engagement counter buffer
+"""
+
+import asyncio
+
+from sqlalchemy import inspect
+from sqlalchemy.orm.attributes import set_committed_value
+
+from db.models.post import Post
+from services import engagement_buffer as engagement_buffer_module
+from services.engagement_buffer import EngagementCounterBuffer
+
+
+def loaded_post(post_id: int, like_count: int, comment_count: int) -> Post:
+    """A Post in the state a query leaves it: values committed, nothing modified"""
+    post = Post()
+    for key, value in (("id", post_id), ("like_count", like_count), ("comment_count", comment_count)):
+        set_committed_value(post, key, value)
+    return post
+
+
+def test_merge_adds_pending_deltas_without_dirtying_posts():
+    buffer = EngagementCounterBuffer()
+    buffer.add(1, likes=3, comments=1)
+    buffer.add(2, likes=-5)
+    posts = [loaded_post(1, 10, 2), loaded_post(2, 2, 0)]
+
+    buffer.merge(posts)
+
+    assert [(post.like_count, post.comment_count) for post in posts] == [(13, 3), (0, 0)]
+    assert not any(inspect(post).modified for post in posts)
+
+
+def test_cancelled_flush_puts_deltas_back(monkeypatch):
+    class HangingSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, statement):
+            await asyncio.Event().wait()
+
+    monkeypatch.setattr(engagement_buffer_module, "AsyncSessionLocal", HangingSession)
+    buffer = EngagementCounterBuffer()
+    buffer.add(1, likes=2, comments=1)
+
+    async def cancel_mid_flush():
+        task = asyncio.create_task(buffer.flush())
+        await asyncio.sleep(0)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel_mid_flush())
+
+    assert buffer.pending(1) == (2, 1)
+
+
+class RecordingSession:
+    """Session whose statements succeed; closing it can be made to hang"""
+
+    def __init__(self, hang_on_close=False):
+        self.hang_on_close = hang_on_close
+        self.executed = 0
+        self.commits = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.hang_on_close:
+            await asyncio.Event().wait()
+        return False
+
+    async def execute(self, statement):
+        self.executed += 1
+
+    async def commit(self):
+        self.commits += 1
+
+
+def test_flush_cancelled_after_commit_does_not_restore_deltas(monkeypatch):
+    session = RecordingSession(hang_on_close=True)
+    monkeypatch.setattr(engagement_buffer_module, "AsyncSessionLocal", session)
+    buffer = EngagementCounterBuffer()
+    buffer.add(1, likes=2, comments=1)
+
+    async def cancel_while_closing():
+        task = asyncio.create_task(buffer.flush())
+        while not session.commits:
+            await asyncio.sleep(0)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel_while_closing())
+
+    # Restoring them would apply the committed deltas a second time
+    assert buffer.pending(1) == (0, 0)
+
+
+def test_stop_flushes_remaining_deltas_once(monkeypatch):
+    session = RecordingSession()
+    monkeypatch.setattr(engagement_buffer_module, "AsyncSessionLocal", session)
+    monkeypatch.setattr(engagement_buffer_module.settings, "ENGAGEMENT_FLUSH_INTERVAL_MS", 60000)
+    buffer = EngagementCounterBuffer()
+
+    async def shutdown():
+        task = asyncio.create_task(buffer.run())
+        await asyncio.sleep(0)
+        buffer.add(1, likes=4)
+        buffer.stop()
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(shutdown())
+
+    assert session.commits == 1
+    assert buffer.pending(1) == (0, 0)
@@ -0,0 +1,65 @@
+"""
+The posts feed costs a fixed number of queries, whatever the page size
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import event, insert
+
+from api.routes.posts import _serialize_feed_post
+from db.models.post import Post, PostMedia
+from db.models.user import User
+from services.post_service import PostService
+
+# Posts, then their authors and their media (one selectinload query each)
+FEED_QUERIES = 3
+
+
+async def seed(database) -> None:
+    async with database.session() as db:
+        user_ids = (await db.execute(
+            insert(User).returning(User.id),
+            [{"email": f"author{i}@example.com", "password_hash": "x", "user_type": "guard"} for i in range(5)]
+        )).scalars().all()
+        post_ids = (await db.execute(
+            insert(Post).returning(Post.id),
+            [{"user_id": user_ids[i % len(user_ids)], "content": f"post {i}"} for i in range(60)]
+        )).scalars().all()
+        await db.execute(insert(PostMedia), [
+            {"post_id": post_id, "media_url": f"/uploads/{post_id}_{n}.jpg", "media_type": "image", "sort_order": n}
+            for post_id in post_ids for n in range(3)
+        ])
+        await db.commit()
+
+
+async def count_feed_queries(database, limit: int, cursor=None):
+    statements = []
+
+    def record(conn, cursor_, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(database.engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with database.session() as db:
+            posts = await PostService(db).get_posts(limit=limit, cursor=cursor)
+            # Serializing touches post.user and post.media; lazy loads would add queries
+            feed = [_serialize_feed_post(post) for post in posts]
+    finally:
+        event.remove(database.engine.sync_engine, "before_cursor_execute", record)
+    return feed, statements
+
+
+@pytest.mark.parametrize("limit", [1, 20, 50])
+def test_feed_query_count_does_not_grow_with_the_page(database, limit):
+    async def scenario():
+        await seed(database)
+        feed, statements = await count_feed_queries(database, limit)
+        await database.engine.dispose()
+        return feed, statements
+
+    feed, statements = asyncio.run(scenario())
+
+    assert len(feed) == limit
+    assert all(len(post["media_urls"]) == 3 and post["user"]["email"] for post in feed)
+    assert len(statements) == FEED_QUERIES, statements
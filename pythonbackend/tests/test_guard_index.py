@@ -0,0 +1,77 @@
+"""
+Tests for the in-memory guard grid index
+"""
+
+import random
+import time
+
+import pytest
+
+from services.geo import haversine_km
+from services.guard_index import GuardGridIndex
+
+
+def brute_force(guards, latitude, longitude, k, radius_km):
+    distances = sorted(
+        (haversine_km(latitude, longitude, lat, lon), user_id) for user_id, lat, lon in guards
+    )
+    return [user_id for distance, user_id in distances if distance <= radius_km][:k]
+
+
+@pytest.fixture(scope="module")
+def guards():
+    rng = random.Random(7)
+    guards = [(i, rng.uniform(-89.9, 89.9), rng.uniform(-180, 180)) for i in range(20000)]
+    guards += [(100000 + i, rng.uniform(75, 90), rng.uniform(-180, 180)) for i in range(2000)]
+    guards += [(200000 + i, rng.uniform(-90, -75), rng.uniform(-180, 180)) for i in range(2000)]
+    return guards
+
+
+@pytest.fixture(scope="module")
+def index(guards):
+    index = GuardGridIndex(cell_degrees=0.05)
+    index.build(guards)
+    return index
+
+
+@pytest.mark.parametrize("latitude, longitude, k, radius_km", [
+    (80.0, 0.0, 10, 50),
+    (85.0, 10.0, 10, 200),
+    (70.0, 0.0, 10, 200),
+    (89.99, 0.0, 5, 200),
+    (-89.5, 30.0, 5, 100),
+    (89.9, 179.9, 20, 200),
+    (0.0, 179.99, 10, 200),
+])
+def test_high_latitude_and_antimeridian_queries_match_brute_force(index, guards, latitude, longitude, k, radius_km):
+    result = index.nearest(latitude, longitude, k, radius_km)
+    assert [user_id for user_id, _ in result] == brute_force(guards, latitude, longitude, k, radius_km)
+
+
+@pytest.mark.parametrize("latitude", [70.0, 80.0, 85.0, 89.99, -89.99])
+def test_high_latitude_queries_do_not_scan_the_whole_grid(latitude):
+    # An empty neighbourhood used to walk every ring of the 7200x3600 grid (seconds per query)
+    index = GuardGridIndex(cell_degrees=0.05)
+    index.build([(1, 0.0, 0.0)])
+
+    started = time.perf_counter()
+    assert index.nearest(latitude, 0.0, 10, 200) == []
+    assert time.perf_counter() - started < 0.5
+
+
+def test_random_queries_match_brute_force(index, guards):
+    rng = random.Random(11)
+    for _ in range(50):
+        latitude, longitude = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        k, radius_km = rng.choice([1, 5, 10]), rng.choice([10, 50, 200])
+        result = index.nearest(latitude, longitude, k, radius_km)
+        assert [user_id for user_id, _ in result] == brute_force(guards, latitude, longitude, k, radius_km)
+
+
+def test_updates_keep_row_occupancy_in_sync():
+    index = GuardGridIndex(cell_degrees=0.05)
+    index.build([(1, 80.0, 0.0), (2, 80.01, 0.01)])
+    index.remove(1)
+    index.upsert(2, 10.0, 10.0)
+    assert index.nearest(80.0, 0.0, 10, 200) == []
+    assert [user_id for user_id, _ in index.nearest(10.0, 10.0, 10, 1)] == [2]
@@ -0,0 +1,102 @@
+"""
+Tests for the Postgres job worker loop
+"""
+
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from sqlalchemy import delete
+from sqlalchemy.dialects import postgresql
+
+from db.models.job import BackgroundJob
+from services import job_queue
+from services.job_queue import JobWorker, _lease_held, job_handler
+
+
+def job(job_id, kind="test.ok", attempts=1, max_attempts=3):
+    return SimpleNamespace(id=job_id, kind=kind, payload={}, attempts=attempts, max_attempts=max_attempts)
+
+
+class RecordingSession:
+    """Stands in for AsyncSessionLocal, recording statements and reporting `rowcount`"""
+
+    def __init__(self, rowcount=1):
+        self.rowcount = rowcount
+        self.statements = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(rowcount=self.rowcount)
+
+    async def commit(self):
+        pass
+
+
+def sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@job_handler("test.ok")
+async def ok_handler(db, payload):
+    pass
+
+
+def test_run_keeps_going_when_a_job_cannot_be_finished(monkeypatch, caplog):
+    worker = JobWorker()
+    executed = []
+    batches = [[job(1), job(2)], [job(3)]]
+
+    async def claim():
+        if not batches:
+            worker.stop()
+            return []
+        return batches.pop(0)
+
+    async def sweep():
+        return 0
+
+    async def execute(claimed):
+        executed.append(claimed.id)
+        if claimed.id == 1:
+            raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(worker, "claim", claim)
+    monkeypatch.setattr(worker, "sweep", sweep)
+    monkeypatch.setattr(worker, "execute", execute)
+
+    with caplog.at_level(logging.ERROR, logger=job_queue.__name__):
+        asyncio.run(asyncio.wait_for(worker.run(), 5))
+
+    assert executed == [1, 2, 3]
+    assert "Error finishing job 1" in caplog.text
+
+
+def test_lease_condition_checks_status_attempt_and_expiry():
+    condition = sql(delete(BackgroundJob).where(_lease_held(job(7, attempts=2))))
+
+    assert "background_jobs.status = 'running'" in condition
+    assert "background_jobs.attempts = %(attempts_1)s" in condition
+    assert "background_jobs.locked_at >= now() - %(now_1)s" in condition
+
+
+def test_finished_job_is_only_deleted_under_its_lease(monkeypatch, caplog):
+    session = RecordingSession(rowcount=0)
+    monkeypatch.setattr(job_queue, "AsyncSessionLocal", session)
+
+    with caplog.at_level(logging.WARNING, logger=job_queue.__name__):
+        asyncio.run(JobWorker().execute(job(7)))
+
+    (statement,) = session.statements
+    assert sql(statement).startswith("DELETE FROM background_jobs")
+    assert "background_jobs.status = 'running'" in sql(statement)
+    assert "lost its lease" in caplog.text
@@ -0,0 +1,71 @@
+"""
+Like counters stay exact under concurrent likes
+"""
+
+import asyncio
+
+from sqlalchemy import func, insert, select
+
+from core.config import settings
+from db.models.post import Post, PostLike
+from db.models.user import User
+from services.post_service import PostService
+
+PARALLEL_LIKES = 1000
+
+
+async def seed(database, users: int):
+    async with database.session() as db:
+        user_ids = (await db.execute(
+            insert(User).returning(User.id),
+            [{"email": f"user{i}@example.com", "password_hash": "x"} for i in range(users)]
+        )).scalars().all()
+        post_id = await db.scalar(insert(Post).values(user_id=user_ids[0], content="viral").returning(Post.id))
+        await db.commit()
+    return post_id, list(user_ids)
+
+
+async def like(database, post_id: int, user_id: int) -> bool:
+    async with database.session() as db:
+        return await PostService(db).like_post(post_id, user_id)
+
+
+async def unlike(database, post_id: int, user_id: int) -> bool:
+    async with database.session() as db:
+        return await PostService(db).unlike_post(post_id, user_id)
+
+
+async def counters(database, post_id: int):
+    async with database.session() as db:
+        like_count = await db.scalar(select(Post.like_count).where(Post.id == post_id))
+        rows = await db.scalar(select(func.count()).select_from(PostLike).where(PostLike.post_id == post_id))
+    return like_count, rows
+
+
+def test_parallel_likes_are_all_counted(database, monkeypatch):
+    monkeypatch.setattr(settings, "ENGAGEMENT_BUFFER_ENABLED", False)
+
+    async def scenario():
+        post_id, user_ids = await seed(database, PARALLEL_LIKES)
+
+        liked = await asyncio.gather(*(like(database, post_id, user_id) for user_id in user_ids))
+        after_likes = await counters(database, post_id)
+
+        # The same user liking many times at once counts once
+        repeated = await asyncio.gather(*(like(database, post_id, user_ids[0]) for _ in range(100)))
+        after_repeats = await counters(database, post_id)
+
+        unliked = await asyncio.gather(*(unlike(database, post_id, user_id) for user_id in user_ids[::2]))
+        after_unlikes = await counters(database, post_id)
+
+        await database.engine.dispose()
+        return liked, after_likes, repeated, after_repeats, unliked, after_unlikes
+
+    liked, after_likes, repeated, after_repeats, unliked, after_unlikes = asyncio.run(scenario())
+
+    assert all(liked)
+    assert after_likes == (PARALLEL_LIKES, PARALLEL_LIKES)
+    assert not any(repeated)
+    assert after_repeats == (PARALLEL_LIKES, PARALLEL_LIKES)
+    assert all(unliked)
+    assert after_unlikes == (PARALLEL_LIKES // 2, PARALLEL_LIKES // 2)
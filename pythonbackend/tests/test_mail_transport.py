@@ -0,0 +1,152 @@
+"""
+Tests for the queued SMTP transport against a local aiosmtpd server
+"""
+
+import asyncio
+import socket
+from email.message import EmailMessage
+
+import pytest
+
+aiosmtpd = pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller  # noqa: E402
+from aiosmtpd.smtp import AuthResult  # noqa: E402
+
+from core.config import settings  # noqa: E402
+from services.mail_transport import SMTPTransport  # noqa: E402
+
+REJECTED = "rejected@example.com"
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == REJECTED:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(session.peer)
+        self.messages.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def authenticate(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=auth_data.login == b"user" and auth_data.password == b"secret")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    handler = RecordingHandler()
+    port = free_port()
+    controller = Controller(
+        handler, hostname="127.0.0.1", port=port,
+        authenticator=authenticate, auth_require_tls=False
+    )
+    controller.start()
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", port)
+    monkeypatch.setattr(settings, "SMTP_USERNAME", "user")
+    monkeypatch.setattr(settings, "SMTP_PASSWORD", "secret")
+    monkeypatch.setattr(settings, "SMTP_USE_TLS", False)
+    monkeypatch.setattr(settings, "SMTP_TIMEOUT_SECONDS", 5)
+    yield handler
+    controller.stop()
+
+
+def message(to: str, subject: str = "Hello") -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "user@example.com"
+    msg["To"] = to
+    msg["Subject"] = subject
+    msg.set_content("Body")
+    return msg
+
+
+async def run_with_transport(coroutine_factory):
+    transport = SMTPTransport()
+    try:
+        return await coroutine_factory(transport)
+    finally:
+        await transport.close()
+
+
+def test_send_returns_true_once_the_server_accepts(smtp_server):
+    delivered = asyncio.run(run_with_transport(lambda transport: transport.send(message("a@example.com"))))
+
+    assert delivered is True
+    assert [envelope.rcpt_tos for envelope in smtp_server.messages] == [["a@example.com"]]
+
+
+def test_send_returns_false_when_the_server_rejects(smtp_server):
+    delivered = asyncio.run(run_with_transport(lambda transport: transport.send(message(REJECTED))))
+
+    assert delivered is False
+    assert smtp_server.messages == []
+
+
+def test_send_returns_false_when_the_server_is_down(monkeypatch):
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", free_port())
+    monkeypatch.setattr(settings, "SMTP_USE_TLS", False)
+    monkeypatch.setattr(settings, "SMTP_TIMEOUT_SECONDS", 1)
+
+    delivered = asyncio.run(run_with_transport(lambda transport: transport.send(message("a@example.com"))))
+
+    assert delivered is False
+
+
+def test_send_many_reports_each_result_and_reuses_the_connection(smtp_server, monkeypatch):
+    # More messages than the queue holds: senders wait for room instead of dropping
+    monkeypatch.setattr(settings, "EMAIL_QUEUE_MAX_SIZE", 5)
+    monkeypatch.setattr(settings, "EMAIL_BATCH_SIZE", 3)
+    recipients = [f"user{i}@example.com" for i in range(20)]
+    recipients[7] = REJECTED
+
+    results = asyncio.run(run_with_transport(
+        lambda transport: transport.send_many([message(to) for to in recipients])
+    ))
+
+    assert results == [to != REJECTED for to in recipients]
+    assert sorted(envelope.rcpt_tos[0] for envelope in smtp_server.messages) == sorted(
+        to for to in recipients if to != REJECTED
+    )
+    assert len(smtp_server.sessions) == 1
+
+
+def test_concurrent_senders_share_the_bounded_queue(smtp_server, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_QUEUE_MAX_SIZE", 4)
+
+    async def send_batches(transport):
+        batches = [[message(f"user{batch}-{i}@example.com") for i in range(10)] for batch in range(5)]
+        return await asyncio.gather(*(transport.send_many(batch) for batch in batches))
+
+    results = asyncio.run(run_with_transport(send_batches))
+
+    assert all(all(batch) for batch in results)
+    assert len(smtp_server.messages) == 50
+
+
+def test_broadcast_batches_larger_than_the_queue_are_all_delivered(smtp_server, monkeypatch):
+    # Two concurrent bulk jobs of 500 used to overflow a 1000-slot queue;
+    # scaled down: three jobs of 50 against a 60-slot queue
+    monkeypatch.setattr(settings, "EMAIL_QUEUE_MAX_SIZE", 60)
+
+    async def broadcast(transport):
+        jobs = [[message(f"user{job}-{i}@example.com") for i in range(50)] for job in range(3)]
+        return await asyncio.gather(*(transport.send_many(job) for job in jobs))
+
+    results = asyncio.run(run_with_transport(broadcast))
+
+    assert [sum(job) for job in results] == [50, 50, 50]
+    assert len(smtp_server.messages) == 150
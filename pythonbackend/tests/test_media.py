@@ -0,0 +1,40 @@
+"""
+Tests for post media storage and serialization
+"""
+
+import asyncio
+
+import pytest
+
+from api.routes.posts import _serialize_feed_post
+from db.models.post import Post, PostMedia
+from db.models.user import User
+from services.storage import ContentAddressedStorage
+
+
+def test_local_fetch_fails_loudly_when_the_file_is_missing(tmp_path):
+    # e.g. a worker on another host that doesn't share UPLOAD_DIR
+    storage = ContentAddressedStorage(str(tmp_path), "/uploads")
+
+    with pytest.raises(FileNotFoundError, match="shared volume"):
+        asyncio.run(storage.fetch("posts/ab/abc.jpg"))
+
+
+def test_local_fetch_returns_the_stored_path(tmp_path):
+    storage = ContentAddressedStorage(str(tmp_path), "/uploads")
+    (tmp_path / "posts").mkdir()
+    (tmp_path / "posts" / "a.jpg").write_bytes(b"jpeg")
+
+    assert asyncio.run(storage.fetch("posts/a.jpg")) == (tmp_path / "posts" / "a.jpg").resolve()
+
+
+def test_feed_thumbnails_never_point_at_a_video():
+    post = Post(id=1, content="", post_type="carousel", like_count=0, comment_count=0)
+    post.user = User(id=2, email="guard@example.com", user_type="guard")
+    post.media = [
+        PostMedia(media_type="image", media_url="/uploads/a.jpg", thumbnail_url="/uploads/a_thumbnail.jpg", sort_order=0),
+        PostMedia(media_type="image", media_url="/uploads/b.jpg", sort_order=1),
+        PostMedia(media_type="video", media_url="/uploads/c.mp4", sort_order=2),
+    ]
+
+    assert _serialize_feed_post(post)["thumbnail_urls"] == ["/uploads/a_thumbnail.jpg", "/uploads/b.jpg", None]
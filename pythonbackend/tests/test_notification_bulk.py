@@ -0,0 +1,119 @@
+"""
+Benchmark: a 10,000-recipient broadcast through NotificationService.send_bulk
+
+Run with output to see the timings:
+
+    TEST_DATABASE_URL=... python -m pytest -s tests/test_notification_bulk.py
+"""
+
+import asyncio
+import math
+import time
+
+import pytest
+from sqlalchemy import event, func, insert, select
+
+from db.models.job import BackgroundJob
+from db.models.notification import Notification, NotificationType
+from db.models.profile import UserSettings
+from db.models.user import User
+from services import reference_data as reference_data_module
+from services.notification_service import (
+    BULK_DELIVERY_BATCH_SIZE, DELIVER_BULK_JOB, NotificationService
+)
+from services.reference_data import reference_data
+
+RECIPIENTS = 10000
+
+# Users with email switched off in their settings
+EMAIL_OPT_OUT_EVERY = 10
+
+
+async def seed(database, recipients: int) -> list:
+    async with database.session() as db:
+        await db.execute(insert(NotificationType).values(
+            name="announcement", template_subject="{title}", template_body="{message}", is_active=True
+        ))
+        user_ids = (await db.execute(
+            insert(User).returning(User.id),
+            [{"email": f"member{i}@example.com", "password_hash": "x"} for i in range(recipients)]
+        )).scalars().all()
+        await db.execute(insert(UserSettings), [
+            {"user_id": user_id, "email_notifications": False}
+            for user_id in user_ids[::EMAIL_OPT_OUT_EVERY]
+        ])
+        await db.commit()
+    return list(user_ids)
+
+
+async def broadcast(database, user_ids: list):
+    """(notifications created, seconds, statements) for one send_bulk call"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(database.engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with database.session() as db:
+            started = time.perf_counter()
+            created = await NotificationService().send_bulk(
+                db, user_ids, "announcement", {"title": "Heads up", "message": "Event tonight"}
+            )
+            elapsed = time.perf_counter() - started
+    finally:
+        event.remove(database.engine.sync_engine, "before_cursor_execute", record)
+    return created, elapsed, statements
+
+
+async def queued(database):
+    async with database.session() as db:
+        notifications = await db.scalar(select(func.count()).select_from(Notification))
+        payloads = (await db.execute(
+            select(BackgroundJob.payload)
+            .where(BackgroundJob.kind == DELIVER_BULK_JOB)
+            .order_by(BackgroundJob.id)
+        )).scalars().all()
+    return notifications, payloads
+
+
+@pytest.fixture
+def reference_tables(database, monkeypatch):
+    # The reference data cache loads notification types through its own session
+    monkeypatch.setattr(reference_data_module, "AsyncSessionLocal", database.session)
+    reference_data.invalidate()
+    yield
+    reference_data.invalidate()
+
+
+def test_broadcast_to_10k_recipients(database, reference_tables):
+    async def scenario():
+        user_ids = await seed(database, RECIPIENTS)
+        await reference_data.load(["notification_types"])
+        # A small broadcast to compare the statement count against
+        small = await broadcast(database, user_ids[:100])
+        large = await broadcast(database, user_ids)
+        result = await queued(database)
+        await database.engine.dispose()
+        return small, large, result
+
+    (small_created, small_s, small_statements), (created, elapsed, statements), (notifications, payloads) = (
+        asyncio.run(scenario())
+    )
+
+    print(
+        f"\nsend_bulk: {small_created:,} recipients {small_s * 1000:.0f} ms ({len(small_statements)} statements), "
+        f"{created:,} recipients {elapsed * 1000:.0f} ms ({len(statements)} statements)"
+    )
+
+    assert created == RECIPIENTS
+    assert notifications == RECIPIENTS + small_created
+    # Recipients are read, inserted and queued in set-based statements, so the
+    # statement count doesn't grow with the broadcast
+    assert len(statements) == len(small_statements)
+
+    # The first job is the small broadcast's
+    large_jobs = payloads[1:]
+    assert len(large_jobs) == math.ceil(RECIPIENTS / BULK_DELIVERY_BATCH_SIZE)
+    emailed = sum(len(payload.get("email", [])) for payload in large_jobs)
+    assert emailed == RECIPIENTS - math.ceil(RECIPIENTS / EMAIL_OPT_OUT_EVERY)
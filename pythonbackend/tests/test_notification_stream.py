@@ -0,0 +1,21 @@
+"""
+Tests for live notification fan-out
+"""
+
+from services.notification_stream import RecentIds
+
+
+def test_recent_ids_accepts_out_of_order_ids_once():
+    sent = RecentIds(10)
+
+    # Id 7 commits after id 9 and must still be sent; repeats are dropped
+    assert [sent.add(event_id) for event_id in (5, 9, 7, 9, 5)] == [True, True, True, False, False]
+
+
+def test_recent_ids_forgets_the_oldest_ids_beyond_its_size():
+    sent = RecentIds(3)
+    for event_id in (1, 2, 3, 4):
+        sent.add(event_id)
+
+    assert 1 not in sent
+    assert all(event_id in sent for event_id in (2, 3, 4))
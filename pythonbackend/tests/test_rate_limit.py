@@ -0,0 +1,79 @@
+"""
+Tests for the GCRA rate limiting middleware behind a proxy
+"""
+
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from core import rate_limit  # noqa: E402
+from core.config import settings  # noqa: E402
+from core.rate_limit import RateLimitMiddleware, RateLimiter, client_ip  # noqa: E402
+
+PROXY = "10.0.0.1"
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def statuses(monkeypatch, requests, peer=PROXY):
+    """Status codes for requests with the given X-Forwarded-For headers from one peer"""
+    monkeypatch.setattr(rate_limit, "rate_limiter", RateLimiter())
+    monkeypatch.setattr(rate_limit, "get_redis", lambda: None)
+    monkeypatch.setattr(settings, "RATE_LIMIT_PER_MINUTE", 60)
+    monkeypatch.setattr(settings, "RATE_LIMIT_BURST", 2)
+    app = RateLimitMiddleware(ok_app)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app, client=(peer, 1234))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [
+                (await client.get("/api/v1/posts/", headers={"X-Forwarded-For": forwarded_for})).status_code
+                for forwarded_for in requests
+            ]
+
+    return asyncio.run(run())
+
+
+def scope(peer, *forwarded_for):
+    return {"client": (peer, 1234), "headers": [(b"x-forwarded-for", value.encode()) for value in forwarded_for]}
+
+
+def test_clients_behind_a_trusted_proxy_are_limited_separately(monkeypatch):
+    codes = statuses(monkeypatch, ["1.1.1.1", "1.1.1.1", "2.2.2.2", "2.2.2.2", "1.1.1.1"])
+
+    assert codes == [200, 200, 200, 200, 429]
+
+
+def test_forged_leading_hops_share_the_real_clients_limit(monkeypatch):
+    # The proxy appends the real client (9.9.9.9) after whatever the client sent
+    codes = statuses(monkeypatch, [f"6.6.6.{i}, 9.9.9.9" for i in range(20)])
+
+    assert codes == [200, 200] + [429] * 18
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers(monkeypatch):
+    codes = statuses(monkeypatch, ["1.1.1.1", "2.2.2.2", "3.3.3.3"], peer="8.8.8.8")
+
+    assert codes == [200, 200, 429]
+
+
+def test_client_ip_skips_trusted_hops_from_the_right():
+    assert client_ip(scope(PROXY, "6.6.6.6, 9.9.9.9, 10.1.2.3")) == "9.9.9.9"
+    assert client_ip(scope(PROXY, "6.6.6.6", "9.9.9.9")) == "9.9.9.9"
+    assert client_ip(scope(PROXY, "not-an-ip, 9.9.9.9")) == "9.9.9.9"
+    assert client_ip(scope(PROXY, "9.9.9.9, garbage")) == "garbage"
+    assert client_ip(scope("8.8.8.8", "9.9.9.9")) == "8.8.8.8"
+    assert client_ip(scope(PROXY)) == PROXY
+    assert client_ip(scope("127.0.0.1", "192.168.1.5")) == "192.168.1.5"
+
+
+def test_trusted_proxies_are_configurable(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", ["203.0.113.0/24"])
+
+    assert client_ip(scope("203.0.113.7", "6.6.6.6, 9.9.9.9")) == "9.9.9.9"
+    assert client_ip(scope(PROXY, "9.9.9.9")) == PROXY
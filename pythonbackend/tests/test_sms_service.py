@@ -0,0 +1,74 @@
+"""
+Tests for SMS delivery through the Twilio Messages API
+"""
+
+import asyncio
+import base64
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from core.config import settings
+from services.sms_service import SMSService
+
+
+@pytest.fixture
+def twilio(monkeypatch):
+    monkeypatch.setattr(settings, "TWILIO_ACCOUNT_SID", "AC123")
+    monkeypatch.setattr(settings, "TWILIO_AUTH_TOKEN", "secret")
+    monkeypatch.setattr(settings, "TWILIO_FROM_NUMBER", "+15550000000")
+
+
+def send(handler, phone_number="+15551234567", message="Your booking is confirmed"):
+    """send_sms through a fake Twilio answering with `handler`"""
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await SMSService(client).send_sms(phone_number, message)
+
+    return asyncio.run(run())
+
+
+def test_accepted_message_is_sent(twilio):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(201, json={"sid": "SM1", "status": "queued"})
+
+    assert send(handler, message="x" * 2000) is True
+
+    (request,) = requests
+    assert request.method == "POST"
+    assert request.url == "https://api.twilio.com/2010-04-01/Accounts/AC123/Messages.json"
+    assert request.headers["authorization"] == "Basic " + base64.b64encode(b"AC123:secret").decode()
+    form = parse_qs(request.content.decode())
+    assert form["To"] == ["+15551234567"]
+    assert form["From"] == ["+15550000000"]
+    assert form["Body"] == ["x" * 1600]
+
+
+def test_rejected_message_is_not_sent(twilio, capsys):
+    def handler(request):
+        return httpx.Response(400, json={"code": 21211, "message": "Invalid 'To' Phone Number"})
+
+    assert send(handler, phone_number="12") is False
+    assert "Invalid 'To' Phone Number" in capsys.readouterr().out
+
+
+def test_network_error_is_not_sent(twilio):
+    def handler(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    assert send(handler) is False
+
+
+def test_unconfigured_service_is_unavailable(monkeypatch):
+    monkeypatch.setattr(settings, "TWILIO_ACCOUNT_SID", None)
+    calls = []
+
+    service = SMSService()
+
+    assert service.available is False
+    assert send(lambda request: calls.append(request)) is False
+    assert calls == []
@@ -0,0 +1,53 @@
+"""
+Background job worker
+
+Run alongside the API:  python worker.py [queue ...]
+
+With MEDIA_STORAGE_BACKEND="local" the worker reads uploaded images from
+UPLOAD_DIR, so it has to run on the API's host or mount the same volume.
+"""
+
+import asyncio
+import logging
+import signal
+import sys
+
+from db.listener import pg_listener
+from services.job_queue import JobWorker
+from services.mail_transport import mail_transport
+from services.media_processing import shutdown_pool
+from services.reference_data import reference_data, REFERENCE_DATA_CHANNEL
+from services.sms_service import close_sms_client
+# Importing the services registers their job handlers
+import services.notification_service  # noqa: F401
+import services.media_processing  # noqa: F401
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main(queues) -> None:
+    worker = JobWorker(queues=queues or ("default",))
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    pg_listener.subscribe(
+        REFERENCE_DATA_CHANNEL,
+        reference_data.handle_notification,
+        on_reconnect=reference_data.reload
+    )
+    listener_task = asyncio.create_task(pg_listener.run())
+
+    try:
+        await worker.run()
+    finally:
+        listener_task.cancel()
+        await mail_transport.close()
+        await close_sms_client()
+        shutdown_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))